@@ -0,0 +1,112 @@
+"""Recall vs. vector size: PCA and truncation against full-dimension kNN.
+
+Usage:
+    python -m benchmarks.dims [--embedder model|hash] [--dims 64,128,192,256]
+        [--clauses 5000] [--queries 200] [--top-k 10]
+
+Embeds a synthetic clause corpus at full dimension, uses exact cosine kNN on
+the full vectors as ground truth, and reports recall@k and bytes per vector
+for each reduced size. PCA is fit on the corpus itself, as the projection CLI
+does; truncation is only meaningful for Matryoshka-trained models.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.run import RESULTS_DIR, QUERIES, build_embedder, git_revision
+from benchmarks.synthetic import PARTY_NAMES, paragraph_pool
+from clauseguard.services.projection import Projection
+
+
+def clause_variants(pool: list[str], n: int, rng: random.Random) -> list[str]:
+    """n distinct clauses: sample paragraphs with renamed parties and a dropped sentence.
+
+    The sample pool has a few hundred paragraphs; exact duplicates would tie in
+    kNN and make recall meaningless.
+    """
+    seen: dict[str, None] = {}
+    for _ in range(n * 20):
+        if len(seen) >= n:
+            break
+        party_a, party_b = rng.choice(PARTY_NAMES)
+        sentences = rng.choice(pool).replace("Provider", party_a).replace("Client", party_b).split(". ")
+        if len(sentences) > 1:
+            sentences.pop(rng.randrange(len(sentences)))
+        seen[". ".join(sentences)] = None
+    return list(seen)
+
+
+def top_k(matrix: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k most similar rows for each query (exact cosine)."""
+    sims = queries @ matrix.T
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(sims, top, 1), 1), 1)
+
+
+def recall(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model")
+    parser.add_argument("--dims", default="64,128,192,256")
+    parser.add_argument("--clauses", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    pool = paragraph_pool()
+    corpus = clause_variants(pool, args.clauses, rng)
+    # Natural-language queries plus original clause text, as both hit the kNN leg
+    query_texts = [q for q, _ in QUERIES] + rng.sample(pool, min(args.queries, len(pool)))
+
+    embedder = build_embedder(args.embedder)
+    matrix = np.asarray(embedder.encode_batch(corpus, project=False), dtype=np.float32)
+    queries = np.asarray(embedder.encode_batch(query_texts, project=False), dtype=np.float32)
+    full_dims = matrix.shape[1]
+    truth = top_k(matrix, queries, args.top_k)
+
+    rows = [{"method": "full", "dims": full_dims, "bytes_per_vector": 4 * full_dims, "recall": 1.0}]
+    for dims in (int(d) for d in args.dims.split(",")):
+        if dims >= full_dims:
+            continue
+        for projection in (Projection.fit_pca(matrix, dims), Projection.truncate(full_dims, dims)):
+            found = top_k(projection.apply(matrix), projection.apply(queries), args.top_k)
+            rows.append(
+                {
+                    "method": projection.method,
+                    "dims": dims,
+                    "bytes_per_vector": 4 * dims,
+                    "recall": round(recall(truth, found), 4),
+                }
+            )
+
+    results = {
+        "revision": git_revision(),
+        "embedder": args.embedder,
+        "clauses": len(corpus),
+        "queries": len(query_texts),
+        "top_k": args.top_k,
+        "results": rows,
+    }
+    for row in rows:
+        print(f"{row['method']:>8} {row['dims']:>4} dims  {row['bytes_per_vector']:>5} B  "
+              f"recall@{args.top_k} {row['recall']:.3f}")
+
+    started = datetime.now(timezone.utc)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"dims-{started:%Y%m%dT%H%M%SZ}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
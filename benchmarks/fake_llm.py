@@ -0,0 +1,260 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keyword heuristics used to classify paragraphs into clause types
+CLAUSE_KEYWORDS = {
+    "indemnity": ("indemnif", "hold harmless"),
+    "liability_cap": ("liability", "consequential"),
+    "termination": ("terminat",),
+    "confidentiality": ("confidential",),
+    "ip_assignment": ("intellectual property", "work product"),
+    "governing_law": ("governed by", "governing law", "jurisdiction"),
+    "data_protection": ("personal data", "gdpr", "ccpa", "data protection"),
+    "force_majeure": ("force majeure", "beyond the party's reasonable control"),
+}
+
+SECTION_RE = re.compile(r"^\s*(\d+(?:\.\d+)*)\s")
+
+
+def classify(text: str) -> str:
+    lowered = text.lower()
+    for clause_type, keywords in CLAUSE_KEYWORDS.items():
+        if any(k in lowered for k in keywords):
+            return clause_type
+    return "other"
+
+
+def split_paragraphs(text: str) -> list[tuple[int, str]]:
+    """Return (offset, paragraph) pairs for non-trivial blank-line separated paragraphs."""
+    paragraphs = []
+    for match in re.finditer(r"[^\n](?:.|\n(?!\s*\n))*", text):
+        para = match.group(0).strip()
+        if len(para) >= 60:
+            paragraphs.append((match.start(), para))
+    return paragraphs
+
+
+def _section_after(prompt: str, marker: str) -> str:
+    idx = prompt.find(marker)
+    return prompt[idx + len(marker):] if idx != -1 else ""
+
+
+def extract_response(prompt: str) -> str:
+    contract_text = _section_after(prompt, "CONTRACT TEXT:\n")
+    clauses = []
+    for offset, para in split_paragraphs(contract_text):
+        section = SECTION_RE.match(para)
+        clauses.append(
+            {
+                "clause_type": classify(para),
+                "text": para,
+                "section_number": section.group(1) if section else "",
+                "char_offset_start": offset,
+                "char_offset_end": offset + len(para),
+                "confidence": 0.9,
+            }
+        )
+    return json.dumps(clauses)
+
+
+SPAN_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+
+def extract_spans_response(prompt: str) -> str:
+    clauses = []
+    for match in SPAN_RE.finditer(_section_after(prompt, "CONTRACT SPANS:\n")):
+        span_id, text = int(match.group(1)), match.group(2)
+        if len(text) >= 60:
+            clauses.append(
+                {
+                    "start_span": span_id,
+                    "end_span": span_id,
+                    "clause_type": classify(text),
+                    "confidence": 0.9,
+                }
+            )
+    return json.dumps(clauses)
+
+
+def compare_response(prompt: str) -> str:
+    digest = int(hashlib.sha1(prompt.encode()).hexdigest(), 16)
+    severity = ("high", "medium", "low", "info")[digest % 4]
+    return json.dumps(
+        {
+            "severity": severity,
+            "deviation": "Clause omits the mutual obligations required by the template.",
+            "risk": "Exposure to one-sided obligations.",
+            "recommendation": "Align clause language with the company template.",
+            "confidence": 0.5 + (digest % 50) / 100,
+        }
+    )
+
+
+def summary_response(prompt: str) -> str:
+    return json.dumps(
+        {
+            "summary": "The contract deviates from several company templates and needs review.",
+        }
+    )
+
+
+def canned_response(prompt: str) -> str:
+    """Pick a canned JSON response based on which ClauseGuard prompt was sent."""
+    if "CONTRACT SPANS:" in prompt:
+        return extract_spans_response(prompt)
+    if "CONTRACT TEXT:" in prompt:
+        return extract_response(prompt)
+    if "COMPANY TEMPLATE:" in prompt:
+        return compare_response(prompt)
+    if "FINDINGS:" in prompt:
+        return summary_response(prompt)
+    return "{}"
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections under concurrent review load
+    request_queue_size = 256
+
+
+class FakeLLMServer:
+    """OpenAI-compatible /chat/completions stand-in with configurable latency and 429 injection.
+
+    Latency is ``latency_ms`` plus ``ms_per_output_token`` per generated token,
+    which mimics output tokens dominating real LLM call time. Models whose name
+    contains "fast" respond ``fast_model_speedup`` times quicker. A ``slow_rate``
+    fraction of requests take an extra ``slow_ms`` to simulate stragglers.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 50.0,
+        ms_per_output_token: float = 0.0,
+        error_rate: float = 0.0,
+        fast_model_speedup: float = 4.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.error_rate = error_rate
+        self.fast_model_speedup = fast_model_speedup
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.stragglers = 0
+        self.requests = 0
+        self.errors_injected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors_injected": self.errors_injected,
+            "stragglers": self.stragglers,
+        }
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self._rng.random() < self.error_rate:
+                self.errors_injected += 1
+                return True
+            return False
+
+    def _straggle_ms(self) -> float:
+        with self._lock:
+            if self._rng.random() < self.slow_rate:
+                self.stragglers += 1
+                return self.slow_ms
+            return 0.0
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                if server._should_fail():
+                    time.sleep(server.latency_ms / 1000 / 4)
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                    )
+                    return
+
+                prompt = "\n".join(
+                    m.get("content", "") for m in request.get("messages", [])
+                    if isinstance(m.get("content"), str)
+                )
+                content = canned_response(prompt)
+                prompt_tokens = len(prompt) // 4
+                completion_tokens = len(content) // 4
+                delay = (server.latency_ms + server.ms_per_output_token * completion_tokens) / 1000
+                if "fast" in request.get("model", ""):
+                    delay /= server.fast_model_speedup
+                delay += server._straggle_ms() / 1000
+                time.sleep(delay)
+                self._send_json(
+                    200,
+                    {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "fake"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                )
+
+        return Handler
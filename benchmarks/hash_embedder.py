@@ -0,0 +1,33 @@
+import hashlib
+import re
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashEmbeddingService:
+    """Deterministic feature-hashing embedder with the EmbeddingService interface.
+
+    Lets benchmarks run offline when the sentence-transformers model is not
+    available; vectors are L2-normalized bag-of-words hashes.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _vector(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dimension, dtype=np.float32)
+        for token in TOKEN_RE.findall(text.lower()):
+            h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vec[h % self.dimension] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, text: str) -> list[float]:
+        return self._vector(text).tolist()
+
+    def encode_batch(
+        self, texts: list[str], batch_size: int = 32, project: bool = True
+    ) -> list[list[float]]:
+        return [self._vector(t).tolist() for t in texts]
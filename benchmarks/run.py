@@ -0,0 +1,465 @@
+"""End-to-end ClauseGuard benchmarks against local LLM and Elasticsearch stand-ins.
+
+Usage:
+    python -m benchmarks.run [--scales 1000,10000] [--es-url http://localhost:9200]
+                             [--embedder hash] [--rerank] [--output results.json]
+
+Results are written as JSON (default: benchmarks/results/bench-<timestamp>.json)
+so runs can be diffed over time.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from prometheus_client import REGISTRY
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic import generate_contract, sample_contracts
+from clauseguard.agents.ingestion import IngestionAgent
+from clauseguard.agents.review import CascadePolicy, ReviewAgent
+from clauseguard.agents.search import SearchAgent
+from clauseguard.config import LLMEndpointSettings
+from clauseguard.models.search import SearchRequest
+from clauseguard.services.claude_service import ClaudeService
+from clauseguard.services.pdf_service import PDFService
+from clauseguard.services.scheduler import ComputeScheduler
+from clauseguard.templates.registry import TemplateRegistry
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Canned queries paired with the clause type a relevant hit should have
+QUERIES = [
+    ("limitation of liability for indirect damages", "liability_cap"),
+    ("unilateral termination for convenience", "termination"),
+    ("indemnify and hold harmless against third-party claims", "indemnity"),
+    ("return or destroy confidential information", "confidentiality"),
+    ("ownership of work product and deliverables", "ip_assignment"),
+    ("exclusive venue and governing law", "governing_law"),
+    ("processing of personal data under GDPR", "data_protection"),
+    ("events beyond reasonable control", "force_majeure"),
+]
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux), falling back to peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if platform.system() == "Darwin" else peak / 1024
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99/mean/max of latency samples, in milliseconds."""
+    if not samples:
+        return {}
+    ms = [s * 1000 for s in samples]
+    if len(ms) == 1:
+        return {"n": 1, "p50": ms[0], "p95": ms[0], "p99": ms[0], "mean": ms[0], "max": ms[0]}
+    q = statistics.quantiles(ms, n=100, method="inclusive")
+    return {
+        "n": len(ms),
+        "p50": q[49],
+        "p95": q[94],
+        "p99": q[98],
+        "mean": statistics.fmean(ms),
+        "max": max(ms),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_embedder(kind: str):
+    if kind == "hash":
+        from benchmarks.hash_embedder import HashEmbeddingService
+
+        return HashEmbeddingService()
+    from clauseguard.config import settings
+    from clauseguard.services.embedding_service import EmbeddingService
+
+    return EmbeddingService(settings.embedding_model)
+
+
+async def build_es(es_url: str | None, workdir: Path, dims: int | None = None):
+    if not es_url:
+        from clauseguard.services.embedded_store import EmbeddedSearchService
+
+        es = EmbeddedSearchService(workdir / "store")
+        await es.ensure_indices(dims)
+        return es
+    from clauseguard.services.elasticsearch_service import ElasticsearchService
+
+    es = ElasticsearchService(es_url)
+    es.contracts_index = "clauseguard-bench-contracts"
+    es.clauses_index = "clauseguard-bench-clauses"
+    for index in (es.contracts_index, es.clauses_index):
+        await es.es.indices.delete(index=index, ignore_unavailable=True)
+    await es.ensure_indices(dims)
+    return es
+
+
+def embeddings_count(source: str) -> float:
+    return REGISTRY.get_sample_value("clauseguard_clause_embeddings_total", {"source": source}) or 0.0
+
+
+def dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+async def bench_ingest(agent: IngestionAgent, documents: list[tuple[str, Path]]) -> tuple[dict, list[str]]:
+    """Ingest documents sequentially and report throughput."""
+    reused_before, computed_before = embeddings_count("reused"), embeddings_count("computed")
+    durations = []
+    num_clauses = 0
+    contract_ids = []
+    start = time.perf_counter()
+    for filename, path in documents:
+        t0 = time.perf_counter()
+        resp = await agent.ingest(path, filename)
+        durations.append(time.perf_counter() - t0)
+        num_clauses += resp.num_clauses
+        contract_ids.append(resp.contract_id)
+    elapsed = time.perf_counter() - start
+    return (
+        {
+            "contracts": len(documents),
+            "clauses": num_clauses,
+            "seconds": elapsed,
+            "contracts_per_sec": len(documents) / elapsed if elapsed else 0.0,
+            "clauses_per_sec": num_clauses / elapsed if elapsed else 0.0,
+            "per_contract_latency_ms": percentiles(durations),
+            "embeddings_reused": embeddings_count("reused") - reused_before,
+            "embeddings_computed": embeddings_count("computed") - computed_before,
+        },
+        contract_ids,
+    )
+
+
+def precision_at_k(response, expected_type: str) -> float:
+    if not response.hits:
+        return 0.0
+    return sum(1 for h in response.hits if h.clause_type == expected_type) / len(response.hits)
+
+
+async def bench_search(agent: SearchAgent, iterations: int, top_k: int, rerank: bool) -> dict:
+    """Run the canned query set repeatedly; report latency percentiles and precision@k."""
+    latencies = []
+    precisions = []
+    for _ in range(iterations):
+        for query, expected in QUERIES:
+            request = SearchRequest(query=query, top_k=top_k, rerank=rerank)
+            t0 = time.perf_counter()
+            response = await agent.search(request)
+            latencies.append(time.perf_counter() - t0)
+            precisions.append(precision_at_k(response, expected))
+    return {
+        "queries": len(latencies),
+        "latency_ms": percentiles(latencies),
+        f"precision_at_{top_k}": statistics.fmean(precisions) if precisions else 0.0,
+    }
+
+
+async def bench_search_during_ingest(
+    search: SearchAgent, ingestion: IngestionAgent, documents: list[tuple[str, Path]], top_k: int
+) -> dict:
+    """Search continuously while documents are ingested; search p99 should stay near idle."""
+    ingest_task = asyncio.ensure_future(bench_ingest(ingestion, documents))
+    latencies = []
+    while not ingest_task.done():
+        for query, _ in QUERIES:
+            request = SearchRequest(query=query, top_k=top_k, rerank=False)
+            t0 = time.perf_counter()
+            await search.search(request)
+            latencies.append(time.perf_counter() - t0)
+    ingest_stats, _ = await ingest_task
+    return {
+        "queries": len(latencies),
+        "latency_ms": percentiles(latencies),
+        "ingest": ingest_stats,
+    }
+
+
+async def bench_batch_search(agent: SearchAgent, top_k: int) -> dict:
+    """Run the whole canned query set as one batch request."""
+    requests = [SearchRequest(query=q, top_k=top_k, rerank=False) for q, _ in QUERIES]
+    t0 = time.perf_counter()
+    await agent.search_batch(requests)
+    return {"queries": len(requests), "latency_ms": (time.perf_counter() - t0) * 1000}
+
+
+async def bench_cached_search(embedder, es, top_k: int, iterations: int) -> dict:
+    """Latency of repeated identical searches served from the result cache."""
+    from clauseguard.services.search_cache import SearchCache
+
+    cache = SearchCache(es.generation, shared_generation=es.shared_generation)
+    agent = SearchAgent(embedding_service=embedder, es_service=es, cache=cache)
+    request = SearchRequest(query=QUERIES[0][0], top_k=top_k, rerank=False)
+    await agent.search(request)
+    latencies = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await agent.search(request)
+        latencies.append(time.perf_counter() - t0)
+    return {"latency_ms": percentiles(latencies), "cache": agent.cache.stats()}
+
+
+async def bench_review(agent: ReviewAgent, contract_ids: list[str], summary: bool = True) -> dict:
+    durations = []
+    num_findings = num_escalated = 0
+    for contract_id in contract_ids:
+        t0 = time.perf_counter()
+        report = await agent.review(contract_id, summary=summary)
+        durations.append(time.perf_counter() - t0)
+        num_findings += len(report.findings)
+        num_escalated += report.num_escalated
+    return {
+        "contracts": len(contract_ids),
+        "findings": num_findings,
+        "escalated": num_escalated,
+        "wall_time_ms": percentiles(durations),
+    }
+
+
+async def bench_review_cached(
+    agent: ReviewAgent, contract_ids: list[str], servers: list[FakeLLMServer]
+) -> dict:
+    """Review the same contracts twice with the comparison cache; count LLM requests per pass."""
+    passes = {}
+    for name in ("first", "repeat"):
+        requests = sum(server.requests for server in servers)
+        passes[name] = await bench_review(agent, contract_ids, summary=False)
+        passes[name]["llm_requests"] = sum(server.requests for server in servers) - requests
+    return passes
+
+
+async def run(args) -> dict:
+    servers = [
+        FakeLLMServer(
+            latency_ms=args.llm_latency_ms,
+            ms_per_output_token=args.llm_ms_per_token,
+            error_rate=args.llm_429_rate,
+            slow_rate=args.llm_slow_rate,
+            slow_ms=args.llm_slow_ms,
+            seed=i,
+        ).start()
+        for i in range(args.llm_endpoints)
+    ]
+    memory = {"start_rss_mb": rss_mb()}
+
+    embedder = build_embedder(args.embedder)
+    workdir = Path(tempfile.mkdtemp(prefix="clauseguard-bench-"))
+    es = await build_es(args.es_url, workdir, embedder.dimension)
+    claude = ClaudeService(
+        model="bench-model",
+        endpoints=[
+            LLMEndpointSettings(
+                base_url=server.base_url,
+                api_key="bench",
+                requests_per_minute=args.llm_rpm_per_endpoint,
+            )
+            for server in servers
+        ],
+    )
+    memory["after_setup_rss_mb"] = rss_mb()
+
+    reranker = None
+    if args.rerank:
+        from clauseguard.config import settings
+        from clauseguard.services.rerank_service import RerankService
+
+        reranker = RerankService(
+            settings.rerank_model,
+            batch_size=settings.rerank_batch_size,
+            timeout_ms=args.rerank_timeout_ms,
+        )
+
+    scheduler = ComputeScheduler(
+        workers=args.compute_workers, bulk_share=args.compute_bulk_share
+    )
+    ingestion = IngestionAgent(
+        pdf_service=PDFService(),
+        claude_service=claude,
+        embedding_service=embedder,
+        es_service=es,
+        scheduler=scheduler,
+        embed_chunk_size=args.bulk_chunk_size,
+        dedup=not args.no_dedup,
+    )
+    search = SearchAgent(
+        embedding_service=embedder,
+        es_service=es,
+        rerank_service=reranker,
+        rerank_top_n=args.rerank_top_n,
+        scheduler=scheduler,
+    )
+    # The comparison cache is off so reruns of these phases stay comparable
+    review = ReviewAgent(claude_service=claude, es_service=es, comparison_cache_size=0)
+
+    results: dict = {}
+
+    # 1. Sample contracts: ingest, review, search
+    samples = [(p.name, p) for p in sample_contracts()]
+    results["ingest_samples"], sample_ids = await bench_ingest(ingestion, samples)
+    memory["after_ingest_samples_rss_mb"] = rss_mb()
+
+    results["review_samples"] = await bench_review(review, sample_ids)
+    results["review_samples_no_summary"] = await bench_review(review, sample_ids, summary=False)
+    cascade = ReviewAgent(
+        claude_service=claude,
+        es_service=es,
+        cascade=CascadePolicy(fast_model="bench-fast-model", min_confidence=args.cascade_min_confidence),
+        comparison_cache_size=0,
+    )
+    results["review_samples_cascade"] = await bench_review(cascade, sample_ids)
+    templates = TemplateRegistry(embedder=embedder, scheduler=scheduler)
+    await templates.reload()
+    cached = ReviewAgent(
+        claude_service=claude,
+        es_service=es,
+        templates=templates,
+        prescreen_similarity=args.prescreen_similarity,
+    )
+    results["review_samples_cached"] = await bench_review_cached(cached, sample_ids, servers)
+    results["search_samples"] = await bench_search(search, args.search_iterations, args.top_k, False)
+
+    # 2. Synthetic corpus scaled up in steps
+    results["scales"] = []
+    total_clauses = results["ingest_samples"]["clauses"]
+    seed = 0
+    for scale in args.scales:
+        docs = []
+        while total_clauses + len(docs) * args.clauses_per_contract < scale:
+            docs.append(generate_contract(args.clauses_per_contract, seed))
+            seed += 1
+        paths = []
+        for name, text in docs:
+            path = workdir / name
+            path.write_text(text)
+            paths.append((name, path))
+        ingest_stats, _ = await bench_ingest(ingestion, paths)
+        total_clauses += ingest_stats["clauses"]
+
+        scale_result = {
+            "target_clauses": scale,
+            "corpus_clauses": total_clauses,
+            "ingest": ingest_stats,
+            "search": await bench_search(search, args.search_iterations, args.top_k, False),
+            "batch_search": await bench_batch_search(search, args.top_k),
+            "cached_search": await bench_cached_search(embedder, es, args.top_k, 200),
+        }
+        if reranker is not None:
+            rerank_stats = await bench_search(search, args.search_iterations, args.top_k, True)
+            key = f"precision_at_{args.top_k}"
+            rerank_stats["precision_gain"] = rerank_stats[key] - scale_result["search"][key]
+            scale_result["search_rerank"] = rerank_stats
+        scale_result["rss_mb"] = rss_mb()
+        if not args.es_url:
+            scale_result["store_bytes"] = dir_bytes(workdir / "store")
+        results["scales"].append(scale_result)
+
+    # 3. Interactive search isolation: search while a batch of contracts ingests
+    docs = [generate_contract(args.clauses_per_contract, seed + i) for i in range(4)]
+    paths = []
+    for name, text in docs:
+        path = workdir / f"concurrent-{name}"
+        path.write_text(text)
+        paths.append((path.name, path))
+    results["search_idle"] = await bench_search(search, args.search_iterations, args.top_k, False)
+    results["search_during_ingest"] = await bench_search_during_ingest(search, ingestion, paths, args.top_k)
+
+    memory["peak_rss_mb"] = peak_rss_mb()
+    results["memory"] = memory
+    results["llm"] = {
+        "servers": [server.stats() for server in servers],
+        "endpoints": claude.llm.stats(),
+        "retry_budget_tokens": claude.llm.retry_budget.tokens,
+    }
+
+    await es.close()
+    for server in servers:
+        server.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ClauseGuard end-to-end benchmarks")
+    parser.add_argument("--scales", type=lambda s: [int(x) for x in s.split(",")], default=[1000, 10000],
+                        help="Comma-separated synthetic corpus sizes in clauses")
+    parser.add_argument("--clauses-per-contract", type=int, default=50)
+    parser.add_argument("--es-url", default=None, help="Use a real Elasticsearch instead of the embedded backend")
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model")
+    parser.add_argument("--llm-endpoints", type=int, default=1,
+                        help="Number of fake LLM servers in the endpoint pool")
+    parser.add_argument("--llm-rpm-per-endpoint", type=float, default=0,
+                        help="Per-endpoint rate limit (0 = unlimited)")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--llm-429-rate", type=float, default=0.0)
+    parser.add_argument("--llm-slow-rate", type=float, default=0.0,
+                        help="Fraction of LLM calls that straggle (exercises hedging)")
+    parser.add_argument("--llm-slow-ms", type=float, default=2000.0)
+    parser.add_argument("--cascade-min-confidence", type=float, default=0.8)
+    parser.add_argument("--prescreen-similarity", type=float, default=0.0,
+                        help="Template similarity above which the cached review phase skips the LLM")
+    parser.add_argument("--search-iterations", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank", action="store_true", help="Also benchmark the cross-encoder rerank stage")
+    parser.add_argument("--rerank-top-n", type=int, default=50)
+    parser.add_argument("--rerank-timeout-ms", type=int, default=250)
+    parser.add_argument("--compute-workers", type=int, default=1)
+    parser.add_argument("--compute-bulk-share", type=int, default=1)
+    parser.add_argument("--bulk-chunk-size", type=int, default=32)
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Embed every clause copy instead of reusing canonical vectors")
+    parser.add_argument("--output", type=Path, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    started = datetime.now(timezone.utc)
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "timestamp": started.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"bench-{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report["results"], indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Serialization benchmark: FastAPI's default JSON path vs. the orjson/compact path.
+
+Usage:
+    python -m benchmarks.serialization [--findings 2000] [--clauses 5000] [--iterations 5]
+
+"default" mirrors what FastAPI does for a route with a response_model and the
+stock JSONResponse: jsonable_encoder, then json.dumps. Clause lists are
+measured as stored docs with their 384-dim embedding (the old
+/contracts/{id}/clauses payload) against projected docs through orjson.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.run import RESULTS_DIR, git_revision
+from benchmarks.synthetic import paragraph_pool
+from clauseguard.api.contracts import CLAUSE_FIELDS
+from clauseguard.api.responses import dumps
+from clauseguard.models.clause import ClauseType
+from clauseguard.models.report import Finding, RiskReport, Severity
+from clauseguard.templates.defaults import DEFAULT_TEMPLATES
+
+
+def default_json(content) -> bytes:
+    """Starlette JSONResponse.render after FastAPI's jsonable_encoder."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def build_report(num_findings: int, rng: random.Random) -> RiskReport:
+    pool = paragraph_pool()
+    types = list(DEFAULT_TEMPLATES)
+    findings = []
+    for _ in range(num_findings):
+        clause_type = rng.choice(types)
+        findings.append(
+            Finding(
+                clause_type=clause_type,
+                severity=rng.choice(list(Severity)),
+                clause_text=rng.choice(pool),
+                template_id=clause_type.value,
+                template_text=DEFAULT_TEMPLATES[clause_type].template_text,
+                deviation="Clause omits the mutual obligations required by the template.",
+                risk="Exposure to one-sided obligations.",
+                recommendation="Align clause language with the company template.",
+                confidence=rng.random(),
+                model="bench-model",
+            )
+        )
+    return RiskReport(contract_id="bench", findings=findings, overall_risk_score=6.0)
+
+
+def build_clause_docs(num_clauses: int, rng: random.Random) -> list[dict]:
+    pool = paragraph_pool()
+    return [
+        {
+            "clause_id": f"clause-{i}",
+            "contract_id": "bench",
+            "clause_type": rng.choice(list(ClauseType)).value,
+            "text": rng.choice(pool),
+            "section_number": f"{i // 5 + 1}.{i % 5 + 1}",
+            "page_number": i // 20 + 1,
+            "char_offset_start": i * 400,
+            "char_offset_end": i * 400 + 380,
+            "confidence": 0.9,
+            "alignment_score": 1.0,
+            "canonical_hash": f"{i:064x}",
+            "text_embedding": [rng.uniform(-0.1, 0.1) for _ in range(384)],
+        }
+        for i in range(num_clauses)
+    ]
+
+
+def measure(fn, iterations: int) -> dict:
+    durations = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        payload = fn()
+        durations.append(time.perf_counter() - t0)
+    return {"ms": round(1000 * statistics.median(durations), 2), "bytes": len(payload)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--findings", type=int, default=2000)
+    parser.add_argument("--clauses", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    report = build_report(args.findings, rng)
+    docs = build_clause_docs(args.clauses, rng)
+
+    results = {
+        "revision": git_revision(),
+        "findings": args.findings,
+        "clauses": args.clauses,
+        "report": {
+            "default_full": measure(lambda: default_json(report), args.iterations),
+            "orjson_full": measure(lambda: dumps(report), args.iterations),
+            "orjson_compact": measure(lambda: dumps(report.compact_dump()), args.iterations),
+        },
+        "clauses_list": {
+            "default_with_embeddings": measure(lambda: default_json(docs), args.iterations),
+            "orjson_projected": measure(
+                lambda: dumps([{k: d[k] for k in CLAUSE_FIELDS if k in d} for d in docs]),
+                args.iterations,
+            ),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+    started = datetime.now(timezone.utc)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"serialization-{started:%Y%m%dT%H%M%SZ}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Cold-start benchmark: import time, time-to-live and time-to-ready.
+
+Usage:
+    python -m benchmarks.startup [--runs 3] [--port 8765] [--timeout 300]
+
+Each run starts a fresh interpreter so imports and model loads are cold (OS
+page cache aside). /health answers as soon as the app is serving; /ready
+answers 200 once the embedding model is loaded and Elasticsearch is reachable.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from benchmarks.run import RESULTS_DIR, git_revision
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import clauseguard.main; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    """Seconds to import the application module in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def measure_boot(port: int, timeout: float) -> dict:
+    """Start uvicorn and time until /health answers and until /ready returns 200."""
+    base = f"http://127.0.0.1:{port}/api/v1"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "clauseguard.main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    live = ready = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if live is None and _status(f"{base}/health") == 200:
+                live = time.perf_counter() - started
+            if live is not None and _status(f"{base}/ready") == 200:
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"time_to_live_s": live, "time_to_ready_s": ready}
+
+
+def _median(values: list[float | None]) -> float | None:
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    boots = [measure_boot(args.port, args.timeout) for _ in range(args.runs)]
+    results = {
+        "revision": git_revision(),
+        "import_s": _median(imports),
+        "time_to_live_s": _median([b["time_to_live_s"] for b in boots]),
+        "time_to_ready_s": _median([b["time_to_ready_s"] for b in boots]),
+        "runs": boots,
+    }
+    print(json.dumps(results, indent=2))
+
+    started = datetime.now(timezone.utc)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"startup-{started:%Y%m%dT%H%M%SZ}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
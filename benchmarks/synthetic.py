@@ -0,0 +1,42 @@
+import random
+from pathlib import Path
+
+from benchmarks.fake_llm import split_paragraphs
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sample_contracts"
+
+PARTY_NAMES = [
+    ("Provider", "Client"),
+    ("Vendor", "Customer"),
+    ("Licensor", "Licensee"),
+    ("Consultant", "Company"),
+    ("Processor", "Controller"),
+]
+
+
+def sample_contracts() -> list[Path]:
+    return sorted(SAMPLE_DIR.glob("*.txt"))
+
+
+def paragraph_pool() -> list[str]:
+    """All clause-sized paragraphs from the sample contracts, section numbers stripped."""
+    pool = []
+    for path in sample_contracts():
+        for _, para in split_paragraphs(path.read_text()):
+            head, _, rest = para.partition(" ")
+            pool.append(rest if head[:1].isdigit() else para)
+    return pool
+
+
+def generate_contract(num_clauses: int, seed: int) -> tuple[str, str]:
+    """Build a synthetic contract of roughly num_clauses clauses. Returns (filename, text)."""
+    rng = random.Random(seed)
+    pool = paragraph_pool()
+    party_a, party_b = rng.choice(PARTY_NAMES)
+    lines = [f"SYNTHETIC AGREEMENT {seed}", ""]
+    for i in range(num_clauses):
+        if i % 5 == 0:
+            lines.extend([f"Section {i // 5 + 1}. Terms", ""])
+        para = rng.choice(pool).replace("Provider", party_a).replace("Client", party_b)
+        lines.extend([f"{i // 5 + 1}.{i % 5 + 1} {para}", ""])
+    return f"synthetic_{seed:05d}.txt", "\n".join(lines)
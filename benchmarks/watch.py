@@ -0,0 +1,121 @@
+"""Connector benchmark: first-scan ingest, no-op rescans and incremental changes.
+
+Usage:
+    python -m benchmarks.watch [--files 50000] [--ingest 300] [--changed 20]
+
+Writes ``--files`` small contracts into a temp directory. The first
+``--ingest`` go through the real IngestionAgent (fake LLM, hash embedder,
+embedded store); manifest rows for the rest are written directly, as if a
+previous run had ingested them, so the rescan is measured at full size
+without ingesting 50k contracts first. Then it times a rescan with nothing
+changed, one after touching files without changing them, and one after
+editing and copying ``--changed`` files, counting LLM requests for each.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.run import RESULTS_DIR, build_embedder, build_es, git_revision
+from benchmarks.synthetic import generate_contract
+from clauseguard.agents.ingestion import IngestionAgent
+from clauseguard.config import LLMEndpointSettings
+from clauseguard.connectors.manifest import Manifest
+from clauseguard.connectors.sources import DirectorySource, sha256_file
+from clauseguard.connectors.watcher import ConnectorWatcher
+from clauseguard.services.claude_service import ClaudeService
+from clauseguard.services.pdf_service import PDFService
+
+
+async def timed_scan(watcher: ConnectorWatcher, server: FakeLLMServer) -> dict:
+    requests = server.requests
+    t0 = time.perf_counter()
+    stats = await watcher.scan_once()
+    return {
+        "seconds": round(time.perf_counter() - t0, 3),
+        "llm_requests": server.requests - requests,
+        **{k: getattr(stats, k) for k in stats.__slots__},
+    }
+
+
+async def run(args) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="clauseguard-watch-"))
+    inbox = workdir / "inbox"
+    for i in range(args.files):
+        filename, text = generate_contract(args.clauses_per_contract, seed=i)
+        path = inbox / f"{i % 100:02d}" / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    server = FakeLLMServer(latency_ms=args.llm_latency_ms).start()
+    embedder = build_embedder("hash")
+    es = await build_es(None, workdir, embedder.dimension)
+    agent = IngestionAgent(
+        pdf_service=PDFService(),
+        claude_service=ClaudeService(
+            model="bench-model",
+            endpoints=[LLMEndpointSettings(base_url=server.base_url, api_key="bench")],
+        ),
+        embedding_service=embedder,
+        es_service=es,
+    )
+    source = DirectorySource(inbox)
+    manifest = Manifest(workdir / "manifest.sqlite3")
+    watcher = ConnectorWatcher(source, manifest, agent, concurrency=args.concurrency)
+
+    files = sorted(source.scan(), key=lambda f: f.key)
+    for file in files[args.ingest :]:
+        sha256 = sha256_file(inbox / file.key)
+        manifest.finish(source.name, file.key, file.size, file.mtime_ns, sha256, str(uuid.uuid4()))
+
+    results = {"revision": git_revision(), "files": args.files, "ingest": args.ingest}
+    results["first_scan"] = await timed_scan(watcher, server)
+    results["rescan_unchanged"] = await timed_scan(watcher, server)
+
+    for file in files[: args.changed]:
+        os.utime(inbox / file.key)
+    results["rescan_touched"] = await timed_scan(watcher, server)
+
+    for file in files[args.changed : 2 * args.changed]:
+        path = inbox / file.key
+        path.write_text(path.read_text() + "\n\nAMENDMENT. This Agreement is amended.\n")
+    for file in files[2 * args.changed : 3 * args.changed]:
+        path = inbox / file.key
+        (path.parent / f"copy_{path.name}").write_bytes(path.read_bytes())
+    results["rescan_changed"] = await timed_scan(watcher, server)
+
+    await es.close()
+    manifest.close()
+    server.stop()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--ingest", type=int, default=300)
+    parser.add_argument("--changed", type=int, default=20)
+    parser.add_argument("--clauses-per-contract", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    started = datetime.now(timezone.utc)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"watch-{started:%Y%m%dT%H%M%SZ}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
+import asyncio
 import logging
+import os
 import uuid
 from datetime import datetime
 
+from clauseguard.deadlines import check_deadline
 from clauseguard.models.clause import ClauseType, ExtractedClause
 from clauseguard.models.contract import ContractMetadata, ContractUploadResponse
+from clauseguard.services.alignment import TextAligner
+from clauseguard.services.canonical import canonical_hash
 from clauseguard.services.claude_service import ClaudeService
-from clauseguard.services.elasticsearch_service import ElasticsearchService
 from clauseguard.services.embedding_service import EmbeddingService
-from clauseguard.services.pdf_service import PDFService
+from clauseguard.services.pdf_service import ParsedDocument, PDFService
+from clauseguard.services.scheduler import ComputeScheduler, Lane
+from clauseguard.services.segmentation import Span, segment
+from clauseguard.services.storage import StorageBackend
+from clauseguard.services.text_store import TextStore
+from clauseguard.telemetry import CLAUSE_EMBEDDINGS, span
 
 logger = logging.getLogger(__name__)
 
@@ -20,40 +29,94 @@ class IngestionAgent:
         pdf_service: PDFService,
         claude_service: ClaudeService,
         embedding_service: EmbeddingService,
-        es_service: ElasticsearchService,
+        es_service: StorageBackend,
+        extraction_mode: str = "spans",
+        extraction_window_chars: int = 50000,
+        scheduler: ComputeScheduler | None = None,
+        embed_chunk_size: int = 32,
+        parse_chunk_pages: int = 8,
+        dedup: bool = True,
+        text_store: TextStore | None = None,
     ):
         self.pdf = pdf_service
         self.claude = claude_service
         self.embedder = embedding_service
         self.es = es_service
+        self.extraction_mode = extraction_mode
+        self.extraction_window_chars = extraction_window_chars
+        self.scheduler = scheduler or ComputeScheduler()
+        self.embed_chunk_size = embed_chunk_size
+        self.parse_chunk_pages = parse_chunk_pages
+        self.dedup = dedup
+        self.text_store = text_store
 
-    async def ingest(self, file_bytes: bytes, filename: str) -> ContractUploadResponse:
-        """Full ingestion pipeline: parse → extract → embed → index."""
-        contract_id = str(uuid.uuid4())
+    async def ingest(
+        self,
+        path: str | os.PathLike,
+        filename: str,
+        content_sha256: str = "",
+        contract_id: str | None = None,
+    ) -> ContractUploadResponse:
+        """Full ingestion pipeline: parse → extract → embed → index.
+
+        Callers that checkpoint may pass ``contract_id`` up front, so a run
+        interrupted midway can be cleaned up with ``delete``.
+        """
+        contract_id = contract_id or str(uuid.uuid4())
 
         # 1. Parse document
-        text, num_pages = self.pdf.parse(file_bytes, filename)
+        with span("ingest.parse", filename=filename):
+            document = await self._parse(path, filename)
+        text, num_pages = document.text, document.num_pages
         logger.info("Parsed %s: %d pages, %d chars", filename, num_pages, len(text))
 
-        # 2. Extract clauses via Claude
-        raw_clauses = self.claude.extract_clauses(text)
-        logger.info("Claude extracted %d clauses from %s", len(raw_clauses), filename)
+        # 2-3. Extract clauses via Claude, then validate types and resolve offsets
+        check_deadline("clause extraction")
+        if self.extraction_mode == "spans":
+            spans = segment(text)
+            with span("ingest.extract_clauses", chars=len(text), spans=len(spans)):
+                raw_clauses = await self.claude.extract_clause_spans(
+                    text, spans, self.extraction_window_chars
+                )
+            logger.info("Claude classified %d clauses from %s", len(raw_clauses), filename)
+            with span("ingest.post_process", clauses=len(raw_clauses)):
+                clauses = self._spans_to_clauses(raw_clauses, spans, document, contract_id)
+        else:
+            with span("ingest.extract_clauses", chars=len(text)):
+                raw_clauses = await self.claude.extract_clauses(text)
+            logger.info("Claude extracted %d clauses from %s", len(raw_clauses), filename)
+            with span("ingest.post_process", clauses=len(raw_clauses)):
+                clauses = self._post_process(raw_clauses, document, contract_id)
 
-        # 3. Post-process: validate types, correct offsets
-        clauses = self._post_process(raw_clauses, text, contract_id)
-
-        # 4. Generate embeddings
-        clause_texts = [c.text for c in clauses]
-        embeddings = self.embedder.encode_batch(clause_texts)
+        # 4. Generate embeddings, reusing stored vectors for boilerplate seen before
+        check_deadline("embedding")
+        for clause in clauses:
+            clause.canonical_hash = canonical_hash(clause.text)
+        vectors: dict[str, list[float]] = {}
+        if self.dedup:
+            with span("ingest.canonical_lookup", clauses=len(clauses)):
+                vectors = await self.es.get_canonical_embeddings(
+                    list({c.canonical_hash for c in clauses})
+                )
+        to_embed = {c.canonical_hash: c.text for c in clauses if c.canonical_hash not in vectors}
+        CLAUSE_EMBEDDINGS.labels("reused").inc(len(clauses) - len(to_embed))
+        CLAUSE_EMBEDDINGS.labels("computed").inc(len(to_embed))
+        with span("ingest.embed", batch_size=len(to_embed)):
+            # Chunked in the bulk lane so interactive searches can run in between
+            embeddings = await self.scheduler.run_chunked(
+                Lane.BULK, self.embedder.encode_batch, list(to_embed.values()), self.embed_chunk_size
+            )
+        vectors.update(zip(to_embed, embeddings))
 
         # 5. Build ES documents
         es_docs = []
-        for clause, embedding in zip(clauses, embeddings):
+        for clause in clauses:
             doc = clause.model_dump()
-            doc["text_embedding"] = embedding
+            doc["text_embedding"] = vectors[clause.canonical_hash]
             es_docs.append(doc)
 
-        # 6. Index contract metadata
+        # 6. Index contract metadata (nothing is written once the deadline has passed)
+        check_deadline("indexing")
         clause_types = list({c.clause_type for c in clauses})
         metadata = ContractMetadata(
             contract_id=contract_id,
@@ -63,11 +126,25 @@ class IngestionAgent:
             num_clauses=len(clauses),
             clause_types_found=clause_types,
             text_length=len(text),
+            content_sha256=content_sha256,
         )
-        await self.es.index_contract(metadata.model_dump(mode="json"))
+        try:
+            if self.text_store is not None:
+                # Kept so context display and re-extraction never re-parse the upload
+                await self.scheduler.run(Lane.BULK, self.text_store.write, contract_id, text)
+            with span("ingest.index_contract"):
+                await self.es.index_contract(metadata.model_dump(mode="json"))
 
-        # 7. Bulk index clauses
-        indexed = await self.es.bulk_index_clauses(es_docs)
+            # 7. Bulk index clauses
+            with span("ingest.index_clauses", clauses=len(es_docs)):
+                indexed = await self.es.bulk_index_clauses(es_docs)
+        except asyncio.CancelledError:
+            # A disconnect or deadline stopped us partway through the writes; undo them
+            # so no half-indexed contract is left behind. Shielded so a second cancel
+            # cannot interrupt the cleanup itself.
+            logger.warning("Ingest of %s cancelled, removing contract %s", filename, contract_id)
+            await asyncio.shield(self.delete(contract_id))
+            raise
         logger.info("Indexed %d clauses for contract %s", indexed, contract_id)
 
         return ContractUploadResponse(
@@ -77,10 +154,31 @@ class IngestionAgent:
             clause_types_found=clause_types,
         )
 
+    async def _parse(self, path: str | os.PathLike, filename: str) -> ParsedDocument:
+        """Parse in the bulk lane, one job per chunk of PDF pages so searches can run in between."""
+        if not filename.lower().endswith(".pdf"):
+            return await self.scheduler.run(Lane.BULK, self.pdf.parse, path, filename)
+        num_pages = await self.scheduler.run(Lane.BULK, self.pdf.page_count, path)
+        pages = await self.scheduler.run_chunked(
+            Lane.BULK,
+            lambda numbers: self.pdf.parse_pages(path, numbers[0], numbers[-1] + 1),
+            list(range(num_pages)),
+            self.parse_chunk_pages,
+        )
+        return self.pdf.assemble(pages)
+
+    async def delete(self, contract_id: str) -> bool:
+        """Remove a contract's documents and stored text. False if it was not indexed."""
+        found = await self.es.delete_contract(contract_id)
+        if self.text_store is not None:
+            await self.scheduler.run(Lane.BULK, self.text_store.delete, contract_id)
+        return found
+
     def _post_process(
-        self, raw_clauses: list[dict], source_text: str, contract_id: str
+        self, raw_clauses: list[dict], document: ParsedDocument, contract_id: str
     ) -> list[ExtractedClause]:
-        """Validate clause types and correct offsets via string matching."""
+        """Validate clause types and align echoed clause text back to the source."""
+        aligner = TextAligner(document.text)
         processed = []
         for raw in raw_clauses:
             # Validate clause type
@@ -94,9 +192,15 @@ class IngestionAgent:
             if not clause_text:
                 continue
 
-            # Correct offsets by searching for the text in source
+            # Correct offsets by aligning the text against the source index
             hint_start = raw.get("char_offset_start", 0)
-            start, end = self._find_offset(source_text, clause_text, hint_start)
+            if not isinstance(hint_start, int):
+                hint_start = 0
+            alignment = aligner.align(clause_text, hint_start)
+            if alignment.score > 0:
+                page_number = document.page_at(alignment.start)
+            else:
+                page_number = raw.get("page_number", 1)
 
             clause = ExtractedClause(
                 clause_id=str(uuid.uuid4()),
@@ -104,29 +208,59 @@ class IngestionAgent:
                 clause_type=clause_type,
                 text=clause_text,
                 section_number=raw.get("section_number", ""),
-                page_number=raw.get("page_number", 1),
-                char_offset_start=start,
-                char_offset_end=end,
+                page_number=page_number,
+                char_offset_start=alignment.start,
+                char_offset_end=alignment.end,
                 confidence=min(max(raw.get("confidence", 0.8), 0.0), 1.0),
+                alignment_score=alignment.score,
             )
             processed.append(clause)
         return processed
 
-    def _find_offset(
-        self, source: str, clause_text: str, hint: int
-    ) -> tuple[int, int]:
-        """Find the actual offset of clause_text in source, using hint as starting point."""
-        # Try exact match first near the hint
-        search_start = max(0, hint - 200)
-        idx = source.find(clause_text, search_start)
-        if idx != -1:
-            return idx, idx + len(clause_text)
-
-        # Try with first 80 chars (Claude may truncate)
-        snippet = clause_text[:80]
-        idx = source.find(snippet, search_start)
-        if idx != -1:
-            return idx, idx + len(clause_text)
-
-        # Fallback: use the hint as-is
-        return hint, hint + len(clause_text)
+    def _spans_to_clauses(
+        self, raw_clauses: list[dict], spans: list[Span], document: ParsedDocument, contract_id: str
+    ) -> list[ExtractedClause]:
+        """Rebuild clause text and exact offsets from the span IDs returned by the LLM."""
+        processed = []
+        for raw in raw_clauses:
+            try:
+                first = int(raw["start_span"])
+                last = int(raw.get("end_span", first))
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Skipping clause with invalid span IDs: %s", raw)
+                continue
+            first, last = sorted((first, last))
+            if first < 1 or last > len(spans):
+                logger.warning("Skipping clause with out-of-range span IDs: %s", raw)
+                continue
+
+            raw_type = raw.get("clause_type", "other")
+            try:
+                clause_type = ClauseType(raw_type)
+            except ValueError:
+                clause_type = ClauseType.OTHER
+
+            start = spans[first - 1].start
+            end = spans[last - 1].end
+            section_number = next(
+                (s.section_number for s in spans[first - 1 : last] if s.section_number), ""
+            )
+            try:
+                confidence = float(raw.get("confidence", 0.8))
+            except (TypeError, ValueError):
+                confidence = 0.8
+
+            processed.append(
+                ExtractedClause(
+                    clause_id=str(uuid.uuid4()),
+                    contract_id=contract_id,
+                    clause_type=clause_type,
+                    text=document.text[start:end],
+                    section_number=section_number,
+                    page_number=document.page_at(start),
+                    char_offset_start=start,
+                    char_offset_end=end,
+                    confidence=min(max(confidence, 0.0), 1.0),
+                )
+            )
+        return processed
@@ -1,37 +1,171 @@
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, field
 
+import numpy as np
+
+from clauseguard.deadlines import DeadlineExceeded, check_deadline
 from clauseguard.models.clause import ClauseType
 from clauseguard.models.report import Finding, RiskReport, Severity
 from clauseguard.services.claude_service import ClaudeService
-from clauseguard.services.elasticsearch_service import ElasticsearchService
-from clauseguard.templates.defaults import DEFAULT_TEMPLATES
+from clauseguard.services.storage import StorageBackend
+from clauseguard.telemetry import REVIEW_CASCADE, REVIEW_COMPARISONS, span
+from clauseguard.templates.registry import CompiledTemplate, TemplateRegistry
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class CascadePolicy:
+    """Routing rules for reviewing clauses with a fast model first."""
+
+    fast_model: str
+    min_confidence: float = 0.8
+    thresholds: dict[ClauseType, float] = field(default_factory=dict)
+    escalate_severities: frozenset[Severity] = frozenset({Severity.HIGH, Severity.MEDIUM})
+
+    @classmethod
+    def from_settings(cls, settings) -> "CascadePolicy | None":
+        """Build the policy from config; None when no fast model is configured."""
+        if not settings.llm_fast_model:
+            return None
+        return cls(
+            fast_model=settings.llm_fast_model,
+            min_confidence=settings.cascade_min_confidence,
+            thresholds={ClauseType(k): v for k, v in settings.cascade_thresholds.items()},
+            escalate_severities=frozenset(Severity(s) for s in settings.cascade_escalate_severities),
+        )
+
+    def should_escalate(self, clause_type: ClauseType, severity: Severity, confidence: float) -> bool:
+        """Escalate uncertain results and anything severe enough to need the main model."""
+        threshold = self.thresholds.get(clause_type, self.min_confidence)
+        return confidence < threshold or severity in self.escalate_severities
+
+
+DEFAULT_TYPE_WEIGHTS = {
+    ClauseType.INDEMNITY: 1.5,
+    ClauseType.LIABILITY_CAP: 1.5,
+    ClauseType.DATA_PROTECTION: 1.3,
+    ClauseType.IP_ASSIGNMENT: 1.2,
+    ClauseType.TERMINATION: 1.0,
+    ClauseType.CONFIDENTIALITY: 1.0,
+    ClauseType.GOVERNING_LAW: 0.6,
+    ClauseType.FORCE_MAJEURE: 0.6,
+    ClauseType.OTHER: 0.5,
+}
+DEFAULT_SEVERITY_POINTS = {
+    Severity.HIGH: 3.0,
+    Severity.MEDIUM: 1.5,
+    Severity.LOW: 0.5,
+    Severity.INFO: 0.0,
+}
+
+
+@dataclass(slots=True)
+class RiskScorer:
+    """Deterministic 0-10 contract risk score computed locally from findings.
+
+    Each finding adds ``severity_points * type_weight``, scaled by confidence
+    so uncertain findings count for less. Each missing required clause adds
+    ``missing_required_penalty * type_weight``. The total saturates towards
+    10 as ``10 * (1 - exp(-total / saturation))``.
+    """
+
+    severity_points: dict[Severity, float] = field(default_factory=lambda: dict(DEFAULT_SEVERITY_POINTS))
+    type_weights: dict[ClauseType, float] = field(default_factory=lambda: dict(DEFAULT_TYPE_WEIGHTS))
+    missing_required_penalty: float = 4.0
+    confidence_floor: float = 0.5
+    saturation: float = 12.0
+
+    @classmethod
+    def from_settings(cls, settings) -> "RiskScorer":
+        return cls(
+            severity_points={
+                **DEFAULT_SEVERITY_POINTS,
+                **{Severity(k): v for k, v in settings.risk_severity_points.items()},
+            },
+            type_weights={
+                **DEFAULT_TYPE_WEIGHTS,
+                **{ClauseType(k): v for k, v in settings.risk_type_weights.items()},
+            },
+            missing_required_penalty=settings.risk_missing_required_penalty,
+            confidence_floor=settings.risk_confidence_floor,
+            saturation=settings.risk_saturation,
+        )
+
+    def score(self, findings: list[Finding], missing_required: list[ClauseType]) -> float:
+        total = 0.0
+        for finding in findings:
+            if finding.clause_type in missing_required:
+                continue  # the synthetic "missing" finding is covered by the penalty
+            # Confidence 0 still counts confidence_floor of the points, confidence 1 all of them
+            weight = self.confidence_floor + (1 - self.confidence_floor) * finding.confidence
+            total += (
+                self.severity_points.get(finding.severity, 0.0)
+                * self.type_weights.get(finding.clause_type, 1.0)
+                * weight
+            )
+        for clause_type in missing_required:
+            total += self.missing_required_penalty * self.type_weights.get(clause_type, 1.0)
+        return round(10.0 * (1.0 - math.exp(-total / self.saturation)), 1)
+
+
 class ReviewAgent:
-    """Compare contract clauses against templates and produce a risk report."""
+    """Compare contract clauses against templates and produce a risk report.
+
+    Templates come precompiled from the registry. A clause identical to its
+    template (same canonical hash) skips the LLM, as does one the optional
+    embedding pre-screen finds close enough. LLM results are cached by
+    (template_id, clause canonical hash, model), so re-reviews and repeated
+    boilerplate cost nothing until the template changes. Replies that failed
+    to parse are not cached, so the next copy of the clause asks again.
+    """
 
     def __init__(
         self,
         claude_service: ClaudeService,
-        es_service: ElasticsearchService,
+        es_service: StorageBackend,
+        cascade: CascadePolicy | None = None,
+        scorer: RiskScorer | None = None,
+        summary_start_fraction: float = 0.9,
+        summary_max_input_tokens: int = 1500,
+        templates: TemplateRegistry | None = None,
+        prescreen_similarity: float = 0.0,
+        prescreen_requirement_similarity: float = 0.0,
+        comparison_cache_size: int = 10000,
     ):
         self.claude = claude_service
         self.es = es_service
-        self._executor = ThreadPoolExecutor(max_workers=2)
+        self.cascade = cascade
+        self.scorer = scorer or RiskScorer()
+        self.summary_start_fraction = summary_start_fraction
+        self.summary_max_input_tokens = summary_max_input_tokens
+        self.templates = templates or TemplateRegistry()
+        self.prescreen_similarity = prescreen_similarity
+        self.prescreen_requirement_similarity = prescreen_requirement_similarity
+        self.comparison_cache_size = comparison_cache_size
+        self._cache: OrderedDict[tuple[str, str, str], dict] = OrderedDict()
+
+    async def review(
+        self, contract_id: str, summary: bool = True, tenant: str | None = None
+    ) -> RiskReport:
+        """Run full compliance review for a contract against the tenant's templates.
 
-    async def review(self, contract_id: str) -> RiskReport:
-        """Run full compliance review for a contract."""
+        The risk score is computed locally. The LLM summary, unless disabled,
+        starts once ``summary_start_fraction`` of the comparisons are done so
+        it overlaps the slowest ones.
+        """
         # 1. Fetch contract metadata
-        contract = await self.es.get_contract(contract_id)
+        with span("review.fetch_contract"):
+            contract = await self.es.get_contract(contract_id)
         if not contract:
             raise ValueError(f"Contract {contract_id} not found")
 
         # 2. Fetch all clauses
-        clauses = await self.es.get_clauses_by_contract(contract_id)
+        with span("review.fetch_clauses"):
+            clauses = await self.es.get_clauses_by_contract(contract_id)
         if not clauses:
             raise ValueError(f"No clauses found for contract {contract_id}")
 
@@ -41,45 +175,22 @@ class ReviewAgent:
             ct = clause.get("clause_type", "other")
             clauses_by_type.setdefault(ct, []).append(clause)
 
-        # 4. Compare each clause against its template (parallelized)
-        findings: list[Finding] = []
-        compare_tasks = []
-        for clause_type_str, clause_list in clauses_by_type.items():
-            try:
-                clause_type = ClauseType(clause_type_str)
-            except ValueError:
-                continue
-
-            template = DEFAULT_TEMPLATES.get(clause_type)
-            if not template:
-                continue
-
-            for clause in clause_list:
-                compare_tasks.append(
-                    self._compare_clause(clause, clause_type, template)
-                )
-
-        if compare_tasks:
-            results = await asyncio.gather(*compare_tasks, return_exceptions=True)
-            for result in results:
-                if isinstance(result, Finding):
-                    findings.append(result)
-                elif isinstance(result, Exception):
-                    logger.error("Comparison failed: %s", result)
-
-        # 5. Detect missing required clauses
-        coverage: dict[str, bool] = {}
+        # 4. Detect missing required clauses
+        tset = self.templates.resolve(tenant)
+        coverage: dict[str, bool] = {ct.value: ct.value in clauses_by_type for ct in tset.templates}
         missing_required: list[ClauseType] = []
-        for ct, template in DEFAULT_TEMPLATES.items():
-            found = ct.value in clauses_by_type
-            coverage[ct.value] = found
-            if template.required and not found:
+        missing_findings: list[Finding] = []
+        for ct in tset.required:
+            if not coverage[ct.value]:
+                compiled = tset.templates[ct]
+                template = compiled.template
                 missing_required.append(ct)
-                findings.append(
+                missing_findings.append(
                     Finding(
                         clause_type=ct,
                         severity=Severity.HIGH,
                         clause_text="",
+                        template_id=compiled.template_id,
                         template_text=template.template_text,
                         deviation=f"Required clause '{template.name}' is missing from contract",
                         risk=f"Contract lacks required {template.name} protections",
@@ -88,50 +199,230 @@ class ReviewAgent:
                     )
                 )
 
-        # 6. Generate summary via Claude
-        findings_dicts = [f.model_dump() for f in findings]
-        missing_names = [ct.value for ct in missing_required]
+        # 5. Compare each clause against its template (parallelized)
+        to_compare: list[tuple[dict, ClauseType, CompiledTemplate]] = []
+        for clause_type_str, clause_list in clauses_by_type.items():
+            try:
+                clause_type = ClauseType(clause_type_str)
+            except ValueError:
+                continue
+
+            compiled = tset.templates.get(clause_type)
+            if not compiled:
+                continue
+
+            to_compare.extend((clause, clause_type, compiled) for clause in clause_list)
+
+        vectors = await self._prescreen_vectors(to_compare)
+        compare_tasks = [
+            asyncio.ensure_future(
+                self._compare_clause(
+                    clause, clause_type, compiled, vectors.get(clause.get("canonical_hash"))
+                )
+            )
+            for clause, clause_type, compiled in to_compare
+        ]
+
+        # 6. Summarize concurrently with the tail of the comparisons
+        summary_task: asyncio.Task | None = None
+        start_summary_at = math.ceil(len(compare_tasks) * self.summary_start_fraction)
+        try:
+            if compare_tasks:
+                check_deadline("clause comparison")
+            with span("review.compare_clauses", clauses=len(compare_tasks)):
+                pending = set(compare_tasks)
+                while True:
+                    finished = len(compare_tasks) - len(pending)
+                    if summary and summary_task is None and finished >= start_summary_at:
+                        summary_task = asyncio.create_task(
+                            self._summarize(
+                                self._collect(compare_tasks) + missing_findings,
+                                missing_required,
+                                pending=len(pending),
+                            )
+                        )
+                    if not pending:
+                        break
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            findings = self._collect(compare_tasks, log_errors=True) + missing_findings
 
-        loop = asyncio.get_event_loop()
-        summary_result = await loop.run_in_executor(
-            self._executor,
-            self.claude.generate_report_summary,
-            findings_dicts,
-            missing_names,
-        )
+            summary_text = ""
+            if summary_task is not None:
+                with span("review.summary_wait"):
+                    try:
+                        summary_text = await summary_task
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        # The score is local, so a failed or timed-out summary no longer
+                        # fails the review; only the request deadline does
+                        logger.warning("Report summary failed (%s), returning report without it", e)
+        finally:
+            for task in compare_tasks:
+                task.cancel()
+            if summary_task is not None:
+                summary_task.cancel()
 
-        # 7. Assemble report
+        # 7. Score locally and assemble report
         num_high = sum(1 for f in findings if f.severity == Severity.HIGH)
         num_medium = sum(1 for f in findings if f.severity == Severity.MEDIUM)
         num_low = sum(1 for f in findings if f.severity == Severity.LOW)
+        num_escalated = sum(1 for f in findings if f.escalated)
 
         return RiskReport(
             contract_id=contract_id,
             contract_filename=contract.get("filename", ""),
-            overall_risk_score=summary_result.get("overall_risk_score", 5.0),
-            summary=summary_result.get("summary", ""),
+            overall_risk_score=self.scorer.score(findings, missing_required),
+            summary=summary_text,
             findings=findings,
             coverage=coverage,
             missing_required_clauses=missing_required,
             num_high=num_high,
             num_medium=num_medium,
             num_low=num_low,
+            num_escalated=num_escalated,
+            tenant=tset.tenant,
+            template_version=tset.version,
+        )
+
+    async def _prescreen_vectors(
+        self, to_compare: list[tuple[dict, ClauseType, CompiledTemplate]]
+    ) -> dict[str, np.ndarray]:
+        """Normalized stored clause vectors by canonical hash, when the pre-screen is on."""
+        if self.prescreen_similarity <= 0:
+            return {}
+        hashes = list(
+            {
+                clause["canonical_hash"]
+                for clause, _, compiled in to_compare
+                if clause.get("canonical_hash") and compiled.embedding is not None
+            }
         )
+        if not hashes:
+            return {}
+        with span("review.prescreen_vectors", clauses=len(hashes)):
+            stored = await self.es.get_canonical_embeddings(hashes)
+        vectors = {}
+        for key, vector in stored.items():
+            v = np.asarray(vector, dtype=np.float32)
+            vectors[key] = v / max(float(np.linalg.norm(v)), 1e-12)
+        return vectors
+
+    @staticmethod
+    def _collect(tasks: list[asyncio.Future], log_errors: bool = False) -> list[Finding]:
+        """Findings of the finished comparisons, in clause order."""
+        findings = []
+        for task in tasks:
+            if not task.done():
+                continue
+            if task.exception() is not None:
+                if log_errors:
+                    logger.error("Comparison failed: %s", task.exception())
+                continue
+            findings.append(task.result())
+        return findings
+
+    async def _summarize(
+        self, findings: list[Finding], missing_required: list[ClauseType], pending: int
+    ) -> str:
+        check_deadline("report summary")
+        with span("review.summary", findings=len(findings), pending=pending):
+            return await self.claude.generate_report_summary(
+                [f.model_dump() for f in findings],
+                [ct.value for ct in missing_required],
+                max_input_tokens=self.summary_max_input_tokens,
+                pending=pending,
+            )
 
     async def _compare_clause(
-        self, clause: dict, clause_type: ClauseType, template
+        self,
+        clause: dict,
+        clause_type: ClauseType,
+        template: CompiledTemplate,
+        vector: np.ndarray | None = None,
     ) -> Finding:
-        """Compare a single clause to its template using Claude (run in thread)."""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self._executor,
-            self.claude.compare_clause_to_template,
-            clause["text"],
-            clause_type.value,
-            template.template_text,
-            template.key_requirements,
+        """Compare a single clause to its template, cascading from the fast model if configured."""
+        if clause.get("canonical_hash") == template.canonical_hash:
+            REVIEW_COMPARISONS.labels("template_match").inc()
+            return self._matched_finding(clause, clause_type, template, "template-match", 1.0)
+        if vector is not None and template.matches(
+            vector, self.prescreen_similarity, self.prescreen_requirement_similarity
+        ):
+            REVIEW_COMPARISONS.labels("prescreen").inc()
+            similarity = min(max(float(template.embedding @ vector), 0.0), 1.0)
+            return self._matched_finding(clause, clause_type, template, "prescreen", similarity)
+
+        if self.cascade is None:
+            model = self.claude.model
+            result = await self._run_comparison(clause, clause_type, template, model)
+            return self._to_finding(clause, clause_type, template, result, model)
+
+        fast_model = self.cascade.fast_model
+        try:
+            result = await self._run_comparison(clause, clause_type, template, fast_model)
+            finding = self._to_finding(clause, clause_type, template, result, fast_model)
+        except Exception as e:
+            logger.warning("Fast model review failed (%s), escalating", e)
+            finding = None
+
+        if finding is not None and not self.cascade.should_escalate(
+            clause_type, finding.severity, finding.confidence
+        ):
+            REVIEW_CASCADE.labels(clause_type.value, "accepted").inc()
+            return finding
+
+        REVIEW_CASCADE.labels(clause_type.value, "escalated").inc()
+        model = self.claude.model
+        result = await self._run_comparison(clause, clause_type, template, model)
+        finding = self._to_finding(clause, clause_type, template, result, model)
+        finding.escalated = True
+        return finding
+
+    async def _run_comparison(
+        self, clause: dict, clause_type: ClauseType, template: CompiledTemplate, model: str
+    ) -> dict:
+        """Run one template comparison on the given model, or reuse a cached result."""
+        key = None
+        if self.comparison_cache_size > 0 and clause.get("canonical_hash"):
+            key = (template.template_id, clause["canonical_hash"], model)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                REVIEW_COMPARISONS.labels("cache").inc()
+                return cached
+
+        REVIEW_COMPARISONS.labels("llm").inc()
+        with span("review.compare_clause", clause_type=clause_type.value, model=model):
+            result = await self.claude.compare_clause_to_template(
+                clause["text"], clause_type.value, template.prompt_prefix, model=model
+            )
+        if key is not None and not result.get("parse_failed"):
+            self._cache[key] = result
+            if len(self._cache) > self.comparison_cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _matched_finding(
+        clause: dict, clause_type: ClauseType, template: CompiledTemplate, model: str, confidence: float
+    ) -> Finding:
+        return Finding(
+            clause_type=clause_type,
+            severity=Severity.INFO,
+            clause_text=clause["text"],
+            template_id=template.template_id,
+            template_text=template.template.template_text,
+            deviation="Clause matches the company template",
+            risk="",
+            recommendation="",
+            confidence=confidence,
+            model=model,
         )
 
+    @staticmethod
+    def _to_finding(
+        clause: dict, clause_type: ClauseType, template: CompiledTemplate, result: dict, model: str
+    ) -> Finding:
         try:
             severity = Severity(result.get("severity", "medium"))
         except ValueError:
@@ -141,9 +432,11 @@ class ReviewAgent:
             clause_type=clause_type,
             severity=severity,
             clause_text=clause["text"],
-            template_text=template.template_text,
+            template_id=template.template_id,
+            template_text=template.template.template_text,
             deviation=result.get("deviation", ""),
             risk=result.get("risk", ""),
             recommendation=result.get("recommendation", ""),
             confidence=min(max(result.get("confidence", 0.5), 0.0), 1.0),
+            model=model,
         )
@@ -2,39 +2,143 @@ import logging
 
 from clauseguard.models.clause import ClauseType
 from clauseguard.models.search import SearchHit, SearchRequest, SearchResponse
-from clauseguard.services.elasticsearch_service import ElasticsearchService
 from clauseguard.services.embedding_service import EmbeddingService
+from clauseguard.services.rerank_service import RerankService
+from clauseguard.services.scheduler import ComputeScheduler, Lane
+from clauseguard.services.search_cache import SearchCache
+from clauseguard.services.storage import StorageBackend
+from clauseguard.telemetry import SEARCH_CACHE_LOOKUPS, span
 
 logger = logging.getLogger(__name__)
 
 
 class SearchAgent:
-    """Hybrid BM25 + kNN search over indexed clauses."""
+    """Hybrid BM25 + kNN search over indexed clauses, with optional cross-encoder rerank."""
 
     def __init__(
         self,
         embedding_service: EmbeddingService,
-        es_service: ElasticsearchService,
+        es_service: StorageBackend,
+        rerank_service: RerankService | None = None,
+        rerank_top_n: int = 50,
+        cache: SearchCache | None = None,
+        scheduler: ComputeScheduler | None = None,
     ):
         self.embedder = embedding_service
         self.es = es_service
+        self.reranker = rerank_service
+        self.rerank_top_n = rerank_top_n
+        self.cache = cache
+        self.scheduler = scheduler or ComputeScheduler()
 
     async def search(self, request: SearchRequest) -> SearchResponse:
         """Execute hybrid search and return ranked results."""
-        # Encode query
-        query_vector = self.embedder.encode(request.query)
-
-        # Execute hybrid search
-        clause_types = [ct.value for ct in request.clause_types] if request.clause_types else None
-        results = await self.es.hybrid_search_rrf(
-            query_text=request.query,
-            query_vector=query_vector,
-            clause_types=clause_types,
-            contract_ids=request.contract_ids,
-            top_k=request.top_k,
+        responses = await self.search_batch([request])
+        return responses[0]
+
+    async def search_batch(self, requests: list[SearchRequest]) -> list[SearchResponse]:
+        """Execute many hybrid searches with one embedding pass and one ES round trip."""
+        responses: list[SearchResponse | None] = [None] * len(requests)
+
+        # Serve identical requests from cache until the index changes
+        pending: list[int] = []
+        cache_keys: list[tuple | None] = [None] * len(requests)
+        generation = await self.cache.current_generation() if self.cache is not None else (0, 0)
+        for i, request in enumerate(requests):
+            if self.cache is not None:
+                # Keyed on whether a rerank will really run, so RRF order cached
+                # before the rerank model loaded is never served as reranked
+                cache_keys[i] = self.cache.make_key(request, self._should_rerank(request))
+                cached = self.cache.get(cache_keys[i], generation)
+                SEARCH_CACHE_LOOKUPS.labels("hit" if cached is not None else "miss").inc()
+                if cached is not None:
+                    # The key normalizes whitespace; echo this request's own query
+                    responses[i] = cached.model_copy(update={"query": request.query})
+                    continue
+            pending.append(i)
+
+        if pending:
+            # Encode all uncached queries in one forward pass, ahead of bulk work
+            with span("search.embed", batch_size=len(pending)):
+                query_vectors = await self.scheduler.run(
+                    Lane.INTERACTIVE,
+                    self.embedder.encode_batch,
+                    [requests[i].query for i in pending],
+                )
+
+            # Execute all hybrid searches (over-fetch candidates when reranking)
+            queries = []
+            for i, query_vector in zip(pending, query_vectors):
+                request = requests[i]
+                clause_types = (
+                    [ct.value for ct in request.clause_types] if request.clause_types else None
+                )
+                queries.append(
+                    {
+                        "query_text": request.query,
+                        "query_vector": query_vector,
+                        "clause_types": clause_types,
+                        "contract_ids": request.contract_ids,
+                        "top_k": self._fetch_k(request),
+                        "collapse": request.collapse_duplicates,
+                    }
+                )
+            with span("search.retrieve", queries=len(queries)):
+                all_results = await self.es.hybrid_search_rrf_batch(queries)
+
+            reranked = await self._rerank([requests[i] for i in pending], all_results)
+            for i, results, reordered in zip(pending, all_results, reranked):
+                response = self._to_response(
+                    requests[i], reordered if reordered is not None else results
+                )
+                responses[i] = response
+                # A rerank that ran out of budget is a one-off; don't pin its RRF order
+                fell_back = self._should_rerank(requests[i]) and reordered is None
+                if self.cache is not None and not fell_back:
+                    self.cache.put(cache_keys[i], response, generation)
+
+        return responses
+
+    def _fetch_k(self, request: SearchRequest) -> int:
+        if self._should_rerank(request):
+            return max(request.top_k, self.rerank_top_n)
+        return request.top_k
+
+    def _should_rerank(self, request: SearchRequest) -> bool:
+        return self.reranker is not None and request.rerank
+
+    async def _rerank(
+        self, requests: list[SearchRequest], all_results: list[list[dict]]
+    ) -> list[list[dict] | None]:
+        """Rerank the fused candidates of every request that asks for it, as one job.
+
+        None means keep the RRF order: the request did not ask, or the
+        batch's latency budget ran out before its candidates were scored.
+        """
+        reranked: list[list[dict] | None] = [None] * len(requests)
+        wanted = [k for k, request in enumerate(requests) if self._should_rerank(request)]
+        if not wanted:
+            return reranked
+        candidates = sum(len(all_results[k]) for k in wanted)
+        with span("search.rerank", queries=len(wanted), candidates=candidates) as attrs:
+            reordered = await self.reranker.rerank_batch(
+                [(requests[k].query, all_results[k]) for k in wanted]
+            )
+            attrs["fallback"] = sum(r is None for r in reordered)
+        for k, results in zip(wanted, reordered):
+            reranked[k] = results
+        return reranked
+
+    def _to_response(self, request: SearchRequest, results: list[dict]) -> SearchResponse:
+        results = results[: request.top_k]
+        return SearchResponse(
+            query=request.query,
+            total_hits=len(results),
+            hits=self._to_hits(results),
         )
 
-        # Map to SearchHit models
+    def _to_hits(self, results: list[dict]) -> list[SearchHit]:
+        """Map ES documents to SearchHit models, skipping malformed ones."""
         hits = []
         for doc in results:
             try:
@@ -44,16 +148,13 @@ class SearchAgent:
                     clause_type=ClauseType(doc["clause_type"]),
                     text=doc["text"],
                     score=doc.get("_score", 0.0),
+                    rerank_score=doc.get("rerank_score"),
                     section_number=doc.get("section_number", ""),
                     page_number=doc.get("page_number", 1),
                     highlights=doc.get("highlights", []),
+                    canonical_hash=doc.get("canonical_hash", ""),
                 )
                 hits.append(hit)
             except (KeyError, ValueError) as e:
                 logger.warning("Skipping malformed search result: %s", e)
-
-        return SearchResponse(
-            query=request.query,
-            total_hits=len(hits),
-            hits=hits,
-        )
+        return hits
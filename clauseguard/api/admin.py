@@ -0,0 +1,77 @@
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from clauseguard.api.deps import get_profile_store, get_sampler, get_template_registry
+from clauseguard.api.profiling import admin_token_valid
+from clauseguard.config import settings
+from clauseguard.profiling import ProfileStore, Sampler
+from clauseguard.templates.registry import TemplateRegistry
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    """Admin routes exist only when ADMIN_TOKEN is set, and require it in X-Admin-Token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_token_valid(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], include_in_schema=False, dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/profile/hot")
+async def hot_stacks(
+    endpoint: str | None = None,
+    limit: int = Query(default=50, ge=1, le=10000),
+    output: Literal["json", "folded"] = Query(default="json", alias="format"),
+    sampler: Sampler | None = Depends(get_sampler),
+):
+    """Hottest stacks from the always-on sampler in this worker, optionally for one endpoint.
+
+    ``format=folded`` returns collapsed stacks with the endpoint as the root
+    frame, ready for flamegraph.pl or speedscope.
+    """
+    if sampler is None:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    stacks = sampler.hot_stacks(endpoint, limit)
+    if output == "folded":
+        return PlainTextResponse("".join(f"{e};{s} {n}\n" for e, s, n in stacks))
+    return {
+        "hz": sampler.hz,
+        "samples": sampler.hot_samples,
+        "dropped": sampler.dropped,
+        "stacks": [{"endpoint": e, "stack": s.split(";"), "samples": n} for e, s, n in stacks],
+    }
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(
+    profile_id: str,
+    store: ProfileStore | None = Depends(get_profile_store),
+):
+    """Folded stacks of a request profiled with ``X-Profile: 1`` (ID from ``X-Profile-Id``)."""
+    folded = await asyncio.to_thread(store.read, profile_id) if store is not None else None
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(folded)
+
+
+@router.get("/templates")
+async def template_versions(registry: TemplateRegistry = Depends(get_template_registry)):
+    """Template set version per tenant loaded in this worker."""
+    return {"versions": registry.versions()}
+
+
+@router.post("/templates/reload")
+async def reload_templates(registry: TemplateRegistry = Depends(get_template_registry)):
+    """Reload templates from the source now, instead of waiting for the watcher."""
+    try:
+        versions = await registry.reload()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Template reload failed: {e}")
+    return {"versions": versions}
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from fastapi import HTTPException, Request
+
+from clauseguard.deadlines import reset_deadline, set_deadline
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Request-Deadline"
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Non-standard (nginx) status for requests abandoned by the client
+CLIENT_CLOSED_REQUEST = 499
+
+
+def request_deadline(request: Request) -> float | None:
+    """Parse X-Request-Deadline (absolute epoch seconds) from the request, if present."""
+    value = request.headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail=f"{DEADLINE_HEADER} must be epoch seconds"
+        )
+
+
+async def run_with_cancellation(request: Request, work: Awaitable[T]) -> T:
+    """Run work for a request, cancelling it if the client disconnects or the deadline passes.
+
+    The deadline is exposed to the agents and the LLM client through a context
+    variable, so in-flight and queued LLM calls are cancelled along with it.
+    """
+    try:
+        deadline = request_deadline(request)
+    except HTTPException:
+        _close(work)
+        raise
+    if deadline is not None and deadline <= time.time():
+        _close(work)
+        raise HTTPException(status_code=504, detail="Request deadline already passed")
+
+    token = set_deadline(deadline)
+    try:
+        task = asyncio.ensure_future(work)
+    finally:
+        reset_deadline(token)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    timeout = None if deadline is None else deadline - time.time()
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        if task in done:
+            try:
+                return task.result()
+            except TimeoutError:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        if watcher in done:
+            logger.info("Client disconnected from %s, cancelling work", request.url.path)
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    finally:
+        task.cancel()
+        watcher.cancel()
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
+def _close(work: Awaitable) -> None:
+    """Close an un-awaited coroutine so it does not warn about never being awaited."""
+    close = getattr(work, "close", None)
+    if close is not None:
+        close()
@@ -1,19 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile
 
 from clauseguard.agents.ingestion import IngestionAgent
-from clauseguard.api.deps import get_es_service, get_ingestion_agent
-from clauseguard.models.contract import ContractMetadata, ContractUploadResponse
-from clauseguard.services.elasticsearch_service import ElasticsearchService
+from clauseguard.api.cancellation import run_with_cancellation
+from clauseguard.api.deps import (
+    get_es_service,
+    get_ingestion_agent,
+    get_text_store,
+    require_ready,
+)
+from clauseguard.api.responses import list_response
+from clauseguard.config import settings
+from clauseguard.models.clause import ExtractedClause
+from clauseguard.models.contract import ContractMetadata, ContractText, ContractUploadResponse
+from clauseguard.services.storage import StorageBackend
+from clauseguard.services.text_store import TextStore
 
 router = APIRouter(prefix="/contracts", tags=["contracts"])
 
+CLAUSE_FIELDS = tuple(ExtractedClause.model_fields)
+
 
-@router.post("/upload", response_model=ContractUploadResponse)
+@router.post(
+    "/upload", response_model=ContractUploadResponse, dependencies=[Depends(require_ready)]
+)
 async def upload_contract(
     file: UploadFile,
+    request: Request,
     agent: IngestionAgent = Depends(get_ingestion_agent),
 ):
-    """Upload a PDF or text contract for ingestion."""
+    """Upload a PDF or text contract for ingestion.
+
+    Cancelled if the client disconnects or X-Request-Deadline passes.
+    """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
 
@@ -21,27 +45,57 @@ async def upload_contract(
     if not any(file.filename.lower().endswith(ext) for ext in allowed):
         raise HTTPException(status_code=400, detail="Only PDF and text files are supported")
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Empty file")
+    suffix = os.path.splitext(file.filename)[1].lower()
+    tmp = tempfile.NamedTemporaryFile(
+        suffix=suffix, dir=settings.upload_tmp_dir or None, delete=False
+    )
+    try:
+        with tmp:
+            # The body is already spooled by the multipart parser; copy it to a
+            # named file for ingestion, hashing as we go, off the event loop
+            size, sha256 = await asyncio.to_thread(_copy_and_hash, file.file, tmp)
+        if size > settings.max_upload_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds {settings.max_upload_bytes} bytes",
+            )
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+
+        return await run_with_cancellation(
+            request,
+            agent.ingest(tmp.name, file.filename, content_sha256=sha256),
+        )
+    finally:
+        os.unlink(tmp.name)
 
-    result = await agent.ingest(content, file.filename)
-    return result
+
+def _copy_and_hash(src: BinaryIO, dst: BinaryIO) -> tuple[int, str]:
+    """Copy ``src`` to ``dst`` in bounded chunks. Stops one chunk past the upload limit."""
+    digest = hashlib.sha256()
+    size = 0
+    src.seek(0)
+    while size <= settings.max_upload_bytes and (chunk := src.read(settings.upload_chunk_bytes)):
+        size += len(chunk)
+        digest.update(chunk)
+        dst.write(chunk)
+    return size, digest.hexdigest()
 
 
 @router.get("/", response_model=list[ContractMetadata])
 async def list_contracts(
-    es: ElasticsearchService = Depends(get_es_service),
+    request: Request,
+    es: StorageBackend = Depends(get_es_service),
 ):
-    """List all ingested contracts."""
+    """List all ingested contracts (NDJSON with `Accept: application/x-ndjson`)."""
     docs = await es.list_contracts()
-    return [ContractMetadata(**doc) for doc in docs]
+    return list_response(request, [ContractMetadata(**doc) for doc in docs])
 
 
 @router.get("/{contract_id}", response_model=ContractMetadata)
 async def get_contract(
     contract_id: str,
-    es: ElasticsearchService = Depends(get_es_service),
+    es: StorageBackend = Depends(get_es_service),
 ):
     """Get a specific contract's metadata."""
     doc = await es.get_contract(contract_id)
@@ -50,14 +104,62 @@ async def get_contract(
     return ContractMetadata(**doc)
 
 
-@router.get("/{contract_id}/clauses")
+@router.delete("/{contract_id}", status_code=204, dependencies=[Depends(require_ready)])
+async def delete_contract(
+    contract_id: str,
+    es: StorageBackend = Depends(get_es_service),
+    store: TextStore = Depends(get_text_store),
+):
+    """Delete a contract, its clauses and its stored text."""
+    if not await es.delete_contract(contract_id):
+        raise HTTPException(status_code=404, detail="Contract not found")
+    await asyncio.to_thread(store.delete, contract_id)
+
+
+@router.get("/{contract_id}/clauses", response_model=list[ExtractedClause])
 async def get_contract_clauses(
     contract_id: str,
-    es: ElasticsearchService = Depends(get_es_service),
+    request: Request,
+    es: StorageBackend = Depends(get_es_service),
 ):
-    """Get all extracted clauses for a contract."""
+    """Get all extracted clauses for a contract (NDJSON with `Accept: application/x-ndjson`)."""
     contract = await es.get_contract(contract_id)
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
     clauses = await es.get_clauses_by_contract(contract_id)
-    return clauses
+    # Project stored docs onto the model's fields, dropping vectors and search metadata
+    return list_response(
+        request, [{k: doc[k] for k in CLAUSE_FIELDS if k in doc} for doc in clauses]
+    )
+
+
+@router.get("/{contract_id}/text", response_model=ContractText)
+async def get_contract_text(
+    contract_id: str,
+    start: int = Query(default=0, ge=0),
+    end: int | None = Query(default=None, ge=0),
+    store: TextStore = Depends(get_text_store),
+):
+    """Get characters [start, end) of a contract's parsed text (clause offsets index into it).
+
+    Only the compressed blocks covering the range are decompressed.
+    """
+    if end is None:
+        end = start + settings.text_range_max_chars
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if end - start > settings.text_range_max_chars:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range exceeds {settings.text_range_max_chars} characters",
+        )
+    text_range = await asyncio.to_thread(store.read, contract_id, start, end)
+    if text_range is None:
+        raise HTTPException(status_code=404, detail="Contract text not found")
+    return ContractText(
+        contract_id=contract_id,
+        start=text_range.start,
+        end=text_range.end,
+        text_length=text_range.text_length,
+        text=text_range.text,
+    )
@@ -1,9 +1,37 @@
-from fastapi import Request
+from fastapi import HTTPException, Request
 
 from clauseguard.agents.ingestion import IngestionAgent
 from clauseguard.agents.review import ReviewAgent
 from clauseguard.agents.search import SearchAgent
-from clauseguard.services.elasticsearch_service import ElasticsearchService
+from clauseguard.profiling import ProfileStore, Sampler
+from clauseguard.services.storage import StorageBackend
+from clauseguard.services.text_store import TextStore
+from clauseguard.templates.registry import TemplateRegistry
+
+# Components that must be ready before the instance takes traffic
+REQUIRED_COMPONENTS = ("embedding_model", "storage")
+
+
+def readiness(request: Request) -> tuple[bool, dict[str, str]]:
+    """Whether warm-up has finished, and each component's status."""
+    components = dict(getattr(request.app.state, "readiness", {}))
+    return all(components.get(c) == "ready" for c in REQUIRED_COMPONENTS), components
+
+
+def require_ready(request: Request) -> None:
+    """Gate write endpoints on the same check as /ready.
+
+    Before ``ensure_indices`` has run, an Elasticsearch write would
+    auto-create the clauses index without its routing, dims or vector
+    metadata.
+    """
+    ready, components = readiness(request)
+    if not ready:
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "starting", "components": components},
+            headers={"Retry-After": "5"},
+        )
 
 
 def get_ingestion_agent(request: Request) -> IngestionAgent:
@@ -18,5 +46,21 @@ def get_review_agent(request: Request) -> ReviewAgent:
     return request.app.state.review_agent
 
 
-def get_es_service(request: Request) -> ElasticsearchService:
+def get_es_service(request: Request) -> StorageBackend:
     return request.app.state.es_service
+
+
+def get_text_store(request: Request) -> TextStore:
+    return request.app.state.text_store
+
+
+def get_template_registry(request: Request) -> TemplateRegistry:
+    return request.app.state.review_agent.templates
+
+
+def get_sampler(request: Request) -> Sampler | None:
+    return getattr(request.app.state, "sampler", None)
+
+
+def get_profile_store(request: Request) -> ProfileStore | None:
+    return getattr(request.app.state, "profile_store", None)
@@ -0,0 +1,72 @@
+import asyncio
+import hmac
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from clauseguard import profiling
+
+
+def admin_token_valid(presented: str | bytes | None, admin_token: str) -> bool:
+    if not admin_token or not presented:
+        return False
+    if isinstance(presented, str):
+        presented = presented.encode()
+    return hmac.compare_digest(presented, admin_token.encode())
+
+
+class ProfilingMiddleware:
+    """Mark each request for the sampler, and profile it on request.
+
+    Every request gets a RequestContext in a context variable, which its
+    tasks inherit, so the always-on sampler can attribute stacks to the
+    endpoint. Requests sending ``X-Profile: 1`` with a valid
+    ``X-Admin-Token`` are sampled at the high rate; the folded stacks are
+    saved and their ID returned in ``X-Profile-Id``.
+    """
+
+    def __init__(self, app: ASGIApp, admin_token: str = ""):
+        self.app = app
+        self.admin_token = admin_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = profiling.RequestContext(scope)
+        state = scope["app"].state
+        sampler = getattr(state, "sampler", None)
+        if sampler is not None and self.admin_token and self._wants_profile(scope):
+            ctx.session = sampler.begin()
+
+        if ctx.session is None:
+            token = profiling.enter_request(ctx)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiling.exit_request(token)
+            return
+
+        session = ctx.session
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", session.profile_id.encode()),
+                ]
+            await send(message)
+
+        token = profiling.enter_request(ctx)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiling.exit_request(token)
+            sampler.end(session)
+            await asyncio.to_thread(state.profile_store.save, session)
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        headers = dict(scope["headers"])
+        return headers.get(b"x-profile") == b"1" and admin_token_valid(
+            headers.get(b"x-admin-token"), self.admin_token
+        )
@@ -0,0 +1,45 @@
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-rendered response that takes pydantic models directly.
+
+    Returning it from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass, which dominate serialization time for big payloads.
+    Keep ``response_model`` on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(items: Iterable[Any]) -> StreamingResponse:
+    """Stream one JSON document per line, so clients can start on the first item."""
+    return StreamingResponse((dumps(item) + b"\n" for item in items), media_type=NDJSON_MEDIA_TYPE)
+
+
+def list_response(request: Request, items: list[Any]):
+    """NDJSON stream if the client accepts it, otherwise one orjson array."""
+    return ndjson_response(items) if wants_ndjson(request) else FastJSONResponse(items)
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 
 from clauseguard.agents.review import ReviewAgent
+from clauseguard.api.cancellation import run_with_cancellation
 from clauseguard.api.deps import get_review_agent
+from clauseguard.api.responses import FastJSONResponse
 from clauseguard.models.report import RiskReport
 
 router = APIRouter(prefix="/review", tags=["review"])
@@ -10,10 +14,24 @@ router = APIRouter(prefix="/review", tags=["review"])
 @router.post("/{contract_id}", response_model=RiskReport)
 async def review_contract(
     contract_id: str,
+    request: Request,
+    summary: bool = True,
+    report_format: Literal["full", "compact"] = Query(default="full", alias="format"),
+    x_tenant_id: str | None = Header(default=None),
     agent: ReviewAgent = Depends(get_review_agent),
 ):
-    """Run compliance review on a contract and return risk report."""
+    """Run compliance review on a contract and return risk report.
+
+    ``summary=false`` skips the LLM executive summary; the risk score is
+    always computed. ``format=compact`` lists each template's text once in
+    ``templates`` instead of in every finding. ``X-Tenant-ID`` selects the
+    tenant's template set; unknown tenants get the default set. Cancelled
+    if the client disconnects or X-Request-Deadline passes.
+    """
     try:
-        return await agent.review(contract_id)
+        report = await run_with_cancellation(
+            request, agent.review(contract_id, summary=summary, tenant=x_tenant_id)
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    return FastJSONResponse(report.compact_dump() if report_format == "compact" else report)
@@ -1,13 +1,27 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
-from clauseguard.api import contracts, review, search
+from clauseguard.api import admin, contracts, review, search
+from clauseguard.api.deps import readiness
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(contracts.router)
 api_router.include_router(search.router)
 api_router.include_router(review.router)
+api_router.include_router(admin.router)
 
 
 @api_router.get("/health", tags=["health"])
 async def health_check():
+    """Liveness: the process is up and serving requests."""
     return {"status": "healthy"}
+
+
+@api_router.get("/ready", tags=["health"])
+async def readiness_check(request: Request):
+    """Readiness: models are loaded and the search backend is reachable."""
+    ready, components = readiness(request)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", "components": components},
+    )
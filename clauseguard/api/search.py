@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from clauseguard.agents.search import SearchAgent
 from clauseguard.api.deps import get_search_agent
-from clauseguard.models.search import SearchRequest, SearchResponse
+from clauseguard.api.responses import FastJSONResponse, ndjson_response, wants_ndjson
+from clauseguard.models.search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchRequest,
+    SearchResponse,
+)
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -13,4 +19,20 @@ async def search_clauses(
     agent: SearchAgent = Depends(get_search_agent),
 ):
     """Hybrid BM25 + kNN search over indexed clauses."""
-    return await agent.search(request)
+    return FastJSONResponse(await agent.search(request))
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def search_clauses_batch(
+    request: BatchSearchRequest,
+    http_request: Request,
+    agent: SearchAgent = Depends(get_search_agent),
+):
+    """Run many hybrid searches with one embedding pass and one ES round trip.
+
+    With `Accept: application/x-ndjson`, streams one SearchResponse per line.
+    """
+    results = await agent.search_batch(request.searches)
+    if wants_ndjson(http_request):
+        return ndjson_response(results)
+    return FastJSONResponse(BatchSearchResponse(results=results))
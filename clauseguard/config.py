@@ -1,16 +1,113 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
+class LLMEndpointSettings(BaseModel):
+    base_url: str
+    api_key: str = ""
+    name: str = ""
+    weight: float = 1.0
+    requests_per_minute: float = 0
+    max_concurrency: int = 16
+
+
 class Settings(BaseSettings):
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
     llm_api_key: str = ""
     llm_base_url: str = "https://prod.litellm.deeprunner.ai"
     llm_model: str = "claude-sonnet-4-5-20250929"
+    search_backend: str = "elasticsearch"
+    embedded_data_dir: str = "data"
     elasticsearch_url: str = "http://localhost:9200"
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_dims: int = 0
+    embedding_projection: str = "pca"
+    embedding_projection_path: str = "data/projection.npz"
     es_contracts_index: str = "clauseguard-contracts"
     es_clauses_index: str = "clauseguard-clauses"
+    es_canonical_index: str = "clauseguard-canonical-clauses"
+    es_templates_index: str = "clauseguard-templates"
+    es_meta_index: str = "clauseguard-meta"
+    clause_dedup_enabled: bool = True
+    llm_endpoints: list[LLMEndpointSettings] = []
+    llm_fast_model: str = ""
+    llm_timeout_seconds: float = 120.0
+    llm_max_concurrency: int = 16
+    llm_hedge_quantile: float = 0.95
+    llm_retry_budget_ratio: float = 0.1
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    extraction_mode: str = "spans"
+    extraction_window_chars: int = 50000
+
+    max_upload_bytes: int = 200 * 1024 * 1024
+    upload_chunk_bytes: int = 1024 * 1024
+    upload_tmp_dir: str = ""
+
+    text_store_dir: str = "data/text"
+    text_store_block_chars: int = 64 * 1024
+    text_store_level: int = 3
+    text_range_max_chars: int = 1024 * 1024
+
+    connector_manifest_path: str = "data/connector-manifest.sqlite3"
+    connector_concurrency: int = 4
+    connector_poll_seconds: float = 30.0
+    connector_s3_endpoint_url: str = ""
+
+    admin_token: str = ""
+    profile_sample_hz: float = 10.0
+    profile_request_hz: float = 500.0
+    profile_max_stacks: int = 10000
+    profile_dir: str = "data/profiles"
+    profile_keep: int = 100
+
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 0
+    torch_threads: int = 0
+    backlog: int = 2048
+
+    cascade_min_confidence: float = 0.8
+    cascade_thresholds: dict[str, float] = {}
+    cascade_escalate_severities: list[str] = ["high", "medium"]
+
+    risk_severity_points: dict[str, float] = {}
+    risk_type_weights: dict[str, float] = {}
+    risk_missing_required_penalty: float = 4.0
+    risk_confidence_floor: float = 0.5
+    risk_saturation: float = 12.0
+    summary_start_fraction: float = 0.9
+    summary_max_input_tokens: int = 1500
+
+    template_source: str = "builtin"
+    templates_dir: str = "data/templates"
+    template_reload_seconds: float = 30.0
+    review_cache_size: int = 10000
+    review_prescreen_similarity: float = 0.0
+    review_prescreen_requirement_similarity: float = 0.0
+
+    compute_workers: int = 1
+    compute_interactive_share: int = 4
+    compute_bulk_share: int = 1
+    compute_bulk_chunk_size: int = 32
+    compute_parse_chunk_pages: int = 8
+
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_top_n: int = 50
+    rerank_batch_size: int = 16
+    rerank_timeout_ms: int = 250
+    rerank_cache_size: int = 10000
+
+    search_cache_enabled: bool = True
+    search_cache_max_entries: int = 1024
+    search_cache_max_bytes: int = 64 * 1024 * 1024
+    search_cache_ttl_seconds: float = 300.0
+
+    otel_enabled: bool = False
+    otel_service_name: str = "clauseguard"
+    otel_exporter_endpoint: str = ""
 
 
 settings = Settings()
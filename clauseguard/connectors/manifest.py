@@ -0,0 +1,168 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    contract_id TEXT,
+    -- Set while an ingest is in flight; anything indexed under it is partial
+    pending_contract_id TEXT,
+    -- Superseded by a changed file and not yet deleted from the index
+    stale_contract_id TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+"""
+
+DONE = "done"
+PENDING = "pending"
+FAILED = "failed"
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    key: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    status: str
+    attempts: int
+    contract_id: str | None
+
+
+class Manifest:
+    """Persistent record of which source files were ingested, as which contract.
+
+    Rows are keyed by (source, key) and hold the size and mtime last seen, so
+    a rescan only hashes files whose stat changed. Every state transition is
+    committed immediately and acts as a checkpoint: after a crash, ``recover``
+    returns the contract IDs whose writes must be undone.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def entries(self, source: str) -> dict[str, ManifestEntry]:
+        """All rows for a source, loaded in one query for diffing against a scan."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, size, mtime_ns, sha256, status, attempts, contract_id "
+                "FROM files WHERE source = ?",
+                (source,),
+            ).fetchall()
+        return {row[0]: ManifestEntry(*row) for row in rows}
+
+    def contract_for_hash(self, sha256: str) -> str | None:
+        """Contract already ingested from identical content under any path."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT contract_id FROM files WHERE sha256 = ? AND status = ? LIMIT 1",
+                (sha256, DONE),
+            ).fetchone()
+        return row[0] if row else None
+
+    def references(self, contract_id: str) -> int:
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM files WHERE contract_id = ?", (contract_id,)
+            ).fetchone()
+        return count
+
+    def begin(self, source: str, key: str, size: int, mtime_ns: int, contract_id: str) -> None:
+        """Checkpoint before ingesting: contract_id is partial until ``finish``."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO files (source, key, size, mtime_ns, status, pending_contract_id, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, key) DO UPDATE SET size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, status = excluded.status, "
+                "pending_contract_id = excluded.pending_contract_id, updated_at = excluded.updated_at",
+                (source, key, size, mtime_ns, PENDING, contract_id, time.time()),
+            )
+
+    def finish(
+        self, source: str, key: str, size: int, mtime_ns: int, sha256: str, contract_id: str
+    ) -> str | None:
+        """Mark a file ingested (or matched) as contract_id. Returns the contract it replaced."""
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT contract_id FROM files WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+            previous = row[0] if row and row[0] != contract_id else None
+            self._db.execute(
+                "INSERT INTO files (source, key, size, mtime_ns, sha256, status, contract_id, "
+                "stale_contract_id, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, key) DO UPDATE SET size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, sha256 = excluded.sha256, status = excluded.status, "
+                "attempts = 0, contract_id = excluded.contract_id, pending_contract_id = NULL, "
+                "stale_contract_id = excluded.stale_contract_id, error = NULL, "
+                "updated_at = excluded.updated_at",
+                (source, key, size, mtime_ns, sha256, DONE, contract_id, previous, time.time()),
+            )
+        return previous
+
+    def fail(self, source: str, key: str, size: int, mtime_ns: int, error: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO files (source, key, size, mtime_ns, status, attempts, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT (source, key) DO UPDATE SET size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, status = excluded.status, "
+                "attempts = attempts + 1, pending_contract_id = NULL, error = excluded.error, "
+                "updated_at = excluded.updated_at",
+                (source, key, size, mtime_ns, FAILED, error, time.time()),
+            )
+
+    def clear_stale(self, source: str, key: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE files SET stale_contract_id = NULL WHERE source = ? AND key = ?",
+                (source, key),
+            )
+
+    def recover(self, source: str) -> list[str]:
+        """Contract IDs left partial or superseded by an interrupted run, then reset them.
+
+        Pending rows fall back to their last finished state (or ``failed`` if
+        there was none), so the next scan retries them.
+        """
+        with self._lock, self._db:
+            rows = self._db.execute(
+                "SELECT pending_contract_id, stale_contract_id FROM files WHERE source = ? "
+                "AND (pending_contract_id IS NOT NULL OR stale_contract_id IS NOT NULL)",
+                (source,),
+            ).fetchall()
+            self._db.execute(
+                "UPDATE files SET status = CASE WHEN contract_id IS NULL THEN ? ELSE ? END, "
+                "pending_contract_id = NULL, stale_contract_id = NULL, "
+                # Stat no longer matches, so the file is re-checked
+                "mtime_ns = CASE WHEN pending_contract_id IS NULL THEN mtime_ns ELSE -1 END "
+                "WHERE source = ? AND (pending_contract_id IS NOT NULL OR stale_contract_id IS NOT NULL)",
+                (FAILED, DONE, source),
+            )
+        return [contract_id for row in rows for contract_id in row if contract_id]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = (".pdf", ".txt", ".text")
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(slots=True)
+class SourceFile:
+    key: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def filename(self) -> str:
+        return self.key.rsplit("/", 1)[-1]
+
+
+def sha256_file(path: str | os.PathLike) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Source(ABC):
+    """A place contracts are dropped into. ``name`` identifies it in the manifest."""
+
+    name: str
+
+    @abstractmethod
+    def scan(self) -> Iterator[SourceFile]:
+        """List supported files with their size and mtime. Must not read contents."""
+
+    @abstractmethod
+    @contextmanager
+    def fetch(self, file: SourceFile) -> Iterator[Path]:
+        """Yield a local path holding the file's contents for the duration of the block."""
+
+
+class DirectorySource(Source):
+    """A local or mounted directory, walked recursively."""
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root).resolve()
+        self.name = f"dir:{self.root}"
+
+    def scan(self) -> Iterator[SourceFile]:
+        # scandir reuses the stat from directory iteration where the OS provides it
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError as e:
+                logger.warning("Cannot list %s: %s", directory, e)
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.name.lower().endswith(SUPPORTED_SUFFIXES):
+                    st = entry.stat()
+                    key = Path(entry.path).relative_to(self.root).as_posix()
+                    yield SourceFile(key, st.st_size, st.st_mtime_ns)
+
+    @contextmanager
+    def fetch(self, file: SourceFile) -> Iterator[Path]:
+        yield self.root / file.key
+
+
+class S3Source(Source):
+    """An S3-compatible bucket (AWS, MinIO, ...). Requires the `s3` extra.
+
+    Credentials come from the usual boto3 chain (AWS_ACCESS_KEY_ID etc.).
+    Objects are downloaded to a temp file only when their size or
+    LastModified changed since the last scan.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = ""):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.name = f"s3://{bucket}/{prefix}"
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+
+    def scan(self) -> Iterator[SourceFile]:
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].lower().endswith(SUPPORTED_SUFFIXES):
+                    mtime_ns = int(obj["LastModified"].timestamp() * 1e9)
+                    yield SourceFile(obj["Key"], obj["Size"], mtime_ns)
+
+    @contextmanager
+    def fetch(self, file: SourceFile) -> Iterator[Path]:
+        suffix = os.path.splitext(file.key)[1].lower()
+        fd, tmp = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        try:
+            self._client.download_file(self.bucket, file.key, tmp)
+            yield Path(tmp)
+        finally:
+            os.unlink(tmp)
+
+
+def build_source(location: str, s3_endpoint_url: str = "") -> Source:
+    """``s3://bucket/prefix`` or a directory path."""
+    if location.startswith("s3://"):
+        bucket, _, prefix = location[len("s3://") :].partition("/")
+        return S3Source(bucket, prefix, s3_endpoint_url)
+    if not os.path.isdir(location):
+        raise ValueError(f"Not a directory: {location}")
+    return DirectorySource(location)
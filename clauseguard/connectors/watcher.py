@@ -0,0 +1,244 @@
+"""Watch a directory or bucket and ingest new or changed contracts.
+
+Usage:
+    clauseguard-watch DIRECTORY|s3://bucket/prefix [--once] [--interval 30]
+        [--concurrency 4] [--manifest data/connector-manifest.sqlite3]
+"""
+
+import argparse
+import asyncio
+import logging
+import uuid
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from clauseguard.agents.ingestion import IngestionAgent
+from clauseguard.connectors.manifest import DONE, Manifest, ManifestEntry
+from clauseguard.connectors.sources import Source, SourceFile, build_source, sha256_file
+from clauseguard.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ScanStats:
+    seen: int = 0
+    unchanged: int = 0
+    ingested: int = 0
+    duplicate: int = 0
+    failed: int = 0
+    replaced: int = 0
+
+
+class ConnectorWatcher:
+    """Diff a source against the manifest and feed new or changed files to ingestion.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read. Changed files are hashed first, so touched-but-identical files and
+    copies of already-ingested content cost no LLM calls. Copies found in the
+    same scan wait for the first one's ingest instead of running their own. At most
+    ``concurrency`` files are in flight; failures are retried on later scans
+    up to ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        manifest: Manifest,
+        agent: IngestionAgent,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+    ):
+        self.source = source
+        self.manifest = manifest
+        self.agent = agent
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+    async def recover(self) -> None:
+        """Undo writes from ingests that were interrupted by a crash."""
+        contract_ids = await asyncio.to_thread(self.manifest.recover, self.source.name)
+        for contract_id in contract_ids:
+            await self._delete_unreferenced(contract_id)
+        if contract_ids:
+            logger.info("Cleaned up %d contracts from an interrupted run", len(contract_ids))
+
+    async def scan_once(self) -> ScanStats:
+        stats = ScanStats()
+        with span("connector.scan", source=self.source.name):
+            files = await asyncio.to_thread(lambda: list(self.source.scan()))
+            entries = await asyncio.to_thread(self.manifest.entries, self.source.name)
+        stats.seen = len(files)
+        todo = [f for f in files if self._needs_check(f, entries.get(f.key))]
+        stats.unchanged = len(files) - len(todo)
+        logger.info("%s: %d files, %d new or changed", self.source.name, len(files), len(todo))
+
+        queue: asyncio.Queue[SourceFile] = asyncio.Queue()
+        for file in todo:
+            queue.put_nowait(file)
+        # sha256 -> contract ID of content being ingested during this scan
+        claims: dict[str, asyncio.Future[str]] = {}
+
+        async def worker() -> None:
+            while not queue.empty():
+                file = queue.get_nowait()
+                await self._process(file, entries.get(file.key), stats, claims)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(todo)))))
+        return stats
+
+    async def run(self, interval: float) -> None:
+        await self.recover()
+        while True:
+            stats = await self.scan_once()
+            logger.info("Scan finished: %s", stats)
+            await asyncio.sleep(interval)
+
+    def _needs_check(self, file: SourceFile, entry: ManifestEntry | None) -> bool:
+        if entry is None or (entry.size, entry.mtime_ns) != (file.size, file.mtime_ns):
+            return True
+        return entry.status != DONE and entry.attempts < self.max_attempts
+
+    async def _process(
+        self,
+        file: SourceFile,
+        entry: ManifestEntry | None,
+        stats: ScanStats,
+        claims: dict[str, asyncio.Future[str]],
+    ) -> None:
+        name = self.source.name
+        pending = claim = None
+        try:
+            with ExitStack() as stack:
+                # Entering may download the file, so keep it off the event loop
+                path = await asyncio.to_thread(stack.enter_context, self.source.fetch(file))
+                sha256 = await asyncio.to_thread(sha256_file, path)
+                if entry and entry.status == DONE and entry.sha256 == sha256:
+                    # Touched but identical: record the new stat only
+                    await asyncio.to_thread(
+                        self.manifest.finish, name, file.key, file.size, file.mtime_ns, sha256,
+                        entry.contract_id,
+                    )
+                    stats.unchanged += 1
+                    return
+
+                contract_id = await asyncio.to_thread(self.manifest.contract_for_hash, sha256)
+                while not contract_id and sha256 in claims:
+                    # Another file in this scan is ingesting the same content.
+                    # A failed ingest drops its claim, so this file takes over
+                    contract_id = await claims[sha256]
+                if contract_id:
+                    stats.duplicate += 1
+                else:
+                    claim = claims[sha256] = asyncio.get_running_loop().create_future()
+                    contract_id = pending = str(uuid.uuid4())
+                    await asyncio.to_thread(
+                        self.manifest.begin, name, file.key, file.size, file.mtime_ns, contract_id
+                    )
+                    with span("connector.ingest", key=file.key):
+                        await self.agent.ingest(
+                            path, file.filename, content_sha256=sha256, contract_id=contract_id
+                        )
+                    claim.set_result(contract_id)
+                    stats.ingested += 1
+        except Exception as e:
+            logger.exception("Failed to ingest %s from %s", file.key, name)
+            if pending:
+                # Undo a partial ingest now; if this is interrupted, recover() does it
+                await self.agent.delete(pending)
+            await asyncio.to_thread(
+                self.manifest.fail, name, file.key, file.size, file.mtime_ns, f"{type(e).__name__}: {e}"
+            )
+            stats.failed += 1
+            return
+        finally:
+            if claim is not None and not claim.done():
+                del claims[sha256]
+                claim.set_result("")
+
+        previous = await asyncio.to_thread(
+            self.manifest.finish, name, file.key, file.size, file.mtime_ns, sha256, contract_id
+        )
+        if previous:
+            await self._delete_unreferenced(previous)
+            await asyncio.to_thread(self.manifest.clear_stale, name, file.key)
+            stats.replaced += 1
+
+    async def _delete_unreferenced(self, contract_id: str) -> None:
+        """Delete a contract unless another manifest row still points at it."""
+        if await asyncio.to_thread(self.manifest.references, contract_id):
+            return
+        await self.agent.delete(contract_id)
+
+
+async def _build_agent() -> IngestionAgent:
+    """Wire an IngestionAgent the way the API process does."""
+    from clauseguard.config import settings
+    from clauseguard.services.claude_service import ClaudeService
+    from clauseguard.services.embedding_service import EmbeddingService
+    from clauseguard.services.pdf_service import PDFService
+    from clauseguard.services.scheduler import ComputeScheduler
+    from clauseguard.services.storage import build_storage_backend
+    from clauseguard.services.text_store import TextStore
+
+    embedding_service = EmbeddingService.shared(settings.embedding_model)
+    await asyncio.to_thread(embedding_service.load)
+    es_service = build_storage_backend()
+    await es_service.ensure_indices(embedding_service.dimension, embedding_service.vector_meta)
+    return IngestionAgent(
+        pdf_service=PDFService(),
+        claude_service=ClaudeService(),
+        embedding_service=embedding_service,
+        es_service=es_service,
+        extraction_mode=settings.extraction_mode,
+        extraction_window_chars=settings.extraction_window_chars,
+        scheduler=ComputeScheduler(workers=settings.compute_workers),
+        embed_chunk_size=settings.compute_bulk_chunk_size,
+        parse_chunk_pages=settings.compute_parse_chunk_pages,
+        dedup=settings.clause_dedup_enabled,
+        text_store=TextStore(
+            settings.text_store_dir,
+            block_chars=settings.text_store_block_chars,
+            level=settings.text_store_level,
+        ),
+    )
+
+
+async def _watch(args: argparse.Namespace) -> None:
+    from clauseguard.config import settings
+
+    source = build_source(args.location, settings.connector_s3_endpoint_url)
+    manifest = Manifest(args.manifest)
+    agent = await _build_agent()
+    watcher = ConnectorWatcher(source, manifest, agent, concurrency=args.concurrency)
+    try:
+        if args.once:
+            await watcher.recover()
+            stats = await watcher.scan_once()
+            logger.info("Scan finished: %s", stats)
+        else:
+            await watcher.run(args.interval)
+    finally:
+        await agent.es.close()
+        manifest.close()
+
+
+def main(argv=None) -> None:
+    from clauseguard.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("location", help="Directory to watch, or s3://bucket/prefix")
+    parser.add_argument("--once", action="store_true", help="Scan once and exit")
+    parser.add_argument("--interval", type=float, default=settings.connector_poll_seconds)
+    parser.add_argument("--concurrency", type=int, default=settings.connector_concurrency)
+    parser.add_argument("--manifest", default=settings.connector_manifest_path)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(_watch(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
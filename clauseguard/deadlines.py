@@ -0,0 +1,31 @@
+import time
+from contextvars import ContextVar
+
+# Absolute wall-clock deadline (epoch seconds) of the request being served
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before the work finished."""
+
+
+def set_deadline(deadline: float | None):
+    """Set the deadline for the current context; returns a token for reset_deadline()."""
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or None when there is none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.time()
+
+
+def check_deadline(stage: str = "") -> None:
+    """Raise DeadlineExceeded if the current deadline has already passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded{' before ' + stage if stage else ''}")
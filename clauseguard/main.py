@@ -1,59 +1,219 @@
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from clauseguard.agents.ingestion import IngestionAgent
-from clauseguard.agents.review import ReviewAgent
+from clauseguard.agents.review import CascadePolicy, ReviewAgent, RiskScorer
 from clauseguard.agents.search import SearchAgent
+from clauseguard.api import metrics
+from clauseguard.api.limits import UploadSizeLimitMiddleware
+from clauseguard.api.profiling import ProfilingMiddleware
 from clauseguard.api.router import api_router
 from clauseguard.config import settings
+from clauseguard.profiling import AttributingExecutor, ProfileStore, Sampler
 from clauseguard.services.claude_service import ClaudeService
-from clauseguard.services.elasticsearch_service import ElasticsearchService
 from clauseguard.services.embedding_service import EmbeddingService
 from clauseguard.services.pdf_service import PDFService
+from clauseguard.services.rerank_service import RerankService
+from clauseguard.services.scheduler import ComputeScheduler
+from clauseguard.services.search_cache import SearchCache
+from clauseguard.services.storage import VectorSpaceMismatch, build_storage_backend
+from clauseguard.services.text_store import TextStore
+from clauseguard.telemetry import HTTP_SECONDS, configure_tracing
+from clauseguard.templates.registry import TemplateRegistry, build_template_source
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
+PROFILING_ENABLED = settings.profile_sample_hz > 0 or bool(settings.admin_token)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Load models and connect to storage in the background, updating readiness as each finishes."""
+    readiness = app.state.readiness
+    loop = asyncio.get_running_loop()
+
+    embedding_service = app.state.search_agent.embedder
+    logger.info("Loading embedding model: %s", settings.embedding_model)
+    try:
+        await loop.run_in_executor(None, embedding_service.load)
+        readiness["embedding_model"] = "ready"
+        logger.info("Embedding model loaded (dim=%d)", embedding_service.dimension)
+    except Exception as e:
+        readiness["embedding_model"] = f"error: {e}"
+        logger.exception("Failed to load embedding model")
+
+    if settings.rerank_enabled:
+        logger.info("Loading rerank model: %s", settings.rerank_model)
+        try:
+            app.state.search_agent.reranker = await loop.run_in_executor(
+                None,
+                lambda: RerankService.shared(
+                    settings.rerank_model,
+                    batch_size=settings.rerank_batch_size,
+                    timeout_ms=settings.rerank_timeout_ms,
+                    cache_size=settings.rerank_cache_size,
+                ),
+            )
+            readiness["rerank_model"] = "ready"
+        except Exception as e:
+            readiness["rerank_model"] = f"error: {e}"
+            logger.exception("Failed to load rerank model")
+
+    # Keep retrying until the search backend is reachable
+    delay = 1.0
+    while True:
+        try:
+            await app.state.es_service.ensure_indices(
+                embedding_service.dimension,
+                embedding_service.vector_meta if embedding_service.ready else None,
+            )
+            readiness["storage"] = "ready"
+            logger.info("%s indices ready", settings.search_backend)
+            break
+        except VectorSpaceMismatch as e:
+            # Retrying cannot fix this; /ready stays 503 with the reason
+            readiness["storage"] = f"error: {e}"
+            logger.error("Search backend holds incompatible vectors: %s", e)
+            break
+        except Exception as e:
+            readiness["storage"] = f"unavailable: {e}"
+            logger.warning("Search backend not ready (%s), retrying in %.0fs", e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    # Needs the embedding model and, for the index source, storage
+    templates = app.state.review_agent.templates
+    try:
+        await templates.reload()
+        readiness["templates"] = "ready"
+    except Exception as e:
+        readiness["templates"] = f"error: {e}"
+        logger.exception("Failed to load templates, using the builtin set")
+    if settings.template_reload_seconds > 0:
+        app.state.template_watch_task = asyncio.create_task(
+            templates.watch(settings.template_reload_seconds)
+        )
+
+    logger.info("ClauseGuard is ready")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: load models, connect ES, create indices. Shutdown: close clients."""
-    logger.info("Loading embedding model: %s", settings.embedding_model)
-    embedding_service = EmbeddingService(settings.embedding_model)
-    logger.info("Embedding model loaded (dim=%d)", embedding_service.dimension)
+    """Startup: wire services and start background warm-up. Shutdown: close clients.
+
+    Construction is cheap; model loading and index setup happen in the
+    warm-up task so /health answers immediately and /ready flips once warm.
+    """
+    if settings.otel_enabled:
+        configure_tracing(settings.otel_service_name, settings.otel_exporter_endpoint)
+
+    sampler = None
+    if PROFILING_ENABLED:
+        loop = asyncio.get_running_loop()
+        # Tag to_thread workers with their request so their samples are attributed
+        loop.set_default_executor(AttributingExecutor())
+        sampler = Sampler(
+            loop,
+            hz=settings.profile_sample_hz,
+            request_hz=settings.profile_request_hz,
+            max_stacks=settings.profile_max_stacks,
+        )
+        sampler.start()
+    app.state.sampler = sampler
+    app.state.profile_store = ProfileStore(settings.profile_dir, keep=settings.profile_keep)
 
-    logger.info("Connecting to Elasticsearch: %s", settings.elasticsearch_url)
-    es_service = ElasticsearchService()
-    await es_service.ensure_indices()
-    logger.info("Elasticsearch indices ready")
+    embedding_service = EmbeddingService.shared(settings.embedding_model)
+    es_service = build_storage_backend()
+
+    search_cache = None
+    if settings.search_cache_enabled:
+        search_cache = SearchCache(
+            es_service.generation,
+            max_entries=settings.search_cache_max_entries,
+            max_bytes=settings.search_cache_max_bytes,
+            ttl_seconds=settings.search_cache_ttl_seconds,
+            shared_generation=es_service.shared_generation,
+        )
 
     pdf_service = PDFService()
     claude_service = ClaudeService()
+    text_store = TextStore(
+        settings.text_store_dir,
+        block_chars=settings.text_store_block_chars,
+        level=settings.text_store_level,
+    )
+    # One scheduler shared by both agents so search jumps ahead of ingestion
+    scheduler = ComputeScheduler(
+        workers=settings.compute_workers,
+        interactive_share=settings.compute_interactive_share,
+        bulk_share=settings.compute_bulk_share,
+    )
 
     # Wire up agents
     app.state.es_service = es_service
+    app.state.text_store = text_store
     app.state.ingestion_agent = IngestionAgent(
         pdf_service=pdf_service,
         claude_service=claude_service,
         embedding_service=embedding_service,
         es_service=es_service,
+        extraction_mode=settings.extraction_mode,
+        extraction_window_chars=settings.extraction_window_chars,
+        scheduler=scheduler,
+        embed_chunk_size=settings.compute_bulk_chunk_size,
+        parse_chunk_pages=settings.compute_parse_chunk_pages,
+        dedup=settings.clause_dedup_enabled,
+        text_store=text_store,
     )
     app.state.search_agent = SearchAgent(
         embedding_service=embedding_service,
         es_service=es_service,
+        rerank_top_n=settings.rerank_top_n,
+        cache=search_cache,
+        scheduler=scheduler,
+    )
+    templates = TemplateRegistry(
+        build_template_source(settings, es_service),
+        embedder=embedding_service,
+        scheduler=scheduler,
     )
     app.state.review_agent = ReviewAgent(
         claude_service=claude_service,
         es_service=es_service,
+        cascade=CascadePolicy.from_settings(settings),
+        scorer=RiskScorer.from_settings(settings),
+        summary_start_fraction=settings.summary_start_fraction,
+        summary_max_input_tokens=settings.summary_max_input_tokens,
+        templates=templates,
+        prescreen_similarity=settings.review_prescreen_similarity,
+        prescreen_requirement_similarity=settings.review_prescreen_requirement_similarity,
+        comparison_cache_size=settings.review_cache_size,
     )
 
-    logger.info("ClauseGuard is ready")
+    app.state.readiness = {
+        "embedding_model": "ready" if embedding_service.ready else "loading",
+        "storage": "connecting",
+        "llm": "configured" if claude_service.configured else "missing_api_key",
+        "templates": "loading",
+    }
+    if settings.rerank_enabled:
+        app.state.readiness["rerank_model"] = "loading"
+    app.state.template_watch_task = None
+    warm_up_task = asyncio.create_task(warm_up(app))
+
     yield
 
     # Shutdown
+    warm_up_task.cancel()
+    if app.state.template_watch_task is not None:
+        app.state.template_watch_task.cancel()
+    if sampler is not None:
+        sampler.stop()
     await es_service.close()
     logger.info("ClauseGuard shutdown complete")
 
@@ -65,6 +225,14 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Added first so it sits inside CORS (its 413s carry CORS headers) and still
+# rejects oversized uploads before the multipart parser buffers them
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    # Allow for multipart framing around the file part
+    max_bytes=settings.max_upload_bytes + 64 * 1024,
+    path_suffixes=("/contracts/upload",),
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -73,7 +241,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe request latency per route template into the HTTP histogram."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_SECONDS.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status)
+        ).observe(time.perf_counter() - start)
+
+
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, admin_token=settings.admin_token)
+
 app.include_router(api_router)
+app.include_router(metrics.router)
 
 
 def run():
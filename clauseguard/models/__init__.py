@@ -1,7 +1,7 @@
 from .clause import ClauseType, ExtractedClause
-from .contract import ContractMetadata, ContractUploadResponse
+from .contract import ContractMetadata, ContractText, ContractUploadResponse
 from .report import Severity, Finding, RiskReport
-from .search import SearchRequest, SearchHit, SearchResponse
+from .search import BatchSearchRequest, BatchSearchResponse, SearchRequest, SearchHit, SearchResponse
 from .template import ClauseTemplate
 
 __all__ = [
@@ -9,11 +9,14 @@ __all__ = [
     "ExtractedClause",
     "ContractMetadata",
     "ContractUploadResponse",
+    "ContractText",
     "Severity",
     "Finding",
     "RiskReport",
     "SearchRequest",
     "SearchHit",
     "SearchResponse",
+    "BatchSearchRequest",
+    "BatchSearchResponse",
     "ClauseTemplate",
 ]
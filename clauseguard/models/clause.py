@@ -25,3 +25,9 @@ class ExtractedClause(BaseModel):
     char_offset_start: int = Field(default=0, description="Character offset start in source")
     char_offset_end: int = Field(default=0, description="Character offset end in source")
     confidence: float = Field(default=0.0, ge=0.0, le=1.0, description="Extraction confidence")
+    alignment_score: float = Field(
+        default=1.0, ge=0.0, le=1.0, description="Quality of the match between clause text and source"
+    )
+    canonical_hash: str = Field(
+        default="", description="sha256 of the normalized text, shared by verbatim copies"
+    )
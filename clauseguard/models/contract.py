@@ -13,6 +13,7 @@ class ContractMetadata(BaseModel):
     num_clauses: int = 0
     clause_types_found: list[ClauseType] = Field(default_factory=list)
     text_length: int = 0
+    content_sha256: str = ""
 
 
 class ContractUploadResponse(BaseModel):
@@ -21,3 +22,11 @@ class ContractUploadResponse(BaseModel):
     num_clauses: int
     clause_types_found: list[ClauseType]
     message: str = "Contract ingested successfully"
+
+
+class ContractText(BaseModel):
+    contract_id: str
+    start: int = Field(description="Offset of the first returned character")
+    end: int = Field(description="Offset just past the last returned character")
+    text_length: int = Field(description="Length of the full contract text")
+    text: str
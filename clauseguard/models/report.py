@@ -16,11 +16,16 @@ class Finding(BaseModel):
     clause_type: ClauseType
     severity: Severity
     clause_text: str = Field(description="Actual clause text from contract")
-    template_text: str = Field(default="", description="Expected template text")
+    template_id: str = Field(default="", description="Template the clause was compared against")
+    template_text: str = Field(
+        default="", description="Expected template text (empty in compact reports, see RiskReport.templates)"
+    )
     deviation: str = Field(description="Description of how clause deviates from template")
     risk: str = Field(description="Potential risk from deviation")
     recommendation: str = Field(description="Suggested fix or action")
     confidence: float = Field(default=0.0, ge=0.0, le=1.0)
+    model: str = Field(default="", description="LLM that produced the final assessment")
+    escalated: bool = Field(default=False, description="Fast-model result was escalated to the main model")
 
 
 class RiskReport(BaseModel):
@@ -37,3 +42,16 @@ class RiskReport(BaseModel):
     num_high: int = 0
     num_medium: int = 0
     num_low: int = 0
+    num_escalated: int = 0
+    tenant: str = ""
+    template_version: str = Field(default="", description="Version of the template set reviewed against")
+    templates: dict[str, str] = Field(
+        default_factory=dict,
+        description="Template text by template_id; only filled in compact reports",
+    )
+
+    def compact_dump(self) -> dict:
+        """model_dump with each template's text listed once in ``templates``, not per finding."""
+        data = self.model_dump(exclude={"findings": {"__all__": {"template_text"}}})
+        data["templates"] = {f.template_id: f.template_text for f in self.findings if f.template_id}
+        return data
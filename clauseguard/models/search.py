@@ -12,6 +12,12 @@ class SearchRequest(BaseModel):
         default=None, description="Filter by contract IDs"
     )
     top_k: int = Field(default=10, ge=1, le=100, description="Number of results")
+    rerank: bool = Field(
+        default=True, description="Apply cross-encoder rerank when enabled on the server"
+    )
+    collapse_duplicates: bool = Field(
+        default=False, description="Return one hit per canonical clause text"
+    )
 
 
 class SearchHit(BaseModel):
@@ -20,12 +26,24 @@ class SearchHit(BaseModel):
     clause_type: ClauseType
     text: str
     score: float
+    rerank_score: float | None = None
     section_number: str = ""
     page_number: int = 1
     highlights: list[str] = Field(default_factory=list)
+    canonical_hash: str = ""
 
 
 class SearchResponse(BaseModel):
     query: str
     total_hits: int
     hits: list[SearchHit]
+
+
+class BatchSearchRequest(BaseModel):
+    searches: list[SearchRequest] = Field(
+        min_length=1, max_length=200, description="Searches to run in one batch"
+    )
+
+
+class BatchSearchResponse(BaseModel):
+    results: list[SearchResponse]
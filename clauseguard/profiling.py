@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType, FrameType
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 128
+PROFILE_ID_CHARS = frozenset("0123456789abcdef")
+_PACKAGE_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+@dataclass(slots=True, eq=False)
+class ProfileSession:
+    """Folded stacks sampled for one profiled request."""
+
+    profile_id: str
+    stacks: Counter = field(default_factory=Counter)
+    samples: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def folded(self) -> str:
+        """Collapsed-stack text, as read by flamegraph.pl, inferno and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+@dataclass(slots=True)
+class RequestContext:
+    """Per-request marker the sampler finds through the running task's context."""
+
+    scope: dict
+    session: ProfileSession | None = None
+
+    @property
+    def endpoint(self) -> str:
+        # Routing fills in scope["route"] after the context is created
+        route = self.scope.get("route")
+        return f"{self.scope.get('method', '')} {getattr(route, 'path', 'unmatched')}"
+
+
+_current: ContextVar[RequestContext | None] = ContextVar("clauseguard_request", default=None)
+# Worker threads running a job on behalf of a request; set by ComputeScheduler
+_thread_owners: dict[int, RequestContext] = {}
+
+
+def current() -> RequestContext | None:
+    return _current.get()
+
+
+def enter_request(ctx: RequestContext):
+    return _current.set(ctx)
+
+
+def exit_request(token) -> None:
+    _current.reset(token)
+
+
+def bind_thread(ctx: RequestContext) -> None:
+    _thread_owners[threading.get_ident()] = ctx
+
+
+def unbind_thread() -> None:
+    _thread_owners.pop(threading.get_ident(), None)
+
+
+def _run_bound(ctx: RequestContext, fn, /, *args, **kwargs):
+    bind_thread(ctx)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        unbind_thread()
+
+
+class AttributingExecutor(ThreadPoolExecutor):
+    """Default executor that tags worker threads with the submitting request.
+
+    ``asyncio.to_thread`` submits from the request's task, so work it runs
+    (embedded search, text store reads) is attributed like event-loop work.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        ctx = current()
+        if ctx is None:
+            return super().submit(fn, *args, **kwargs)
+        return super().submit(_run_bound, ctx, fn, *args, **kwargs)
+
+
+@lru_cache(maxsize=16384)
+def _label(code: CodeType) -> str:
+    path = code.co_filename
+    if "site-packages" + os.sep in path:
+        path = path.rsplit("site-packages" + os.sep, 1)[1]
+    elif path.startswith(_PACKAGE_ROOT):
+        path = path[len(_PACKAGE_ROOT) :]
+    elif path.startswith(_STDLIB):
+        path = path[len(_STDLIB) :]
+    return f"{code.co_qualname} ({path}:{code.co_firstlineno})"
+
+
+def fold(frame: FrameType | None) -> str:
+    """Root-first, semicolon-joined function labels for a thread's stack."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Sampler:
+    """Stdlib sampling profiler for the API process.
+
+    A daemon thread reads every thread's stack with ``sys._current_frames``.
+    Event-loop samples are attributed to the request whose task is running,
+    via the task's context; compute-thread samples to the request that
+    submitted the job. Samples with no request (idle loop, background
+    work) are dropped.
+
+    At ``hz`` it aggregates hot stacks per endpoint, bounded to
+    ``max_stacks`` distinct entries. While a request is being profiled it
+    samples at ``request_hz``, but still feeds the aggregate at ``hz``.
+    Samples are wall-clock, so a request waiting on I/O is not in the loop
+    thread's stacks, but a thread blocked in native code (model encode) is.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        hz: float = 10.0,
+        request_hz: float = 500.0,
+        max_stacks: int = 10000,
+    ):
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.hz = hz
+        self.request_hz = request_hz
+        self.max_stacks = max_stacks
+        self.hot: Counter = Counter()
+        self.hot_samples = 0
+        self.dropped = 0
+        self._sessions: set[ProfileSession] = set()
+        # Task.get_context is new in 3.12; without it only worker threads are attributed
+        self._task_contexts = hasattr(asyncio.Task, "get_context")
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if not self._task_contexts:
+            logger.warning("Event-loop samples need Python 3.12+; profiling worker threads only")
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def begin(self) -> ProfileSession:
+        session = ProfileSession(uuid.uuid4().hex)
+        self._sessions.add(session)
+        return session
+
+    def end(self, session: ProfileSession) -> None:
+        self._sessions.discard(session)
+
+    def hot_stacks(self, endpoint: str | None = None, limit: int = 50) -> list[tuple[str, str, int]]:
+        """(endpoint, folded stack, samples), most sampled first."""
+        items = [(e, s, n) for (e, s), n in list(self.hot.items()) if endpoint in (None, e)]
+        items.sort(key=lambda item: item[2], reverse=True)
+        return items[:limit]
+
+    def _run(self) -> None:
+        hot_interval = 1.0 / self.hz if self.hz > 0 else None
+        next_hot = time.monotonic()
+        while True:
+            if self._sessions:
+                interval = 1.0 / self.request_hz
+            elif hot_interval is not None:
+                interval = max(next_hot - time.monotonic(), 0.0)
+            else:
+                # Nothing to do until a request asks to be profiled
+                interval = 0.05
+            if self._stop.wait(interval):
+                return
+            now = time.monotonic()
+            record_hot = hot_interval is not None and now >= next_hot
+            if record_hot:
+                next_hot = now + hot_interval
+            if record_hot or self._sessions:
+                try:
+                    self._sample(record_hot)
+                except Exception:
+                    logger.exception("Profiler sample failed")
+
+    def _sample(self, record_hot: bool) -> None:
+        frames = sys._current_frames()
+        task = asyncio.current_task(self.loop) if self.loop.is_running() else None
+        me = threading.get_ident()
+        for ident, frame in frames.items():
+            if ident == me:
+                continue
+            if ident == self.loop_thread:
+                if task is None or not self._task_contexts:
+                    continue
+                ctx = task.get_context().get(_current)
+            else:
+                ctx = _thread_owners.get(ident)
+            if ctx is None:
+                continue
+            session = ctx.session
+            if session is not None and session not in self._sessions:
+                session = None
+            if session is None and not record_hot:
+                continue
+            stack = fold(frame)
+            if session is not None:
+                session.stacks[stack] += 1
+                session.samples += 1
+            if record_hot:
+                key = (ctx.endpoint, stack)
+                if key in self.hot or len(self.hot) < self.max_stacks:
+                    self.hot[key] += 1
+                    self.hot_samples += 1
+                else:
+                    self.dropped += 1
+
+
+class ProfileStore:
+    """Per-request profiles as folded-stack files, shared by all workers on a host."""
+
+    def __init__(self, root: str | os.PathLike, keep: int = 100):
+        self.root = Path(root)
+        self.keep = keep
+
+    def path(self, profile_id: str) -> Path:
+        if len(profile_id) != 32 or not PROFILE_ID_CHARS.issuperset(profile_id):
+            raise ValueError(f"Invalid profile ID: {profile_id!r}")
+        return self.root / f"{profile_id}.folded"
+
+    def save(self, session: ProfileSession) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(session.profile_id)
+        path.write_text(session.folded())
+        # Oldest first; keep the directory bounded
+        profiles = sorted(self.root.glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        for stale in profiles[: max(len(profiles) - self.keep, 0)]:
+            stale.unlink(missing_ok=True)
+        return path
+
+    def read(self, profile_id: str) -> str | None:
+        try:
+            return self.path(profile_id).read_text()
+        except (ValueError, FileNotFoundError):
+            return None
@@ -0,0 +1,145 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from clauseguard.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def plan_workers(cpu_count: int, workers: int = 0, torch_threads: int = 0) -> tuple[int, int]:
+    """Pick (workers, torch intra-op threads per worker) so the total matches the cores."""
+    workers = workers or max(1, cpu_count)
+    torch_threads = torch_threads or max(1, cpu_count // workers)
+    return workers, torch_threads
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(settings.backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _preload() -> None:
+    """Load models and shared state in the parent so forked workers share them copy-on-write.
+
+    The ``shared()`` instances created here are the ones each worker's
+    lifespan later looks up, so no worker loads its own copy of the weights.
+    """
+    from clauseguard.services.embedding_service import EmbeddingService
+    from clauseguard.services.search_cache import IndexGeneration
+
+    IndexGeneration.shared()
+    logger.info("Preloading embedding model: %s", settings.embedding_model)
+    EmbeddingService.shared(settings.embedding_model).load()
+    if settings.rerank_enabled:
+        from clauseguard.services.rerank_service import RerankService
+
+        logger.info("Preloading rerank model: %s", settings.rerank_model)
+        RerankService.shared(
+            settings.rerank_model,
+            batch_size=settings.rerank_batch_size,
+            timeout_ms=settings.rerank_timeout_ms,
+            cache_size=settings.rerank_cache_size,
+        )
+
+
+def _run_worker(sock: socket.socket, torch_threads: int) -> None:
+    import torch
+    import uvicorn
+
+    from clauseguard.main import app
+
+    torch.set_num_threads(torch_threads)
+    config = uvicorn.Config(app, log_level="info", timeout_graceful_shutdown=30)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, torch_threads: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 0
+        try:
+            _run_worker(sock, torch_threads)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve() -> None:
+    """Production entry point: pre-fork N uvicorn workers sharing one copy of the models."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    workers, torch_threads = plan_workers(
+        os.cpu_count() or 1, settings.workers, settings.torch_threads
+    )
+
+    # Thread pools and metric storage must be configured before torch and
+    # prometheus_client are first imported.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(torch_threads))
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    metrics_dir = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="clauseguard-metrics-")
+    )
+
+    _preload()
+    from clauseguard.main import app  # noqa: F401  (import once so workers inherit it)
+
+    sock = _bind_socket(settings.host, settings.port)
+    logger.info(
+        "Starting %d workers on %s:%d (%d torch threads each)",
+        workers, settings.host, settings.port, torch_threads,
+    )
+
+    # Move everything allocated so far out of GC tracking so collections in the
+    # workers do not touch (and un-share) the preloaded pages.
+    gc.collect()
+    gc.freeze()
+
+    children = {_spawn(sock, torch_threads) for _ in range(workers)}
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    from prometheus_client import multiprocess
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        multiprocess.mark_process_dead(pid, metrics_dir)
+        if not stopping:
+            logger.warning("Worker %d exited (status %d), restarting", pid, status)
+            time.sleep(1)
+            children.add(_spawn(sock, torch_threads))
+
+    sock.close()
+    logger.info("All workers stopped")
+    sys.exit(0)
@@ -0,0 +1,117 @@
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+
+WORD_RE = re.compile(r"\w+")
+
+# Typographic variants the LLM tends to normalize when echoing text
+CHAR_MAP = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "–": "-", "—": "-", "−": "-", " ": " ",
+})
+
+
+@dataclass(slots=True)
+class Alignment:
+    start: int
+    end: int
+    score: float
+
+
+def normalize(text: str) -> tuple[str, array]:
+    """Lowercase, unify quotes/dashes and collapse whitespace.
+
+    Returns the normalized text and a table mapping each normalized index
+    (plus one past the end) back to its offset in the original text.
+    """
+    chars: list[str] = []
+    offsets = array("i")
+    prev_space = True
+    for i, ch in enumerate(text.translate(CHAR_MAP)):
+        if ch.isspace():
+            if prev_space:
+                continue
+            ch = " "
+            prev_space = True
+        else:
+            prev_space = False
+        chars.append(ch.lower())
+        offsets.append(i)
+    offsets.append(len(text))
+    return "".join(chars), offsets
+
+
+class TextAligner:
+    """Aligns (possibly paraphrased) clause text to a source document.
+
+    Built once per document: the normalized text, a normalized-to-original
+    offset table and a hash map from word n-gram anchors to word positions.
+    Each alignment samples a bounded number of clause anchors and votes on
+    the source word offset, so cost does not grow with document length.
+    """
+
+    def __init__(self, source: str, anchor_words: int = 4, max_anchors: int = 48):
+        self.source = source
+        self.anchor_words = anchor_words
+        self.max_anchors = max_anchors
+        self.norm, self.offsets = normalize(source)
+        self.word_starts = array("i")
+        self.word_ends = array("i")
+        words = []
+        for m in WORD_RE.finditer(self.norm):
+            self.word_starts.append(m.start())
+            self.word_ends.append(m.end())
+            words.append(m.group(0))
+        self.anchors: dict[tuple[str, ...], list[int]] = {}
+        for i in range(len(words) - anchor_words + 1):
+            self.anchors.setdefault(tuple(words[i : i + anchor_words]), []).append(i)
+
+    def align(self, clause_text: str, hint: int = 0) -> Alignment:
+        """Locate clause_text in the source, preferring matches near the hint offset."""
+        clause_norm, _ = normalize(clause_text)
+        words = WORD_RE.findall(clause_norm)
+        k = self.anchor_words
+        if len(words) < k:
+            return self._align_short(clause_norm, clause_text, hint)
+
+        # Vote on the source word index where the clause starts
+        positions = range(len(words) - k + 1)
+        step = max(1, len(positions) // self.max_anchors)
+        sampled = positions[::step]
+        votes: Counter[int] = Counter()
+        for j in sampled:
+            for i in self.anchors.get(tuple(words[j : j + k]), ()):
+                votes[i - j] += 1
+        if not votes:
+            return Alignment(hint, hint + len(clause_text), 0.0)
+
+        hint_word = bisect_right(self.word_starts, self._to_norm(hint)) - 1
+        best_offset, best_votes = max(
+            votes.items(), key=lambda kv: (kv[1], -abs(kv[0] - hint_word))
+        )
+        first_word = max(best_offset, 0)
+        last_word = min(best_offset + len(words), len(self.word_starts)) - 1
+        start = self.offsets[self.word_starts[first_word]]
+        end = self.offsets[self.word_ends[last_word] - 1] + 1
+        return Alignment(start, end, min(best_votes / len(sampled), 1.0))
+
+    def _align_short(self, clause_norm: str, clause_text: str, hint: int) -> Alignment:
+        """Clauses too short for anchors: exact normalized search from the hint."""
+        if not clause_norm:
+            return Alignment(hint, hint, 0.0)
+        norm_hint = self._to_norm(hint)
+        idx = self.norm.find(clause_norm, norm_hint)
+        if idx == -1:
+            idx = self.norm.find(clause_norm)
+        if idx == -1:
+            return Alignment(hint, hint + len(clause_text), 0.0)
+        start = self.offsets[idx]
+        end = self.offsets[idx + len(clause_norm) - 1] + 1
+        return Alignment(start, end, 1.0)
+
+    def _to_norm(self, offset: int) -> int:
+        """Map an original offset to the nearest normalized offset."""
+        return max(bisect_right(self.offsets, offset) - 1, 0)
@@ -0,0 +1,19 @@
+import hashlib
+import re
+import unicodedata
+
+# Leading section numbers ("12.3", "Section 4.") differ between copies of the same boilerplate
+NUMBERING_RE = re.compile(r"^(?:section\s+)?\d+(?:\.\d+)*\.?\s+", re.IGNORECASE)
+QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+
+
+def normalize_clause_text(text: str) -> str:
+    """Canonical form of a clause: numbering stripped, case and whitespace folded."""
+    text = unicodedata.normalize("NFKC", text).translate(QUOTES)
+    text = " ".join(text.split())
+    return NUMBERING_RE.sub("", text).casefold()
+
+
+def canonical_hash(text: str) -> str:
+    """sha256 of the normalized clause text; equal for verbatim boilerplate copies."""
+    return hashlib.sha256(normalize_clause_text(text).encode()).hexdigest()
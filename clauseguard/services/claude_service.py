@@ -1,37 +1,14 @@
+import asyncio
 import json
 import logging
-import time
 
-import openai
-
-from clauseguard.config import settings
+from clauseguard.config import LLMEndpointSettings, settings
 from clauseguard.models.clause import ClauseType
+from clauseguard.services.llm_client import CircuitBreaker, LLMClient, LLMEndpoint, RetryBudget
+from clauseguard.services.segmentation import Span, render_spans, windows
 
 logger = logging.getLogger(__name__)
 
-MAX_RETRIES = 3
-RETRY_BASE_DELAY = 2.0
-
-
-def _call_with_retry(client: openai.OpenAI, model: str, max_tokens: int, messages: list) -> str:
-    """Call LLM API with exponential backoff retry on overloaded errors."""
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                max_tokens=max_tokens,
-                messages=messages,
-            )
-            return response.choices[0].message.content.strip()
-        except openai.APIStatusError as e:
-            if e.status_code in (429, 529) and attempt < MAX_RETRIES - 1:
-                delay = RETRY_BASE_DELAY * (2 ** attempt)
-                logger.warning("API overloaded, retrying in %.1fs (attempt %d/%d)", delay, attempt + 1, MAX_RETRIES)
-                time.sleep(delay)
-            else:
-                raise
-    raise RuntimeError("Unreachable")
-
 
 def _strip_markdown_fences(raw: str) -> str:
     """Strip markdown code fences from LLM response."""
@@ -60,11 +37,27 @@ CONTRACT TEXT:
 {contract_text}
 """
 
-COMPARE_CLAUSE_PROMPT = """\
-You are a legal compliance reviewer. Compare the following contract clause against the company-approved template.
+EXTRACT_SPANS_PROMPT = """\
+You are a legal contract analyst. The contract below has been split into numbered spans, each prefixed with its ID in square brackets.
 
-CONTRACT CLAUSE ({clause_type}):
-{clause_text}
+Identify all distinct legal clauses. A clause covers one span or a run of consecutive spans (include its heading span if it has one).
+
+For each clause, return a JSON object with:
+- "start_span": ID of the first span of the clause
+- "end_span": ID of the last span of the clause
+- "clause_type": one of {clause_types}
+- "confidence": your confidence in the classification (0.0 to 1.0)
+
+Do not repeat any contract text. Return a JSON array of clause objects. Only return valid JSON, no markdown fences or extra text.
+
+CONTRACT SPANS:
+{spans}
+"""
+
+# The template part comes first and is identical for every clause compared against
+# the same template, so provider-side prompt prefix caching can reuse it.
+COMPARE_CLAUSE_PROMPT = """\
+You are a legal compliance reviewer. Compare the contract clause at the end of this message against the company-approved template.
 
 COMPANY TEMPLATE:
 {template_text}
@@ -84,42 +77,135 @@ If the clause is fully compliant, set severity to "info" and deviation to "Claus
 Return only valid JSON, no markdown fences or extra text.
 """
 
+COMPARE_CLAUSE_INPUT = """
+CONTRACT CLAUSE ({clause_type}):
+{clause_text}
+"""
+
 SUMMARY_PROMPT = """\
-You are a legal risk analyst. Based on the following findings from a contract review, write a concise executive summary (2-4 sentences) and assign an overall risk score from 0.0 (no risk) to 10.0 (critical risk).
+You are a legal risk analyst. Based on the following findings from a contract review, write a concise executive summary (2-4 sentences) for a business reader.
 
 FINDINGS:
-{findings_json}
+{findings_digest}
 
 MISSING REQUIRED CLAUSES: {missing}
 
 Return a JSON object with:
 - "summary": the executive summary text
-- "overall_risk_score": a float from 0.0 to 10.0
 
 Return only valid JSON.
 """
 
+# Rough size of a token in English legal prose, for prompt budgeting
+CHARS_PER_TOKEN = 4
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2, "info": 3}
+
+
+def render_compare_prefix(template_text: str, requirements: list[str]) -> str:
+    """Template-specific head of the comparison prompt; precomputed once per template."""
+    return COMPARE_CLAUSE_PROMPT.format(
+        template_text=template_text,
+        requirements="\n".join(f"- {r}" for r in requirements),
+    )
+
+
+def findings_digest(findings: list[dict], max_tokens: int, pending: int = 0) -> str:
+    """Compact one-line-per-finding digest, most severe first, cut at a token budget.
+
+    Compliant (info) findings are only counted. Whole lines are dropped
+    rather than slicing mid-finding, and the omission is stated.
+    """
+    counts = {s: 0 for s in SEVERITY_ORDER}
+    for f in findings:
+        severity = f.get("severity", "medium")
+        counts[severity] = counts.get(severity, 0) + 1
+    header = ", ".join(f"{n} {s}" for s, n in counts.items()) + f" ({len(findings)} findings"
+    header += f"; {pending} clause reviews still running)" if pending else ")"
+
+    ranked = sorted(
+        (f for f in findings if f.get("severity") != "info"),
+        key=lambda f: (SEVERITY_ORDER.get(f.get("severity"), 1), -f.get("confidence", 0.0)),
+    )
+    lines = [header]
+    budget = max_tokens * CHARS_PER_TOKEN - len(header)
+    for i, f in enumerate(ranked):
+        line = (
+            f"- {f.get('severity', 'medium').upper()} {f.get('clause_type')} "
+            f"(confidence {f.get('confidence', 0.0):.2f}): {_clip(f.get('deviation', ''), 240)} "
+            f"Risk: {_clip(f.get('risk', ''), 160)}"
+        )
+        if len(line) + 1 > budget:
+            lines.append(f"- ...{len(ranked) - i} lower-priority findings omitted")
+            break
+        budget -= len(line) + 1
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
 
 class ClaudeService:
     """Wrapper around OpenAI-compatible API for clause extraction and review."""
 
-    def __init__(self, api_key: str | None = None, base_url: str | None = None, model: str | None = None):
-        self.client = openai.OpenAI(
-            api_key=api_key or settings.llm_api_key,
-            base_url=base_url or settings.llm_base_url,
-        )
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        model: str | None = None,
+        endpoints: list[LLMEndpointSettings] | None = None,
+    ):
+        """Explicit api_key/base_url use a single endpoint; otherwise LLM_ENDPOINTS, if set."""
         self.model = model or settings.llm_model
+        if endpoints is None:
+            endpoints = [] if api_key or base_url else settings.llm_endpoints
+        if not endpoints:
+            endpoints = [
+                LLMEndpointSettings(
+                    base_url=base_url or settings.llm_base_url,
+                    api_key=api_key or settings.llm_api_key,
+                    max_concurrency=settings.llm_max_concurrency,
+                )
+            ]
+        self.endpoints = endpoints
+        self.llm = LLMClient(
+            [
+                LLMEndpoint(
+                    e.base_url,
+                    e.api_key,
+                    name=e.name,
+                    weight=e.weight,
+                    requests_per_minute=e.requests_per_minute,
+                    max_concurrency=e.max_concurrency,
+                    breaker=CircuitBreaker(
+                        settings.llm_breaker_failure_threshold,
+                        settings.llm_breaker_reset_seconds,
+                    ),
+                )
+                for e in endpoints
+            ],
+            timeout_seconds=settings.llm_timeout_seconds,
+            hedge_quantile=settings.llm_hedge_quantile or None,
+            retry_budget=RetryBudget(settings.llm_retry_budget_ratio),
+        )
 
-    def extract_clauses(self, contract_text: str) -> list[dict]:
+    @property
+    def configured(self) -> bool:
+        return any(e.api_key and e.base_url for e in self.endpoints)
+
+    async def extract_clauses(self, contract_text: str) -> list[dict]:
         """Extract clauses from contract text using LLM."""
         clause_types = ", ".join(f'"{ct.value}"' for ct in ClauseType)
         prompt = EXTRACT_CLAUSES_PROMPT.format(
             clause_types=clause_types, contract_text=contract_text[:50000]
         )
 
-        raw = _call_with_retry(
-            self.client, self.model, 4096,
+        raw = await self.llm.complete(
+            self.model, 4096,
             [{"role": "user", "content": prompt}],
+            operation="extract_clauses",
         )
         raw = _strip_markdown_fences(raw)
 
@@ -135,24 +221,73 @@ class ClaudeService:
 
         return clauses
 
-    def compare_clause_to_template(
+    async def extract_clause_spans(
+        self, contract_text: str, spans: list[Span], window_chars: int = 50000
+    ) -> list[dict]:
+        """Classify pre-segmented spans into clauses; the LLM returns span IDs only.
+
+        Long contracts are split into windows that are sent concurrently;
+        clauses come back in window order.
+        """
+        clause_types = ", ".join(f'"{ct.value}"' for ct in ClauseType)
+        tasks = [
+            asyncio.ensure_future(self._extract_window(contract_text, window, clause_types))
+            for window in windows(spans, window_chars)
+        ]
+        try:
+            per_window = await asyncio.gather(*tasks)
+        finally:
+            # If one window's call fails, don't leave the others running
+            for task in tasks:
+                task.cancel()
+        return [clause for clauses in per_window for clause in clauses]
+
+    async def _extract_window(
+        self, contract_text: str, window: list[Span], clause_types: str
+    ) -> list[dict]:
+        prompt = EXTRACT_SPANS_PROMPT.format(
+            clause_types=clause_types, spans=render_spans(contract_text, window)
+        )
+        raw = await self.llm.complete(
+            self.model, 4096,
+            [{"role": "user", "content": prompt}],
+            operation="extract_clause_spans",
+        )
+        raw = _strip_markdown_fences(raw)
+
+        try:
+            parsed = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.error("Failed to parse LLM span extraction response: %s", raw[:500])
+            return []
+
+        if not isinstance(parsed, list):
+            logger.error("Expected list from LLM, got %s", type(parsed))
+            return []
+        return [c for c in parsed if isinstance(c, dict)]
+
+    async def compare_clause_to_template(
         self,
         clause_text: str,
         clause_type: str,
-        template_text: str,
-        requirements: list[str],
+        prompt_prefix: str,
+        model: str | None = None,
     ) -> dict:
-        """Compare a single clause against a template using LLM."""
-        prompt = COMPARE_CLAUSE_PROMPT.format(
-            clause_type=clause_type,
-            clause_text=clause_text,
-            template_text=template_text,
-            requirements="\n".join(f"- {r}" for r in requirements),
+        """Compare a single clause against a template using LLM (defaults to the main model).
+
+        ``prompt_prefix`` is the template's rendered head of the prompt, from
+        ``render_compare_prefix``; the clause is appended after it. An
+        unparseable reply returns a manual-review result with ``parse_failed``
+        set, which callers must not cache.
+        """
+        prompt = prompt_prefix + COMPARE_CLAUSE_INPUT.format(
+            clause_type=clause_type, clause_text=clause_text
         )
 
-        raw = _call_with_retry(
-            self.client, self.model, 2048,
+        raw = await self.llm.complete(
+            model or self.model, 2048,
             [{"role": "user", "content": prompt}],
+            operation="compare_clause",
         )
         raw = _strip_markdown_fences(raw)
 
@@ -166,28 +301,31 @@ class ClaudeService:
                 "risk": "Review manually",
                 "recommendation": "Manual review required",
                 "confidence": 0.0,
+                "parse_failed": True,
             }
 
-    def generate_report_summary(
-        self, findings: list[dict], missing_clauses: list[str]
-    ) -> dict:
-        """Generate executive summary and risk score from findings."""
+    async def generate_report_summary(
+        self,
+        findings: list[dict],
+        missing_clauses: list[str],
+        max_input_tokens: int = 1500,
+        pending: int = 0,
+    ) -> str:
+        """Generate an executive summary from a token-budgeted digest of the findings."""
         prompt = SUMMARY_PROMPT.format(
-            findings_json=json.dumps(findings, indent=2)[:10000],
+            findings_digest=findings_digest(findings, max_input_tokens, pending),
             missing=", ".join(missing_clauses) if missing_clauses else "None",
         )
 
-        raw = _call_with_retry(
-            self.client, self.model, 1024,
+        raw = await self.llm.complete(
+            self.model, 512,
             [{"role": "user", "content": prompt}],
+            operation="report_summary",
         )
         raw = _strip_markdown_fences(raw)
 
         try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
+            return json.loads(raw)["summary"]
+        except (json.JSONDecodeError, KeyError, TypeError):
             logger.error("Failed to parse LLM summary response: %s", raw[:500])
-            return {
-                "summary": "Unable to generate summary. Please review findings manually.",
-                "overall_risk_score": 5.0,
-            }
+            return "Unable to generate summary. Please review findings manually."
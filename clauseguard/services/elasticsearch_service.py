@@ -1,11 +1,21 @@
 import logging
 
 from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch.helpers import async_scan
 
 from clauseguard.config import settings
+from clauseguard.services.canonical import canonical_hash
+from clauseguard.services.search_cache import IndexGeneration
+from clauseguard.services.storage import StorageBackend
+from clauseguard.telemetry import record_es_took, span
 
 logger = logging.getLogger(__name__)
 
+
+class SearchError(RuntimeError):
+    """A BM25 or kNN search inside an _msearch failed."""
+
+
 CONTRACTS_MAPPINGS = {
     "properties": {
         "contract_id": {"type": "keyword"},
@@ -15,6 +25,7 @@ CONTRACTS_MAPPINGS = {
         "num_clauses": {"type": "integer"},
         "clause_types_found": {"type": "keyword"},
         "text_length": {"type": "integer"},
+        "content_sha256": {"type": "keyword"},
     }
 }
 
@@ -38,7 +49,7 @@ CLAUSES_MAPPINGS = {
         "text": {"type": "text", "analyzer": "legal_analyzer"},
         "text_embedding": {
             "type": "dense_vector",
-            "dims": 384,
+            "dims": 384,  # replaced by the embedder's output dims at index creation
             "index": True,
             "similarity": "cosine",
         },
@@ -47,58 +58,192 @@ CLAUSES_MAPPINGS = {
         "char_offset_start": {"type": "integer"},
         "char_offset_end": {"type": "integer"},
         "confidence": {"type": "float"},
+        "alignment_score": {"type": "float"},
+        "canonical_hash": {"type": "keyword"},
+    },
+    # Clauses live on their contract's shard, so per-contract operations hit one shard
+    "_routing": {"required": True},
+    # Vectors are kept once per canonical text in the canonical index, not per copy.
+    # So ES _reindex copies clauses without vectors; use copy_clauses_from instead.
+    "_source": {"excludes": ["text_embedding"]},
+}
+
+# One document holding the write counter that search caches in every process compare
+META_MAPPINGS = {"properties": {"value": {"type": "long"}}}
+GENERATION_DOC = "generation"
+
+CANONICAL_MAPPINGS = {
+    "properties": {
+        "canonical_hash": {"type": "keyword"},
+        # Stored for reuse at ingest only; kNN runs on the clauses index
+        "text_embedding": {"type": "dense_vector", "dims": 384, "index": False},
     }
 }
 
 
-class ElasticsearchService:
+class ElasticsearchService(StorageBackend):
     """Async Elasticsearch client for index management, CRUD, and hybrid search."""
 
     def __init__(self, es_url: str | None = None):
         self.es = AsyncElasticsearch(es_url or settings.elasticsearch_url)
         self.contracts_index = settings.es_contracts_index
         self.clauses_index = settings.es_clauses_index
+        self.canonical_index = settings.es_canonical_index
+        self.templates_index = settings.es_templates_index
+        self.meta_index = settings.es_meta_index
+        # False for clause indices created before routing by contract_id
+        self.routed = True
+        # Bumped after every write, along with the counter in meta_index that
+        # other processes see, so search caches never serve stale results
+        self.generation = IndexGeneration.shared()
 
-    async def ensure_indices(self) -> None:
-        """Create indices if they don't exist."""
+    async def ensure_indices(
+        self, vector_dims: int | None = None, vector_meta: dict | None = None
+    ) -> None:
+        """Create indices if they don't exist, sized for the embedder's vectors."""
         if not await self.es.indices.exists(index=self.contracts_index):
             await self.es.indices.create(
                 index=self.contracts_index, mappings=CONTRACTS_MAPPINGS
             )
             logger.info("Created index: %s", self.contracts_index)
 
-        if not await self.es.indices.exists(index=self.clauses_index):
-            await self.es.indices.create(
-                index=self.clauses_index,
-                settings=CLAUSES_SETTINGS,
-                mappings=CLAUSES_MAPPINGS,
+        existing = await self._ensure_vector_index(
+            self.clauses_index, CLAUSES_MAPPINGS, vector_dims, vector_meta, settings=CLAUSES_SETTINGS
+        )
+        if existing is not None:
+            self.routed = existing.get("_routing", {}).get("required", False)
+            if not self.routed:
+                logger.warning(
+                    "Index %s is not routed by contract_id; per-contract reads fan out "
+                    "to every shard until it is reindexed with `python -m "
+                    "clauseguard.services.reindex` (not ES _reindex, which drops the vectors)",
+                    self.clauses_index,
+                )
+
+        # Ingest reuses canonical vectors in new clause documents, so they must
+        # be in the same space as the clauses index
+        await self._ensure_vector_index(
+            self.canonical_index, CANONICAL_MAPPINGS, vector_dims, vector_meta
+        )
+
+        if not await self.es.indices.exists(index=self.meta_index):
+            await self.es.indices.create(index=self.meta_index, mappings=META_MAPPINGS)
+            logger.info("Created index: %s", self.meta_index)
+
+    async def shared_generation(self) -> int:
+        """Read the write counter document (a realtime GET, so no refresh is needed)."""
+        try:
+            resp = await self.es.get(index=self.meta_index, id=GENERATION_DOC)
+        except NotFoundError:
+            return 0
+        return resp["_source"]["value"]
+
+    async def _bump_generation(self) -> None:
+        self.generation.bump()
+        await self.es.update(
+            index=self.meta_index,
+            id=GENERATION_DOC,
+            script={"source": "ctx._source.value += 1", "lang": "painless"},
+            upsert={"value": 1},
+            retry_on_conflict=10,
+        )
+
+    async def _ensure_vector_index(
+        self,
+        index: str,
+        base_mappings: dict,
+        vector_dims: int | None,
+        vector_meta: dict | None,
+        **create_kwargs,
+    ) -> dict | None:
+        """Create a vector index in the embedder's space, or check an existing one against it.
+
+        Returns the existing index's mappings, or None if it was just created.
+        """
+        if not await self.es.indices.exists(index=index):
+            mappings = self._sized_mappings(base_mappings, vector_dims)
+            if vector_meta:
+                mappings["_meta"] = {"vectors": vector_meta}
+            await self.es.indices.create(index=index, mappings=mappings, **create_kwargs)
+            logger.info("Created index: %s", index)
+            return None
+
+        resp = await self.es.indices.get_mapping(index=index)
+        mappings = next(iter(resp.values()))["mappings"]
+        stored = mappings.get("_meta", {}).get("vectors")
+        self._check_vector_meta(
+            stored,
+            vector_meta,
+            f"Index {index}",
+            legacy_dims=mappings["properties"]["text_embedding"].get("dims"),
+        )
+        if vector_meta and not stored:
+            # Older index in the same space: record it so later changes are caught
+            await self.es.indices.put_mapping(
+                index=index, meta={**mappings.get("_meta", {}), "vectors": vector_meta}
             )
-            logger.info("Created index: %s", self.clauses_index)
+        return mappings
+
+    @staticmethod
+    def _sized_mappings(mappings: dict, vector_dims: int | None) -> dict:
+        """Copy of mappings with text_embedding sized to the embedder's output."""
+        mappings = {**mappings, "properties": dict(mappings["properties"])}
+        if vector_dims:
+            field = mappings["properties"]["text_embedding"]
+            mappings["properties"]["text_embedding"] = {**field, "dims": vector_dims}
+        return mappings
 
     async def index_contract(self, contract: dict) -> None:
         """Index a contract metadata document."""
-        await self.es.index(
-            index=self.contracts_index,
-            id=contract["contract_id"],
-            document=contract,
-        )
+        with span("es.index_contract"):
+            await self.es.index(
+                index=self.contracts_index,
+                id=contract["contract_id"],
+                document=contract,
+            )
+        await self._bump_generation()
 
     async def get_contract(self, contract_id: str) -> dict | None:
         """Get a contract by ID."""
         try:
-            resp = await self.es.get(index=self.contracts_index, id=contract_id)
+            with span("es.get_contract"):
+                resp = await self.es.get(index=self.contracts_index, id=contract_id)
             return resp["_source"]
         except NotFoundError:
             return None
 
+    async def delete_contract(self, contract_id: str) -> bool:
+        """Delete a contract and its clauses; the clause delete runs on one shard."""
+        with span("es.delete_contract"):
+            resp = await self.es.delete_by_query(
+                index=self.clauses_index,
+                query={"term": {"contract_id": contract_id}},
+                routing=self._routing(contract_id),
+                conflicts="proceed",
+                refresh=True,
+            )
+            logger.info("Deleted %d clauses of contract %s", resp["deleted"], contract_id)
+            try:
+                await self.es.delete(index=self.contracts_index, id=contract_id, refresh=True)
+                found = True
+            except NotFoundError:
+                found = False
+        await self._bump_generation()
+        return found
+
+    def _routing(self, *contract_ids: str) -> str | None:
+        return ",".join(contract_ids) if self.routed and contract_ids else None
+
     async def list_contracts(self) -> list[dict]:
         """List all contracts."""
-        resp = await self.es.search(
-            index=self.contracts_index,
-            query={"match_all": {}},
-            size=100,
-            sort=[{"upload_timestamp": {"order": "desc"}}],
-        )
+        with span("es.list_contracts"):
+            resp = await self.es.search(
+                index=self.contracts_index,
+                query={"match_all": {}},
+                size=100,
+                sort=[{"upload_timestamp": {"order": "desc"}}],
+            )
+        record_es_took("list_contracts", resp)
         return [hit["_source"] for hit in resp["hits"]["hits"]]
 
     async def bulk_index_clauses(self, clauses: list[dict]) -> int:
@@ -106,35 +251,166 @@ class ElasticsearchService:
         if not clauses:
             return 0
         operations = []
+        canonical: set[str] = set()
         for clause in clauses:
-            operations.append({"index": {"_index": self.clauses_index, "_id": clause["clause_id"]}})
+            action = {"_index": self.clauses_index, "_id": clause["clause_id"]}
+            if routing := self._routing(clause["contract_id"]):
+                action["routing"] = routing
+            operations.append({"index": action})
             operations.append(clause)
-        resp = await self.es.bulk(operations=operations, refresh="wait_for")
+            # First copy of a text registers its vector; `create` leaves existing entries alone
+            digest = clause.get("canonical_hash")
+            if digest and digest not in canonical:
+                canonical.add(digest)
+                operations.append({"create": {"_index": self.canonical_index, "_id": digest}})
+                operations.append(
+                    {"canonical_hash": digest, "text_embedding": clause["text_embedding"]}
+                )
+        with span("es.bulk_index_clauses", docs=len(clauses)):
+            resp = await self.es.bulk(operations=operations, refresh="wait_for")
+        record_es_took("bulk_index_clauses", resp)
         if resp.get("errors"):
             for item in resp["items"]:
-                if "error" in item.get("index", {}):
-                    logger.error("Bulk index error: %s", item["index"]["error"])
+                result = item.get("index") or item.get("create", {})
+                if "error" in result and result.get("status") != 409:
+                    logger.error("Bulk index error: %s", result["error"])
+        await self._bump_generation()
         return len(clauses)
 
+    async def get_canonical_embeddings(self, hashes: list[str]) -> dict[str, list[float]]:
+        """Fetch stored vectors for known canonical hashes in one mget."""
+        if not hashes:
+            return {}
+        with span("es.get_canonical_embeddings", hashes=len(hashes)):
+            resp = await self.es.mget(index=self.canonical_index, ids=hashes)
+        return {
+            doc["_id"]: doc["_source"]["text_embedding"]
+            for doc in resp["docs"]
+            if doc.get("found")
+        }
+
+    async def copy_clauses_from(self, source_index: str, batch_size: int = 500) -> tuple[int, int]:
+        """Copy clause documents from another index into this one, re-attaching vectors.
+
+        Vectors come from the source's ``_source`` where older indices still
+        keep them, else from the canonical index. Returns (copied, skipped);
+        clauses whose vector cannot be found are skipped.
+        """
+        copied = skipped = 0
+        batch: list[dict] = []
+
+        async def flush() -> None:
+            nonlocal copied, skipped
+            for doc in batch:
+                doc.setdefault("canonical_hash", canonical_hash(doc["text"]))
+            vectors = await self.get_canonical_embeddings(
+                list({d["canonical_hash"] for d in batch if "text_embedding" not in d})
+            )
+            docs = []
+            for doc in batch:
+                vector = doc.get("text_embedding") or vectors.get(doc["canonical_hash"])
+                if vector is None:
+                    skipped += 1
+                    continue
+                docs.append({**doc, "text_embedding": vector})
+            copied += await self.bulk_index_clauses(docs)
+            batch.clear()
+
+        with span("es.copy_clauses", source=source_index):
+            async for hit in async_scan(self.es, index=source_index, size=batch_size):
+                batch.append(hit["_source"])
+                if len(batch) >= batch_size:
+                    await flush()
+            if batch:
+                await flush()
+        return copied, skipped
+
+    async def list_templates(self) -> list[dict]:
+        """All template documents; the index is small and only read on reload."""
+        with span("es.list_templates"):
+            resp = await self.es.search(
+                index=self.templates_index,
+                query={"match_all": {}},
+                size=10000,
+                ignore_unavailable=True,
+            )
+        record_es_took("list_templates", resp)
+        return [hit["_source"] for hit in resp["hits"]["hits"]]
+
     async def get_clauses_by_contract(self, contract_id: str) -> list[dict]:
         """Get all clauses for a contract."""
-        resp = await self.es.search(
-            index=self.clauses_index,
-            query={"term": {"contract_id": contract_id}},
-            size=500,
-        )
+        with span("es.get_clauses_by_contract"):
+            resp = await self.es.search(
+                index=self.clauses_index,
+                query={"term": {"contract_id": contract_id}},
+                size=500,
+                routing=self._routing(contract_id),
+                # Indices created before vectors moved out of _source still store them there
+                source_excludes=["text_embedding"],
+            )
+        record_es_took("get_clauses_by_contract", resp)
         return [hit["_source"] for hit in resp["hits"]["hits"]]
 
-    async def hybrid_search_rrf(
-        self,
+    async def hybrid_search_rrf_batch(
+        self, queries: list[dict], rank_constant: int = 60
+    ) -> list[list[dict]]:
+        """Run BM25 + kNN for many queries in a single _msearch and fuse each with RRF.
+
+        Each query dict takes the keyword arguments of hybrid_search_rrf.
+        Raises SearchError if any retriever failed, rather than fusing partial hits.
+        """
+        if not queries:
+            return []
+
+        searches: list[dict] = []
+        for q in queries:
+            bm25_body, knn_body = self._build_hybrid_bodies(
+                q["query_text"],
+                q["query_vector"],
+                q.get("clause_types"),
+                q.get("contract_ids"),
+                q.get("top_k", 10),
+                q.get("collapse", False),
+            )
+            # Searches scoped to contracts only visit their shards; corpus-wide ones fan out
+            header = {"index": self.clauses_index}
+            if routing := self._routing(*(q.get("contract_ids") or ())):
+                header["routing"] = routing
+            searches.extend([header, bm25_body])
+            searches.extend([header, knn_body])
+
+        with span("es.msearch", queries=len(queries)):
+            resp = await self.es.msearch(searches=searches)
+        record_es_took("hybrid_search", resp)
+        responses = resp["responses"]
+
+        results = []
+        for i, q in enumerate(queries):
+            bm25_resp, knn_resp = responses[2 * i], responses[2 * i + 1]
+            for retriever, sub in (("bm25", bm25_resp), ("knn", knn_resp)):
+                if "error" in sub:
+                    raise SearchError(f"{retriever} search failed: {sub['error']}")
+            results.append(
+                self._fuse_rrf(
+                    bm25_resp.get("hits", {}).get("hits", []),
+                    knn_resp.get("hits", {}).get("hits", []),
+                    q.get("top_k", 10),
+                    rank_constant,
+                    q.get("collapse", False),
+                )
+            )
+        return results
+
+    @staticmethod
+    def _build_hybrid_bodies(
         query_text: str,
         query_vector: list[float],
-        clause_types: list[str] | None = None,
-        contract_ids: list[str] | None = None,
-        top_k: int = 10,
-        rank_constant: int = 60,
-    ) -> list[dict]:
-        """Hybrid BM25 + kNN search with manual Reciprocal Rank Fusion."""
+        clause_types: list[str] | None,
+        contract_ids: list[str] | None,
+        top_k: int,
+        collapse: bool = False,
+    ) -> tuple[dict, dict]:
+        """Build the BM25 and kNN search bodies for one hybrid query."""
         # Build filter clauses
         filters = []
         if clause_types:
@@ -163,49 +439,18 @@ class ElasticsearchService:
         if filters:
             knn_query["filter"] = {"bool": {"must": filters}}
 
-        # Run both searches
-        bm25_resp = await self.es.search(
-            index=self.clauses_index,
-            query=bm25_query,
-            size=top_k * 5,
-            highlight={
+        bm25_body = {
+            "query": bm25_query,
+            "size": top_k * 5,
+            "highlight": {
                 "fields": {"text": {"fragment_size": 200, "number_of_fragments": 3}}
             },
-        )
-
-        knn_resp = await self.es.search(
-            index=self.clauses_index,
-            knn=knn_query,
-            size=top_k * 5,
-        )
-
-        # Manual RRF: score = sum(1 / (rank_constant + rank)) for each retriever
-        rrf_scores: dict[str, float] = {}
-        doc_map: dict[str, dict] = {}
-        highlight_map: dict[str, list[str]] = {}
-
-        for rank, hit in enumerate(bm25_resp["hits"]["hits"]):
-            doc_id = hit["_id"]
-            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + 1.0 / (rank_constant + rank + 1)
-            doc_map[doc_id] = hit["_source"]
-            highlight_map[doc_id] = hit.get("highlight", {}).get("text", [])
-
-        for rank, hit in enumerate(knn_resp["hits"]["hits"]):
-            doc_id = hit["_id"]
-            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + 1.0 / (rank_constant + rank + 1)
-            if doc_id not in doc_map:
-                doc_map[doc_id] = hit["_source"]
-
-        # Sort by RRF score and take top_k
-        sorted_ids = sorted(rrf_scores, key=lambda x: rrf_scores[x], reverse=True)[:top_k]
-
-        results = []
-        for doc_id in sorted_ids:
-            doc = doc_map[doc_id]
-            doc["_score"] = rrf_scores[doc_id]
-            doc["highlights"] = highlight_map.get(doc_id, [])
-            results.append(doc)
-        return results
+        }
+        knn_body = {"knn": knn_query, "size": top_k * 5}
+        if collapse:
+            # One candidate per canonical text, so boilerplate copies don't fill the window
+            bm25_body["collapse"] = knn_body["collapse"] = {"field": "canonical_hash"}
+        return bm25_body, knn_body
 
     async def close(self) -> None:
         """Close the ES client."""
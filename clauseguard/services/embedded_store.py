@@ -0,0 +1,496 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from clauseguard.services.search_cache import IndexGeneration
+from clauseguard.services.storage import StorageBackend, VectorSpaceMismatch
+from clauseguard.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+# Lucene's English stop set, as applied by the `stop` filter in legal_analyzer
+STOPWORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such that the "
+    "their then there these they this to was will with".split()
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS contracts (
+    contract_id TEXT PRIMARY KEY,
+    upload_timestamp TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clauses (
+    id INTEGER PRIMARY KEY,
+    clause_id TEXT UNIQUE NOT NULL,
+    contract_id TEXT NOT NULL,
+    clause_type TEXT NOT NULL,
+    vector_row INTEGER,
+    doc TEXT NOT NULL
+);
+-- One vector row per distinct clause text; copies point their vector_row at it
+CREATE TABLE IF NOT EXISTS canonical (
+    canonical_hash TEXT PRIMARY KEY,
+    vector_row INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clauses_contract ON clauses (contract_id);
+CREATE INDEX IF NOT EXISTS clauses_type ON clauses (clause_type);
+-- legal_analyzer equivalent: unicode word tokens, lowercased and stemmed
+CREATE VIRTUAL TABLE IF NOT EXISTS clauses_fts USING fts5(text, tokenize = 'porter unicode61');
+"""
+
+# Run in every write transaction; search caches in all processes compare it
+BUMP_GENERATION = (
+    "INSERT INTO meta VALUES ('generation', 1) "
+    "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+)
+
+
+class EmbeddedSearchService(StorageBackend):
+    """In-process storage and hybrid search for single-node and test deployments.
+
+    Documents and a BM25 full-text index live in SQLite (FTS5). Clause vectors
+    are appended to a float32 file that is memory-mapped for brute-force
+    cosine kNN, so RAM use is bounded by the OS page cache rather than a heap.
+    Clauses with the same canonical_hash share one vector row.
+
+    Several processes may write to one store (pre-fork workers and
+    ``clauseguard-watch``). Writers take SQLite's write lock before
+    allocating vector rows from a counter kept in ``meta``, and an exclusive
+    ``flock`` while writing the vector file. Readers re-map the file when
+    this process's index generation or SQLite's ``data_version`` changes.
+    Every write transaction also bumps a ``generation`` counter in ``meta``
+    for search caches in other processes.
+    """
+
+    def __init__(self, data_dir: str | os.PathLike = "data"):
+        self.data_dir = Path(data_dir)
+        self.db_path = self.data_dir / "clauseguard.sqlite3"
+        self.vectors_path = self.data_dir / "vectors.f32"
+        self.generation = IndexGeneration.shared()
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._dims: int | None = None
+        self._matrix: np.ndarray | None = None
+        # Parallel arrays over all clauses: SQLite id and vector row
+        self._clause_ids: np.ndarray | None = None
+        self._clause_rows: np.ndarray | None = None
+        self._loaded_state: tuple[int, int] | None = None
+
+    async def ensure_indices(
+        self, vector_dims: int | None = None, vector_meta: dict | None = None
+    ) -> None:
+        await asyncio.to_thread(self._ensure_vector_meta, vector_dims, vector_meta)
+
+    async def index_contract(self, contract: dict) -> None:
+        with span("embedded.index_contract"):
+            await self._run(
+                "INSERT OR REPLACE INTO contracts (contract_id, upload_timestamp, doc) VALUES (?, ?, ?)",
+                (contract["contract_id"], contract.get("upload_timestamp"), json.dumps(contract)),
+                write=True,
+            )
+        self.generation.bump()
+
+    async def shared_generation(self) -> int:
+        rows = await self._run("SELECT value FROM meta WHERE key = 'generation'")
+        return int(rows[0][0]) if rows else 0
+
+    async def get_contract(self, contract_id: str) -> dict | None:
+        rows = await self._run(
+            "SELECT doc FROM contracts WHERE contract_id = ?", (contract_id,)
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    async def delete_contract(self, contract_id: str) -> bool:
+        with span("embedded.delete_contract"):
+            found = await asyncio.to_thread(self._delete_contract, contract_id)
+        self.generation.bump()
+        return found
+
+    async def list_contracts(self) -> list[dict]:
+        rows = await self._run(
+            "SELECT doc FROM contracts ORDER BY upload_timestamp DESC LIMIT 100"
+        )
+        return [json.loads(doc) for (doc,) in rows]
+
+    async def bulk_index_clauses(self, clauses: list[dict]) -> int:
+        if not clauses:
+            return 0
+        with span("embedded.bulk_index_clauses", docs=len(clauses)):
+            await asyncio.to_thread(self._index_clauses, clauses)
+        self.generation.bump()
+        return len(clauses)
+
+    async def get_canonical_embeddings(self, hashes: list[str]) -> dict[str, list[float]]:
+        if not hashes:
+            return {}
+        return await asyncio.to_thread(self._canonical_embeddings, hashes)
+
+    async def get_clauses_by_contract(self, contract_id: str) -> list[dict]:
+        rows = await self._run(
+            "SELECT doc FROM clauses WHERE contract_id = ? ORDER BY id LIMIT 500", (contract_id,)
+        )
+        return [json.loads(doc) for (doc,) in rows]
+
+    async def hybrid_search_rrf_batch(
+        self, queries: list[dict], rank_constant: int = 60
+    ) -> list[list[dict]]:
+        if not queries:
+            return []
+        with span("embedded.search", queries=len(queries)):
+            return await asyncio.to_thread(self._search_batch, queries, rank_constant)
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # -- Synchronous internals, run in a worker thread --
+
+    def _connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._db is None:
+                self.data_dir.mkdir(parents=True, exist_ok=True)
+                # Writers in other processes hold the write lock for one batch at most
+                db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30.0)
+                db.execute("PRAGMA journal_mode = WAL")
+                db.execute("PRAGMA synchronous = NORMAL")
+                db.executescript(SCHEMA)
+                row = db.execute("SELECT value FROM meta WHERE key = 'dims'").fetchone()
+                self._dims = int(row[0]) if row else None
+                self._db = db
+                logger.info("Opened embedded search store at %s", self.data_dir)
+            return self._db
+
+    def _ensure_vector_meta(self, vector_dims: int | None, vector_meta: dict | None) -> None:
+        db = self._connect()
+        with self._lock, db:
+            if vector_dims and self._dims and vector_dims != self._dims:
+                raise VectorSpaceMismatch(
+                    f"Store {self.data_dir} holds {self._dims}-dim vectors but the embedder "
+                    f"produces {vector_dims}; re-index or restore the matching projection"
+                )
+            row = db.execute("SELECT value FROM meta WHERE key = 'vectors'").fetchone()
+            if row:
+                self._check_vector_meta(json.loads(row[0]), vector_meta, f"Store {self.data_dir}")
+            elif vector_meta:
+                # Vectors written before the metadata existed came straight from the model
+                self._check_vector_meta(
+                    None, vector_meta, f"Store {self.data_dir}", legacy_dims=self._dims
+                )
+                db.execute(
+                    "INSERT INTO meta VALUES ('vectors', ?)", (json.dumps(vector_meta),)
+                )
+
+    async def _run(self, sql: str, params: tuple = (), write: bool = False) -> list[tuple]:
+        return await asyncio.to_thread(self._execute, sql, params, write)
+
+    def _execute(self, sql: str, params: tuple = (), write: bool = False) -> list[tuple]:
+        db = self._connect()
+        with self._lock, db:
+            rows = db.execute(sql, params).fetchall()
+            if write:
+                db.execute(BUMP_GENERATION)
+            return rows
+
+    def _index_clauses(self, clauses: list[dict]) -> None:
+        db = self._connect()
+        vectors = np.asarray([c["text_embedding"] for c in clauses], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        with self._lock, db:
+            # Take the write lock up front: other processes allocate rows from the same counter
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT value FROM meta WHERE key = 'dims'").fetchone()
+            self._dims = int(row[0]) if row else None
+            if self._dims is None:
+                self._dims = vectors.shape[1]
+                db.execute("INSERT INTO meta VALUES ('dims', ?)", (str(self._dims),))
+            elif vectors.shape[1] != self._dims:
+                raise ValueError(
+                    f"Embedding has {vectors.shape[1]} dims, store expects {self._dims}"
+                )
+
+            # Vectors are append-only; a re-indexed clause orphans its old row
+            first_row = next_row = self._next_vector_row(db)
+            vector_rows, new = [], []
+            known = self._canonical_rows(db, [c.get("canonical_hash") for c in clauses])
+            for i, clause in enumerate(clauses):
+                digest = clause.get("canonical_hash")
+                if digest and digest in known:
+                    vector_rows.append(known[digest])
+                    continue
+                if digest:
+                    cur = db.execute(
+                        "INSERT OR IGNORE INTO canonical VALUES (?, ?)", (digest, next_row)
+                    )
+                    if not cur.rowcount:
+                        # Registered by another writer since the lookup: share its row
+                        known[digest] = db.execute(
+                            "SELECT vector_row FROM canonical WHERE canonical_hash = ?", (digest,)
+                        ).fetchone()[0]
+                        vector_rows.append(known[digest])
+                        continue
+                    known[digest] = next_row
+                vector_rows.append(next_row)
+                new.append(i)
+                next_row += 1
+            if new:
+                self._write_vectors(first_row, vectors[new])
+                db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('vector_rows', ?)", (str(next_row),)
+                )
+
+            for clause, vector_row in zip(clauses, vector_rows):
+                doc = {k: v for k, v in clause.items() if k != "text_embedding"}
+                old = db.execute(
+                    "SELECT id FROM clauses WHERE clause_id = ?", (clause["clause_id"],)
+                ).fetchone()
+                if old:
+                    db.execute("DELETE FROM clauses_fts WHERE rowid = ?", old)
+                    db.execute("DELETE FROM clauses WHERE id = ?", old)
+                cur = db.execute(
+                    "INSERT INTO clauses (clause_id, contract_id, clause_type, vector_row, doc) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        clause["clause_id"],
+                        clause["contract_id"],
+                        clause["clause_type"],
+                        vector_row,
+                        json.dumps(doc),
+                    ),
+                )
+                db.execute(
+                    "INSERT INTO clauses_fts (rowid, text) VALUES (?, ?)",
+                    (cur.lastrowid, clause["text"]),
+                )
+            db.execute(BUMP_GENERATION)
+
+    def _next_vector_row(self, db: sqlite3.Connection) -> int:
+        """First unallocated vector row; call inside the write transaction."""
+        row = db.execute("SELECT value FROM meta WHERE key = 'vector_rows'").fetchone()
+        if row:
+            return int(row[0])
+        # Stores written before the counter existed: every row in the file is allocated
+        if self.vectors_path.exists():
+            return self.vectors_path.stat().st_size // (4 * self._dims)
+        return 0
+
+    def _write_vectors(self, first_row: int, vectors: np.ndarray) -> None:
+        """Write rows at their allocated offset, overwriting any left by an uncommitted batch."""
+        data = memoryview(vectors.tobytes())
+        offset = first_row * 4 * self._dims
+        fd = os.open(self.vectors_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            while data:
+                written = os.pwrite(fd, data, offset)
+                data, offset = data[written:], offset + written
+        finally:
+            # Closing releases the flock
+            os.close(fd)
+
+    def _delete_contract(self, contract_id: str) -> bool:
+        db = self._connect()
+        with self._lock, db:
+            # Vector rows stay: they may be shared through the canonical table
+            db.execute(
+                "DELETE FROM clauses_fts WHERE rowid IN "
+                "(SELECT id FROM clauses WHERE contract_id = ?)",
+                (contract_id,),
+            )
+            db.execute("DELETE FROM clauses WHERE contract_id = ?", (contract_id,))
+            cur = db.execute("DELETE FROM contracts WHERE contract_id = ?", (contract_id,))
+            db.execute(BUMP_GENERATION)
+            return cur.rowcount > 0
+
+    @staticmethod
+    def _canonical_rows(db: sqlite3.Connection, hashes: list[str | None]) -> dict[str, int]:
+        hashes = list({h for h in hashes if h})
+        rows: dict[str, int] = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start : start + 500]
+            rows.update(
+                db.execute(
+                    "SELECT canonical_hash, vector_row FROM canonical "
+                    f"WHERE canonical_hash IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            )
+        return rows
+
+    def _canonical_embeddings(self, hashes: list[str]) -> dict[str, list[float]]:
+        db = self._connect()
+        with self._lock:
+            rows = self._canonical_rows(db, hashes)
+            if not rows:
+                return {}
+            self._refresh_vectors(db)
+            if self._matrix is None:
+                return {}
+            return {
+                digest: self._matrix[row].tolist()
+                for digest, row in rows.items()
+                if row < len(self._matrix)
+            }
+
+    def _search_batch(self, queries: list[dict], rank_constant: int) -> list[list[dict]]:
+        db = self._connect()
+        with self._lock:
+            self._refresh_vectors(db)
+            results = []
+            for q in queries:
+                size = q.get("top_k", 10) * 5
+                where, params = self._filter_sql(q.get("clause_types"), q.get("contract_ids"))
+                collapse = q.get("collapse", False)
+                bm25_hits = self._bm25(db, q["query_text"], where, params, size, collapse)
+                knn_hits = self._knn(db, q["query_vector"], where, params, size, collapse)
+                results.append(
+                    self._fuse_rrf(
+                        bm25_hits, knn_hits, q.get("top_k", 10), rank_constant, collapse
+                    )
+                )
+        return results
+
+    @staticmethod
+    def _filter_sql(
+        clause_types: list[str] | None, contract_ids: list[str] | None
+    ) -> tuple[str, list]:
+        conditions, params = [], []
+        if clause_types:
+            conditions.append(f"c.clause_type IN ({','.join('?' * len(clause_types))})")
+            params.extend(clause_types)
+        if contract_ids:
+            conditions.append(f"c.contract_id IN ({','.join('?' * len(contract_ids))})")
+            params.extend(contract_ids)
+        return " AND ".join(conditions), params
+
+    @staticmethod
+    def _match_expression(query_text: str) -> str:
+        """OR of the query's non-stopword tokens, quoted so FTS5 syntax is never interpreted."""
+        terms = dict.fromkeys(
+            t for t in TOKEN_RE.findall(query_text.lower()) if t not in STOPWORDS
+        )
+        return " OR ".join(f'"{t}"' for t in terms)
+
+    def _bm25(
+        self,
+        db: sqlite3.Connection,
+        query_text: str,
+        where: str,
+        params: list,
+        size: int,
+        collapse: bool = False,
+    ) -> list[dict]:
+        match = self._match_expression(query_text)
+        if not match:
+            return []
+        sql = (
+            "SELECT c.clause_id AS clause_id, c.doc AS doc, "
+            "snippet(clauses_fts, 0, '<em>', '</em>', '...', 32) AS snippet, "
+            "bm25(clauses_fts) AS score, c.vector_row AS vector_row "
+            "FROM clauses_fts JOIN clauses c ON c.id = clauses_fts.rowid "
+            f"WHERE clauses_fts MATCH ? {'AND ' + where if where else ''}"
+        )
+        if collapse:
+            # Copies share a vector row; SQLite takes the other columns from the MIN(score) row
+            # (materialized, since FTS5 auxiliary functions can't run inside an aggregate)
+            sql = (
+                f"WITH m AS MATERIALIZED ({sql}) "
+                "SELECT clause_id, doc, snippet, MIN(score) AS score FROM m GROUP BY vector_row"
+            )
+        rows = db.execute(f"{sql} ORDER BY score LIMIT ?", (match, *params, size)).fetchall()
+        return [
+            {"_id": clause_id, "_source": json.loads(doc), "highlight": {"text": [snippet]}}
+            for clause_id, doc, snippet, *_ in rows
+        ]
+
+    def _knn(
+        self,
+        db: sqlite3.Connection,
+        vector: list[float],
+        where: str,
+        params: list,
+        size: int,
+        collapse: bool = False,
+    ) -> list[dict]:
+        if self._matrix is None or not len(self._matrix):
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+
+        if where:
+            pairs = np.asarray(
+                db.execute(f"SELECT c.id, c.vector_row FROM clauses c WHERE {where}", params).fetchall(),
+                dtype=np.int64,
+            ).reshape(-1, 2)
+            clause_ids, rows = pairs[:, 0], pairs[:, 1]
+        else:
+            clause_ids, rows = self._clause_ids, self._clause_rows
+        valid = rows < len(self._matrix)
+        clause_ids, rows = clause_ids[valid], rows[valid]
+        if collapse:
+            rows, first = np.unique(rows, return_index=True)
+            clause_ids = clause_ids[first]
+        if not len(rows):
+            return []
+
+        if where:
+            sims = self._matrix[rows] @ query
+        else:
+            # Score every stored vector once; copies of a clause share a row
+            sims = (self._matrix @ query)[rows]
+        k = min(size, len(rows))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        ids = [int(clause_ids[i]) for i in top]
+
+        docs = dict(
+            db.execute(
+                f"SELECT id, doc FROM clauses WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        )
+        hits = []
+        for db_id in ids:
+            if db_id in docs:
+                doc = json.loads(docs[db_id])
+                hits.append({"_id": doc["clause_id"], "_source": doc})
+        return hits
+
+    def _refresh_vectors(self, db: sqlite3.Connection) -> None:
+        """Re-map the vector file and row → clause table after any write (from any process).
+
+        Writes through this connection bump the generation; commits from other
+        connections, including other processes, change ``data_version``.
+        """
+        state = (self.generation.value, db.execute("PRAGMA data_version").fetchone()[0])
+        if state == self._loaded_state and self._matrix is not None:
+            return
+        if self._dims is None:
+            row = db.execute("SELECT value FROM meta WHERE key = 'dims'").fetchone()
+            self._dims = int(row[0]) if row else None
+        if self._dims is None or not self.vectors_path.exists():
+            self._matrix = None
+            return
+        n_rows = self.vectors_path.stat().st_size // (4 * self._dims)
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r", shape=(n_rows, self._dims)
+        ) if n_rows else np.empty((0, self._dims), dtype=np.float32)
+        pairs = np.asarray(
+            db.execute("SELECT id, vector_row FROM clauses WHERE vector_row IS NOT NULL").fetchall(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        self._clause_ids, self._clause_rows = pairs[:, 0], pairs[:, 1]
+        self._loaded_state = state
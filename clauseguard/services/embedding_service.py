@@ -1,26 +1,124 @@
-import numpy as np
-from sentence_transformers import SentenceTransformer
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from clauseguard.config import settings
+from clauseguard.telemetry import EMBEDDING_BATCH_SIZE, span
+
+if TYPE_CHECKING:
+    from clauseguard.services.projection import Projection
 
 
 class EmbeddingService:
-    """Local embedding service using sentence-transformers."""
+    """Local embedding service using sentence-transformers.
+
+    The model (and torch) is loaded on `load()` or first use, so the service
+    can be constructed during startup without blocking. With ``dims`` set,
+    vectors are reduced by a fitted PCA projection or Matryoshka truncation.
+    """
+
+    _shared: dict[str, "EmbeddingService"] = {}
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        lazy: bool = False,
+        dims: int = 0,
+        projection: str = "pca",
+        projection_path: str = "",
+    ):
+        self.model_name = model_name
+        self.model = None
+        self.dimension: int | None = None
+        self.requested_dims = dims
+        self.projection_method = projection
+        self.projection_path = projection_path
+        self.projection: "Projection | None" = None
+        self._load_lock = threading.Lock()
+        if not lazy:
+            self.load()
+
+    @classmethod
+    def shared(cls, model_name: str) -> "EmbeddingService":
+        """The one lazily loaded instance for ``model_name``, with projection settings from config.
+
+        API workers, the watcher and the template registry all embed through
+        it, so the model is loaded once per process (see ``server._preload``).
+        """
+        if model_name not in cls._shared:
+            cls._shared[model_name] = cls(
+                model_name,
+                lazy=True,
+                dims=settings.embedding_dims,
+                projection=settings.embedding_projection,
+                projection_path=settings.embedding_projection_path,
+            )
+        return cls._shared[model_name]
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> None:
+        """Import sentence-transformers and load the model (idempotent, thread-safe)."""
+        with self._load_lock:
+            if self.model is not None:
+                return
+            from sentence_transformers import SentenceTransformer
+
+            with span("embedding.load_model", model=self.model_name):
+                model = SentenceTransformer(self.model_name)
+            input_dims = model.get_sentence_embedding_dimension()
+            self.projection = self._load_projection(input_dims)
+            self.dimension = self.projection.dims if self.projection else input_dims
+            self.model = model
+
+    @property
+    def vector_meta(self) -> dict:
+        """Identifies the vector space, so indices built with another one are detected."""
+        return {
+            "embedding_model": self.model_name,
+            "dims": self.dimension,
+            "projection": self.projection.version if self.projection else "none",
+        }
+
+    def _load_projection(self, input_dims: int) -> "Projection | None":
+        if not self.requested_dims or self.requested_dims >= input_dims:
+            return None
+        from clauseguard.services.projection import Projection
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
-        self.dimension = self.model.get_sentence_embedding_dimension()
+        if self.projection_method == "truncate":
+            return Projection.truncate(input_dims, self.requested_dims)
+        if not self.projection_path or not Path(self.projection_path).exists():
+            raise FileNotFoundError(
+                f"No PCA projection at {self.projection_path!r}; fit one with "
+                "`python -m clauseguard.services.projection`"
+            )
+        projection = Projection.load(self.projection_path)
+        if (projection.input_dims, projection.dims) != (input_dims, self.requested_dims):
+            raise ValueError(
+                f"Projection {projection.version} maps {projection.input_dims}->{projection.dims} "
+                f"dims, expected {input_dims}->{self.requested_dims}"
+            )
+        return projection
 
     def encode(self, text: str) -> list[float]:
         """Encode a single text string into a vector."""
-        embedding = self.model.encode(text, normalize_embeddings=True)
-        return embedding.tolist()
+        return self.encode_batch([text])[0]
 
-    def encode_batch(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
-        """Encode a batch of texts into vectors."""
+    def encode_batch(
+        self, texts: list[str], batch_size: int = 32, project: bool = True
+    ) -> list[list[float]]:
+        """Encode a batch of texts into vectors (full model dims if project=False)."""
         if not texts:
             return []
-        embeddings = self.model.encode(
-            texts, batch_size=batch_size, normalize_embeddings=True
-        )
-        if isinstance(embeddings, np.ndarray):
-            return embeddings.tolist()
-        return [e.tolist() for e in embeddings]
+        if self.model is None:
+            self.load()
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        with span("embedding.encode", batch_size=len(texts)):
+            embeddings = self.model.encode(
+                texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True
+            )
+            if project and self.projection is not None:
+                embeddings = self.projection.apply(embeddings)
+        return embeddings.tolist()
@@ -0,0 +1,417 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from functools import cached_property
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from clauseguard.deadlines import DeadlineExceeded, remaining
+from clauseguard.telemetry import (
+    LLM_CALLS,
+    LLM_ENDPOINT_REQUESTS,
+    LLM_HEDGES,
+    LLM_RETRIES,
+    LLM_TOKENS,
+    span,
+)
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 2.0
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504, 529})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the LLM while every endpoint's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through after a cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    @property
+    def available(self) -> bool:
+        """Whether allow() would let a request through, without claiming the probe."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._probing)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give back the half-open probe without an outcome (cancelled or unexpected error)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                logger.warning("LLM circuit breaker opened after %d failures", self.failures)
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class RetryBudget:
+    """Token bucket capping retries and hedges to a fraction of successful calls.
+
+    Each success deposits ``ratio`` tokens and each retry or hedge spends one,
+    so a degraded endpoint cannot be hit with a multiple of normal traffic.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class RateLimiter:
+    """Requests-per-minute token bucket with one second of burst; 0 disables it."""
+
+    def __init__(self, requests_per_minute: float = 0):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """Seconds until a request could be admitted."""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    async def acquire(self) -> None:
+        while (delay := self.wait_time()) > 0:
+            await asyncio.sleep(delay)
+        if self.rate:
+            self.tokens -= 1.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies for one (model, operation)."""
+
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class LLMEndpoint:
+    """One OpenAI-compatible deployment and key, with its own limits and health."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        name: str = "",
+        weight: float = 1.0,
+        requests_per_minute: float = 0,
+        max_concurrency: int = 16,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.name = name or urlsplit(base_url).netloc or base_url
+        self.weight = weight
+        self.limiter = RateLimiter(requests_per_minute)
+        self.breaker = breaker or CircuitBreaker()
+        self.outstanding = 0
+        # EWMA of request success, used to shift load away from flaky endpoints
+        self.health = 1.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @cached_property
+    def client(self) -> "openai.AsyncOpenAI":
+        """Created on first use so importing openai stays off the startup path."""
+        import openai
+
+        # Retries are handled by the pool, against the retry budget
+        return openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+
+    def load(self) -> float:
+        """Weighted outstanding requests, inflated for unhealthy endpoints; lower is better."""
+        return (self.outstanding + 1) / (self.weight * max(self.health, 0.05))
+
+    def record(self, ok: bool) -> None:
+        self.health = 0.8 * self.health + 0.2 * (1.0 if ok else 0.0)
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        LLM_ENDPOINT_REQUESTS.labels(self.name, "success" if ok else "failure").inc()
+
+    async def send(self, model: str, max_tokens: int, messages: list):
+        self.outstanding += 1
+        try:
+            await self.limiter.acquire()
+            async with self._semaphore:
+                return await self.client.chat.completions.create(
+                    model=model, max_tokens=max_tokens, messages=messages
+                )
+        finally:
+            self.outstanding -= 1
+
+    def stats(self) -> dict:
+        return {
+            "outstanding": self.outstanding,
+            "health": round(self.health, 3),
+            "breaker": self.breaker.state,
+        }
+
+
+class LLMClient:
+    """Async client over a pool of OpenAI-compatible endpoints.
+
+    Requests go to the endpoint with the lowest weighted outstanding load that
+    is not rate limited or tripped. Failed attempts fail over to another
+    endpoint, stragglers are hedged on a second endpoint, and all retries and
+    hedges share one retry budget.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[LLMEndpoint],
+        timeout_seconds: float = 120.0,
+        hedge_quantile: float | None = 0.95,
+        retry_budget: RetryBudget | None = None,
+    ):
+        if not endpoints:
+            raise ValueError("LLMClient needs at least one endpoint")
+        self.endpoints = endpoints
+        self.timeout = timeout_seconds
+        self.hedge_quantile = hedge_quantile
+        self.retry_budget = retry_budget or RetryBudget()
+        self.latencies: dict[tuple[str, str], LatencyTracker] = {}
+
+    async def complete(
+        self, model: str, max_tokens: int, messages: list, operation: str = "chat"
+    ) -> str:
+        """Return the completion text, failing over and retrying within the call deadline.
+
+        The deadline is the client timeout, shortened to the request deadline if one is set.
+        Running out of the client timeout raises TimeoutError, and requests still in flight
+        count against their endpoints; running out of a shorter request deadline raises
+        DeadlineExceeded and, like the caller's cancellation, blames no endpoint.
+        """
+        import openai
+
+        loop = asyncio.get_running_loop()
+        budget = self.timeout
+        request_left = remaining()
+        if request_left is not None:
+            if request_left <= 0:
+                LLM_CALLS.labels(model, operation, "timeout").inc()
+                raise DeadlineExceeded(f"Deadline exceeded before LLM {operation}")
+            budget = min(budget, request_left)
+        blame_timeouts = budget >= self.timeout
+        deadline = loop.time() + budget
+        tried: set[LLMEndpoint] = set()
+        with span("llm.call", model=model, operation=operation) as attrs:
+            for attempt in range(MAX_RETRIES):
+                time_left = deadline - loop.time()
+                try:
+                    response = await self._hedged(
+                        model, max_tokens, messages, operation, tried, time_left, blame_timeouts
+                    )
+                except CircuitOpenError:
+                    LLM_CALLS.labels(model, operation, "circuit_open").inc()
+                    raise
+                except asyncio.TimeoutError:
+                    LLM_CALLS.labels(model, operation, "timeout").inc()
+                    if not blame_timeouts:
+                        # The request deadline, not the client timeout, ran out
+                        raise DeadlineExceeded(f"Deadline exceeded during LLM {operation}") from None
+                    raise
+                except (openai.APIStatusError, openai.APIConnectionError) as e:
+                    status = getattr(e, "status_code", None)
+                    # Fail over immediately if another endpoint is up, else back off
+                    failover = any(ep.breaker.available for ep in self.endpoints if ep not in tried)
+                    delay = 0.0
+                    if not failover:
+                        delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+                    if (
+                        _is_retryable(e)
+                        and attempt < MAX_RETRIES - 1
+                        and loop.time() + delay < deadline
+                        and self.retry_budget.withdraw()
+                    ):
+                        logger.warning(
+                            "LLM call failed (%s), retrying in %.1fs (attempt %d/%d)",
+                            status or type(e).__name__, delay, attempt + 1, MAX_RETRIES,
+                        )
+                        LLM_RETRIES.labels(model, operation).inc()
+                        attrs["retries"] = attempt + 1
+                        await asyncio.sleep(delay)
+                        continue
+                    LLM_CALLS.labels(model, operation, "error").inc()
+                    raise
+
+                self.retry_budget.deposit()
+                LLM_CALLS.labels(model, operation, "success").inc()
+                usage = response.usage
+                if usage is not None:
+                    LLM_TOKENS.labels(model, operation, "prompt").inc(usage.prompt_tokens)
+                    LLM_TOKENS.labels(model, operation, "completion").inc(usage.completion_tokens)
+                    attrs["prompt_tokens"] = usage.prompt_tokens
+                    attrs["completion_tokens"] = usage.completion_tokens
+                return response.choices[0].message.content.strip()
+        raise RuntimeError("Unreachable")
+
+    def stats(self) -> dict:
+        return {e.name: e.stats() for e in self.endpoints}
+
+    def _pick(self, exclude: set[LLMEndpoint]) -> LLMEndpoint:
+        """Least weighted outstanding load among available endpoints, preferring untried ones."""
+        available = [e for e in self.endpoints if e.breaker.available]
+        if not available:
+            raise CircuitOpenError("All LLM endpoints are unavailable")
+        candidates = [e for e in available if e not in exclude] or available
+        for endpoint in sorted(candidates, key=lambda e: (e.limiter.wait_time() > 0, e.load())):
+            # A half-open endpoint admits one probe; a concurrent pick moves on
+            if endpoint.breaker.allow():
+                return endpoint
+        raise CircuitOpenError("All LLM endpoints are unavailable")
+
+    async def _hedged(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: list,
+        operation: str,
+        tried: set[LLMEndpoint],
+        timeout: float,
+        blame_timeouts: bool = True,
+    ):
+        """Send the request, duplicating it to another endpoint once it outlives the latency quantile.
+
+        Raises TimeoutError after ``timeout`` seconds. With ``blame_timeouts``
+        the requests still in flight then count as endpoint failures. Losing
+        hedges and cancelled requests are not recorded.
+        """
+        tracker = self.latencies.setdefault((model, operation), LatencyTracker())
+        hedge_after = tracker.quantile(self.hedge_quantile) if self.hedge_quantile else None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        started = time.monotonic()
+
+        def launch() -> asyncio.Future:
+            endpoint = self._pick(tried)
+            tried.add(endpoint)
+            task = asyncio.ensure_future(self._send(endpoint, model, max_tokens, messages))
+            in_flight[task] = endpoint
+            return task
+
+        in_flight: dict[asyncio.Future, LLMEndpoint] = {}
+        primary = launch()
+        tasks = {primary}
+        try:
+            if hedge_after is not None and hedge_after < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done and self.retry_budget.withdraw():
+                    try:
+                        tasks.add(launch())
+                    except CircuitOpenError:
+                        pass
+            hedged = len(tasks) > 1
+            while True:
+                done, pending = await asyncio.wait(
+                    tasks, timeout=max(deadline - loop.time(), 0.0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if blame_timeouts:
+                        # The server-side budget ran out: count the stuck requests
+                        for task in pending:
+                            in_flight[task].record(False)
+                    raise asyncio.TimeoutError
+                succeeded = [t for t in done if t.exception() is None]
+                if succeeded:
+                    if hedged:
+                        winner = "primary" if succeeded[0] is primary else "hedge"
+                        LLM_HEDGES.labels(model, operation, winner).inc()
+                    tracker.observe(time.monotonic() - started)
+                    return succeeded[0].result()
+                if not pending:
+                    # Every attempt failed: surface the first error
+                    return next(iter(done)).result()
+                tasks = pending
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _send(endpoint: LLMEndpoint, model: str, max_tokens: int, messages: list):
+        import openai
+
+        ok: bool | None = None
+        try:
+            response = await endpoint.send(model, max_tokens, messages)
+            ok = True
+            return response
+        except (openai.APIStatusError, openai.APIConnectionError) as e:
+            # A non-retryable status (400, 401, 422) means the endpoint itself is up
+            ok = not _is_retryable(e)
+            raise
+        finally:
+            if ok is None:
+                # Cancelled or failed outside the API: no verdict, but free a half-open probe
+                endpoint.breaker.release()
+            else:
+                endpoint.record(ok)
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    return status is None or status in RETRYABLE_STATUS
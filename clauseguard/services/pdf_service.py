@@ -1,26 +1,72 @@
-import pymupdf
+import os
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from clauseguard.telemetry import span
+
+PAGE_SEPARATOR = "\n\n"
+
+
+@dataclass(slots=True)
+class ParsedDocument:
+    text: str
+    num_pages: int = 1
+    page_offsets: list[int] = field(default_factory=lambda: [0])
+
+    def page_at(self, offset: int) -> int:
+        """1-based page number containing the given character offset."""
+        return max(bisect_right(self.page_offsets, offset), 1)
 
 
 class PDFService:
-    """Parse PDF files and plain text into raw text content."""
-
-    def parse(self, file_bytes: bytes, filename: str) -> tuple[str, int]:
-        """Parse a file into (text, num_pages). Supports PDF and plain text."""
-        if filename.lower().endswith(".pdf"):
-            return self._parse_pdf(file_bytes)
-        return self._parse_text(file_bytes)
-
-    def _parse_pdf(self, file_bytes: bytes) -> tuple[str, int]:
-        doc = pymupdf.open(stream=file_bytes, filetype="pdf")
-        pages = []
-        for page in doc:
-            text = page.get_text()
-            if text.strip():
-                pages.append(text)
-        doc.close()
-        full_text = "\n\n".join(pages)
-        return full_text, len(pages) if pages else 1
-
-    def _parse_text(self, file_bytes: bytes) -> tuple[str, int]:
-        text = file_bytes.decode("utf-8", errors="replace")
-        return text, 1
+    """Parse PDF files and plain text into raw text content.
+
+    ``parse`` does the whole file in one call. Callers that must not hold a
+    worker for a whole large PDF can instead call ``page_count``, then
+    ``parse_pages`` on page ranges, and join the results with ``assemble``.
+    """
+
+    def parse(self, path: str | os.PathLike, filename: str) -> ParsedDocument:
+        """Parse a file on disk into text with page offsets. Supports PDF and plain text."""
+        with span("pdf.parse", bytes=os.path.getsize(path)) as attrs:
+            if filename.lower().endswith(".pdf"):
+                doc = self.assemble(self.parse_pages(path, 0, self.page_count(path)))
+            else:
+                doc = self._parse_text(path)
+            attrs["pages"] = doc.num_pages
+        return doc
+
+    def page_count(self, path: str | os.PathLike) -> int:
+        import pymupdf
+
+        with pymupdf.open(path, filetype="pdf") as doc:
+            return doc.page_count
+
+    def parse_pages(self, path: str | os.PathLike, start: int, end: int) -> list[str]:
+        """Text of PDF pages ``start`` to ``end`` (exclusive, 0-based); blank pages are dropped."""
+        import pymupdf
+
+        # Opening by path lets MuPDF read pages from disk instead of a bytes copy
+        with span("pdf.parse_pages", start=start, end=end), pymupdf.open(path, filetype="pdf") as doc:
+            pages = []
+            for number in range(start, min(end, doc.page_count)):
+                text = doc[number].get_text()
+                if text.strip():
+                    pages.append(text)
+        return pages
+
+    @staticmethod
+    def assemble(pages: list[str]) -> ParsedDocument:
+        """Join page texts into one document with the offset of each page."""
+        page_offsets = []
+        offset = 0
+        for text in pages:
+            page_offsets.append(offset)
+            offset += len(text) + len(PAGE_SEPARATOR)
+        full_text = PAGE_SEPARATOR.join(pages)
+        return ParsedDocument(full_text, len(pages) if pages else 1, page_offsets or [0])
+
+    def _parse_text(self, path: str | os.PathLike) -> ParsedDocument:
+        with open(path, encoding="utf-8", errors="replace", newline="") as f:
+            text = f.read()
+        return ParsedDocument(text)
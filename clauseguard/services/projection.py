@@ -0,0 +1,138 @@
+"""Dimensionality reduction for clause embeddings.
+
+Fit a PCA projection on a corpus and save it next to the index:
+
+    python -m clauseguard.services.projection --dims 128 --corpus sample_contracts/ \
+        --output data/projection-128.npz
+"""
+
+import argparse
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Projection:
+    """Maps full model embeddings to ``dims`` dimensions, then re-normalizes.
+
+    ``pca`` centers and projects onto the top principal components of the
+    corpus; ``truncate`` keeps the leading dimensions, which is only sound for
+    Matryoshka-trained models.
+    """
+
+    method: str
+    dims: int
+    input_dims: int
+    mean: np.ndarray | None = None
+    components: np.ndarray | None = None
+
+    @property
+    def version(self) -> str:
+        """Stable identifier of this projection, recorded in the index metadata."""
+        digest = hashlib.sha1(f"{self.method}:{self.input_dims}:{self.dims}".encode())
+        if self.components is not None:
+            digest.update(self.mean.tobytes())
+            digest.update(self.components.tobytes())
+        return f"{self.method}-{self.dims}-{digest.hexdigest()[:12]}"
+
+    @classmethod
+    def truncate(cls, input_dims: int, dims: int) -> "Projection":
+        if not 0 < dims <= input_dims:
+            raise ValueError(f"Cannot truncate {input_dims} dims to {dims}")
+        return cls("truncate", dims, input_dims)
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dims: int) -> "Projection":
+        """Fit PCA on an (n, input_dims) matrix of embeddings."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, input_dims = vectors.shape
+        if not 0 < dims <= min(n, input_dims):
+            raise ValueError(f"Cannot fit {dims} components on {n} x {input_dims} vectors")
+        mean = vectors.mean(axis=0)
+        _, singular_values, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        explained = (singular_values[:dims] ** 2).sum() / (singular_values ** 2).sum()
+        logger.info("PCA to %d dims keeps %.1f%% of variance", dims, 100 * explained)
+        return cls("pca", dims, input_dims, mean, vt[:dims].astype(np.float32))
+
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """Project and L2-normalize a (n, input_dims) matrix."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.method == "truncate":
+            reduced = vectors[:, : self.dims]
+        else:
+            reduced = (vectors - self.mean) @ self.components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        return reduced / np.where(norms == 0, 1, norms)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        if self.components is not None:
+            arrays = {"mean": self.mean, "components": self.components}
+        np.savez(
+            path,
+            method=self.method,
+            dims=self.dims,
+            input_dims=self.input_dims,
+            version=self.version,
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Projection":
+        with np.load(path) as data:
+            projection = cls(
+                str(data["method"]),
+                int(data["dims"]),
+                int(data["input_dims"]),
+                data["mean"] if "mean" in data else None,
+                data["components"] if "components" in data else None,
+            )
+            if str(data["version"]) != projection.version:
+                raise ValueError(f"Projection file {path} is corrupt (version mismatch)")
+        return projection
+
+
+def corpus_texts(corpus: Path) -> list[str]:
+    """Clause-sized spans from every contract in a directory."""
+    from clauseguard.services.pdf_service import PDFService
+    from clauseguard.services.segmentation import segment
+
+    pdf = PDFService()
+    texts = []
+    for path in sorted(corpus.iterdir()):
+        if path.suffix.lower() not in (".pdf", ".txt", ".text"):
+            continue
+        text = pdf.parse(path, path.name).text
+        texts.extend(text[s.start : s.end] for s in segment(text))
+    return texts
+
+
+def main(argv=None) -> None:
+    from clauseguard.config import settings
+    from clauseguard.services.embedding_service import EmbeddingService
+
+    parser = argparse.ArgumentParser(description="Fit a PCA projection for clause embeddings")
+    parser.add_argument("--dims", type=int, required=True)
+    parser.add_argument("--corpus", type=Path, required=True, help="Directory of PDF/text contracts")
+    parser.add_argument("--output", type=Path, default=Path(settings.embedding_projection_path))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    texts = corpus_texts(args.corpus)
+    embedder = EmbeddingService(settings.embedding_model)
+    vectors = np.asarray(embedder.encode_batch(texts, project=False), dtype=np.float32)
+    projection = Projection.fit_pca(vectors, args.dims)
+    projection.save(args.output)
+    logger.info("Saved %s (fit on %d spans) to %s", projection.version, len(texts), args.output)
+
+
+if __name__ == "__main__":
+    main()
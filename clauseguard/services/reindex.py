@@ -0,0 +1,50 @@
+"""Copy clause documents into the configured clauses index with their vectors.
+
+Clause vectors are not in ``_source`` (they are kept once per text in the
+canonical index), so Elasticsearch ``_reindex`` would copy clauses without
+them and kNN would silently return nothing. Create the new index by pointing
+ES_CLAUSES_INDEX at it, then:
+
+    ES_CLAUSES_INDEX=clauseguard-clauses-v2 python -m clauseguard.services.reindex clauseguard-clauses
+
+Once done, switch ES_CLAUSES_INDEX (or an alias) over and delete the old index.
+"""
+
+import argparse
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _reindex(source_index: str, batch_size: int) -> None:
+    from clauseguard.services.elasticsearch_service import ElasticsearchService
+
+    service = ElasticsearchService()
+    if source_index == service.clauses_index:
+        raise SystemExit("Source and destination are the same index; set ES_CLAUSES_INDEX")
+    try:
+        # Size the destination like the source, without loading the embedding model
+        resp = await service.es.indices.get_mapping(index=source_index)
+        mappings = next(iter(resp.values()))["mappings"]
+        dims = mappings["properties"]["text_embedding"].get("dims")
+        await service.ensure_indices(dims, mappings.get("_meta", {}).get("vectors"))
+        copied, skipped = await service.copy_clauses_from(source_index, batch_size)
+        logger.info("Copied %d clauses from %s to %s", copied, source_index, service.clauses_index)
+        if skipped:
+            logger.warning("Skipped %d clauses with no stored vector; re-ingest their contracts", skipped)
+    finally:
+        await service.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source_index", help="Clauses index to copy from")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(_reindex(args.source_index, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
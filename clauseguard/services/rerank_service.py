@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class RerankService:
+    """Local cross-encoder that rescores (query, clause) pairs on CPU within a latency budget."""
+
+    _shared: dict[str, "RerankService"] = {}
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 16,
+        timeout_ms: int = 250,
+        cache_size: int = 10000,
+    ):
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.timeout = timeout_ms / 1000.0
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+    @classmethod
+    def shared(cls, model_name: str, **kwargs) -> "RerankService":
+        """The instance for ``model_name``, built on first use; later ``kwargs`` are ignored.
+
+        Sharing it also shares the score cache and the single scoring thread.
+        """
+        if model_name not in cls._shared:
+            cls._shared[model_name] = cls(model_name, **kwargs)
+        return cls._shared[model_name]
+
+    async def rerank(self, query: str, candidates: list[dict]) -> list[dict] | None:
+        """Reorder candidates by cross-encoder score.
+
+        Returns None when the latency budget is exceeded so the caller keeps the
+        RRF order. Pairs scored before the deadline still land in the cache.
+        """
+        return (await self.rerank_batch([(query, candidates)]))[0]
+
+    async def rerank_batch(
+        self, queries: list[tuple[str, list[dict]]]
+    ) -> list[list[dict] | None]:
+        """Rerank several queries' candidates as one job under one latency budget.
+
+        Separate jobs would queue behind each other on the single scoring
+        thread and spend their budgets waiting. Pairs are scored in query
+        order; a query not fully scored before the deadline gets None.
+        """
+        if not any(candidates for _, candidates in queries):
+            return [candidates for _, candidates in queries]
+
+        cancelled = threading.Event()
+        deadline = time.monotonic() + self.timeout
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._score, queries, deadline, cancelled)
+        try:
+            all_scores = await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            cancelled.set()
+            logger.warning(
+                "Rerank exceeded %.0fms budget for %d candidates, keeping RRF order",
+                self.timeout * 1000, sum(len(candidates) for _, candidates in queries),
+            )
+            return [None] * len(queries)
+
+        results: list[list[dict] | None] = []
+        for (_, candidates), scores in zip(queries, all_scores):
+            if scores is None:
+                results.append(None)
+                continue
+            for doc, score in zip(candidates, scores):
+                doc["rerank_score"] = score
+            results.append(sorted(candidates, key=lambda d: d["rerank_score"], reverse=True))
+        return results
+
+    def _score(
+        self,
+        queries: list[tuple[str, list[dict]]],
+        deadline: float,
+        cancelled: threading.Event,
+    ) -> list[list[float] | None]:
+        """Score all (query, candidate) pairs in CPU batches, reusing cached (query, clause_id) scores."""
+        scores: list[list[float | None]] = []
+        pending: list[tuple[int, int]] = []
+        with self._cache_lock:
+            for q, (query, candidates) in enumerate(queries):
+                scores.append([])
+                for i, doc in enumerate(candidates):
+                    key = (query, doc["clause_id"])
+                    cached = self._cache.get(key)
+                    if cached is not None:
+                        self._cache.move_to_end(key)
+                    else:
+                        pending.append((q, i))
+                    scores[q].append(cached)
+
+        for batch_start in range(0, len(pending), self.batch_size):
+            if cancelled.is_set() or time.monotonic() >= deadline:
+                break
+            batch = pending[batch_start : batch_start + self.batch_size]
+            pairs = [(queries[q][0], queries[q][1][i]["text"]) for q, i in batch]
+            batch_scores = self.model.predict(pairs, batch_size=self.batch_size)
+            with self._cache_lock:
+                for (q, i), score in zip(batch, batch_scores):
+                    scores[q][i] = float(score)
+                    self._cache[(queries[q][0], queries[q][1][i]["clause_id"])] = float(score)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [None if None in query_scores else query_scores for query_scores in scores]
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any, TypeVar
+
+from clauseguard import profiling
+from clauseguard.telemetry import COMPUTE_QUEUE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Lane(StrEnum):
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+@dataclass(slots=True)
+class _Job:
+    lane: Lane
+    fn: Callable
+    args: tuple
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    enqueued_at: float
+    cancelled: bool = False
+    # Request that submitted the job, for profiler attribution
+    owner: profiling.RequestContext | None = None
+
+
+class ComputeScheduler:
+    """Runs CPU-bound work (embedding, PDF parsing) off the event loop in priority lanes.
+
+    Worker threads pick jobs by weighted round robin over the non-empty lanes,
+    so while both lanes have work interactive jobs get ``interactive_share``
+    slots for every ``bulk_share`` bulk slots, and either lane may use all of
+    them when the other is idle. Bulk work is submitted in chunks so an
+    interactive job waits for at most one chunk. Queued jobs whose caller was
+    cancelled are dropped without running.
+    """
+
+    def __init__(self, workers: int = 1, interactive_share: int = 4, bulk_share: int = 1):
+        self.workers = workers
+        self.shares = {Lane.INTERACTIVE: interactive_share, Lane.BULK: bulk_share}
+        self._credits = dict(self.shares)
+        self._queues: dict[Lane, deque[_Job]] = {lane: deque() for lane in Lane}
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._pid: int | None = None
+
+    async def run(self, lane: Lane, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on a worker thread in the given lane."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        job = _Job(
+            lane, fn, args, loop, loop.create_future(), time.monotonic(), owner=profiling.current()
+        )
+        with self._cond:
+            self._queues[lane].append(job)
+            self._cond.notify()
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            job.cancelled = True
+            raise
+
+    async def run_chunked(
+        self, lane: Lane, fn: Callable[[list], list[T]], items: list, chunk_size: int
+    ) -> list[T]:
+        """Apply a list-to-list function in chunks, yielding to other lanes between chunks."""
+        results: list[T] = []
+        for start in range(0, len(items), chunk_size):
+            results.extend(await self.run(lane, fn, items[start : start + chunk_size]))
+        return results
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {lane.value: len(queue) for lane, queue in self._queues.items()}
+
+    def _ensure_started(self) -> None:
+        # Threads do not survive fork, so start them in the process that uses them
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._cond:
+            if self._pid == pid:
+                return
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"compute-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = pid
+
+    def _next_job(self) -> _Job | None:
+        """Weighted round robin over non-empty lanes, interactive first. Caller holds the lock."""
+        ready = [lane for lane in Lane if self._queues[lane]]
+        if not ready:
+            return None
+        if all(self._credits[lane] <= 0 for lane in ready):
+            self._credits = dict(self.shares)
+        for lane in ready:
+            if self._credits[lane] > 0:
+                self._credits[lane] -= 1
+                return self._queues[lane].popleft()
+        return self._queues[ready[0]].popleft()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while (job := self._next_job()) is None:
+                    self._cond.wait()
+            if job.cancelled:
+                continue
+            COMPUTE_QUEUE_SECONDS.labels(job.lane.value).observe(time.monotonic() - job.enqueued_at)
+            result = error = None
+            if job.owner is not None:
+                profiling.bind_thread(job.owner)
+            try:
+                result = job.fn(*job.args)
+            except BaseException as e:
+                error = e
+            finally:
+                if job.owner is not None:
+                    profiling.unbind_thread()
+            try:
+                job.loop.call_soon_threadsafe(_settle, job.future, result, error)
+            except RuntimeError:
+                logger.debug("Event loop closed before %s job finished", job.lane)
+
+
+def _settle(future: asyncio.Future, result: Any, error: BaseException | None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,154 @@
+import multiprocessing
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from clauseguard.models.search import SearchRequest, SearchResponse
+
+
+class IndexGeneration:
+    """Monotonic counter bumped on every write that can change search results.
+
+    Backed by shared memory so that workers forked from one parent see each
+    other's bumps. Writes from unrelated processes are only visible through
+    the store's own counter (``StorageBackend.shared_generation``).
+    """
+
+    _shared: "IndexGeneration | None" = None
+
+    def __init__(self):
+        self._value = multiprocessing.Value("q", 0)
+
+    @classmethod
+    def shared(cls) -> "IndexGeneration":
+        """Process-wide counter; created pre-fork it is shared by all workers."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def value(self) -> int:
+        return self._value.value
+
+    def bump(self) -> int:
+        with self._value.get_lock():
+            self._value.value += 1
+            return self._value.value
+
+
+@dataclass(slots=True)
+class _Entry:
+    response: SearchResponse
+    generation: tuple[int, int]
+    expires_at: float
+    cost: int
+
+
+class SearchCache:
+    """Bounded LRU cache of search responses, invalidated by index generation and TTL.
+
+    An entry is valid for the generation it was computed against: the local
+    ``IndexGeneration`` plus, if given, the store's ``shared_generation``
+    counter, which also moves when another process (e.g. the watcher) writes.
+    """
+
+    def __init__(
+        self,
+        generation: IndexGeneration,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        shared_generation: Callable[[], Awaitable[int]] | None = None,
+    ):
+        self.generation = generation
+        self.shared_generation = shared_generation
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self.total_cost = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(request: SearchRequest, reranked: bool | None = None) -> tuple:
+        """Canonicalize a request so equivalent searches share one entry.
+
+        ``reranked`` says whether the search will actually be reranked, which
+        differs from ``request.rerank`` while no rerank model is loaded.
+        """
+        clause_types = tuple(sorted({ct.value for ct in request.clause_types or ()}))
+        contract_ids = tuple(sorted(set(request.contract_ids or ())))
+        return (
+            " ".join(request.query.split()),
+            clause_types,
+            contract_ids,
+            request.top_k,
+            request.rerank if reranked is None else reranked,
+            request.collapse_duplicates,
+        )
+
+    async def current_generation(self) -> tuple[int, int]:
+        """The generation a search started now reads; pass it to ``get`` and ``put``."""
+        shared = await self.shared_generation() if self.shared_generation is not None else 0
+        return self.generation.value, shared
+
+    def get(self, key: tuple, generation: tuple[int, int]) -> SearchResponse | None:
+        """Return a cached response if it is fresh for the given current generation."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.generation != generation or entry.expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.response
+
+    def put(self, key: tuple, response: SearchResponse, generation: tuple[int, int]) -> None:
+        """Store a response computed against the given index generation."""
+        if generation[0] != self.generation.value:
+            # A local write landed during the search; the entry could never match
+            return
+        cost = self._estimate_cost(response)
+        if cost > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(
+            response=response,
+            generation=generation,
+            expires_at=time.monotonic() + self.ttl,
+            cost=cost,
+        )
+        self.total_cost += cost
+        while len(self._entries) > self.max_entries or self.total_cost > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_cost,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "generation": self.generation.value,
+        }
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self.total_cost -= entry.cost
+
+    @staticmethod
+    def _estimate_cost(response: SearchResponse) -> int:
+        """Approximate memory footprint of a response in bytes."""
+        cost = 256 + len(response.query)
+        for hit in response.hits:
+            cost += 256 + len(hit.text) + sum(len(h) for h in hit.highlights)
+        return cost
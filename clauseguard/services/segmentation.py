@@ -0,0 +1,75 @@
+import re
+from dataclasses import dataclass
+
+# Blank-line separated blocks, plus numbered items that start on their own line
+BLOCK_RE = re.compile(r"\S(?:.|\n(?![ \t]*\n))*")
+ITEM_START_RE = re.compile(
+    r"\n(?=[ \t]*(?:\d+(?:\.\d+)+|\(\w{1,4}\)|Section\s+\d+|ARTICLE\s+[IVXLC\d]+)\b)",
+    re.IGNORECASE,
+)
+SECTION_NUMBER_RE = re.compile(
+    r"\s*(?:(?:Section|Article)\s+([\dIVXLC]+(?:\.\d+)*)|(\d+(?:\.\d+)*)[.)]?\s)", re.IGNORECASE
+)
+
+
+@dataclass(slots=True)
+class Span:
+    span_id: int
+    start: int
+    end: int
+    section_number: str = ""
+
+
+def segment(text: str, max_span_chars: int = 4000) -> list[Span]:
+    """Split a document into numbered spans (sections and paragraphs) with exact offsets."""
+    spans: list[Span] = []
+    for block in BLOCK_RE.finditer(text):
+        for start, end in _split_block(text, block.start(), block.end(), max_span_chars):
+            match = SECTION_NUMBER_RE.match(text, start, end)
+            section = (match.group(1) or match.group(2)) if match else ""
+            spans.append(Span(span_id=len(spans) + 1, start=start, end=end, section_number=section))
+    return spans
+
+
+def _split_block(text: str, start: int, end: int, max_chars: int) -> list[tuple[int, int]]:
+    """Split a block at numbered item boundaries, then hard-wrap oversized pieces at sentences."""
+    cuts = [start] + [m.start() + 1 for m in ITEM_START_RE.finditer(text, start, end)] + [end]
+    pieces = []
+    for piece_start, piece_end in zip(cuts, cuts[1:]):
+        while piece_end - piece_start > max_chars:
+            split = text.rfind(". ", piece_start, piece_start + max_chars)
+            split = split + 2 if split > piece_start else piece_start + max_chars
+            pieces.append(_trim(text, piece_start, split))
+            piece_start = split
+        pieces.append(_trim(text, piece_start, piece_end))
+    return [(s, e) for s, e in pieces if e > s]
+
+
+def _trim(text: str, start: int, end: int) -> tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def render_spans(text: str, spans: list[Span]) -> str:
+    """Render spans as `[id] text` blocks for the extraction prompt."""
+    return "\n\n".join(f"[{s.span_id}] {text[s.start:s.end]}" for s in spans)
+
+
+def windows(spans: list[Span], max_chars: int) -> list[list[Span]]:
+    """Group consecutive spans into prompt windows of at most max_chars source characters."""
+    groups: list[list[Span]] = []
+    current: list[Span] = []
+    size = 0
+    for span in spans:
+        length = span.end - span.start
+        if current and size + length > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(span)
+        size += length
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,199 @@
+import logging
+from abc import ABC, abstractmethod
+
+from clauseguard.config import settings
+from clauseguard.services.search_cache import IndexGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class VectorSpaceMismatch(ValueError):
+    """The stored vectors come from another embedding space than the embedder's."""
+
+
+class StorageBackend(ABC):
+    """Contract and clause storage with hybrid BM25 + kNN search.
+
+    Implemented by ElasticsearchService and by the embedded SQLite/NumPy
+    backend. Every write must bump ``generation`` and the counter behind
+    ``shared_generation`` so search caches never serve stale results.
+    """
+
+    generation: IndexGeneration
+
+    @abstractmethod
+    async def ensure_indices(
+        self, vector_dims: int | None = None, vector_meta: dict | None = None
+    ) -> None:
+        """Create indices/tables if they don't exist.
+
+        ``vector_meta`` describes the embedding space (model, dims, projection
+        version). It is recorded on creation, and an existing index built for
+        a different space raises VectorSpaceMismatch instead of serving wrong
+        results.
+        """
+
+    @abstractmethod
+    async def shared_generation(self) -> int:
+        """Write counter kept in the store itself, so it sees writes from any process.
+
+        ``generation`` only covers this process and its forked siblings.
+        """
+
+    @abstractmethod
+    async def index_contract(self, contract: dict) -> None:
+        """Index a contract metadata document."""
+
+    @abstractmethod
+    async def get_contract(self, contract_id: str) -> dict | None:
+        """Get a contract by ID."""
+
+    @abstractmethod
+    async def delete_contract(self, contract_id: str) -> bool:
+        """Delete a contract and its clauses. Returns False if it did not exist."""
+
+    @abstractmethod
+    async def list_contracts(self) -> list[dict]:
+        """List the most recently uploaded contracts."""
+
+    @abstractmethod
+    async def bulk_index_clauses(self, clauses: list[dict]) -> int:
+        """Index clause documents (with `text_embedding`). Returns count indexed."""
+
+    @abstractmethod
+    async def get_canonical_embeddings(self, hashes: list[str]) -> dict[str, list[float]]:
+        """Stored vectors for known canonical clause hashes (unknown hashes are omitted).
+
+        bulk_index_clauses registers the vector of every clause doc carrying a
+        ``canonical_hash``, so later copies of the same text skip the model.
+        """
+
+    @abstractmethod
+    async def get_clauses_by_contract(self, contract_id: str) -> list[dict]:
+        """Get all clauses for a contract."""
+
+    @abstractmethod
+    async def hybrid_search_rrf_batch(
+        self, queries: list[dict], rank_constant: int = 60
+    ) -> list[list[dict]]:
+        """Run BM25 + kNN for many queries and fuse each with RRF.
+
+        Each query dict takes the keyword arguments of hybrid_search_rrf.
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release connections and file handles."""
+
+    async def hybrid_search_rrf(
+        self,
+        query_text: str,
+        query_vector: list[float],
+        clause_types: list[str] | None = None,
+        contract_ids: list[str] | None = None,
+        top_k: int = 10,
+        rank_constant: int = 60,
+        collapse: bool = False,
+    ) -> list[dict]:
+        """Hybrid BM25 + kNN search with Reciprocal Rank Fusion."""
+        results = await self.hybrid_search_rrf_batch(
+            [
+                {
+                    "query_text": query_text,
+                    "query_vector": query_vector,
+                    "clause_types": clause_types,
+                    "contract_ids": contract_ids,
+                    "top_k": top_k,
+                    "collapse": collapse,
+                }
+            ],
+            rank_constant=rank_constant,
+        )
+        return results[0]
+
+    @staticmethod
+    def _fuse_rrf(
+        bm25_hits: list[dict],
+        knn_hits: list[dict],
+        top_k: int,
+        rank_constant: int,
+        collapse: bool = False,
+    ) -> list[dict]:
+        """Manual RRF: score = sum(1 / (rank_constant + rank)) for each retriever.
+
+        Hits use the ES shape: ``{"_id", "_source", "highlight": {"text": [...]}}``.
+        With ``collapse``, only the best-scoring hit per canonical_hash is
+        kept; backends also collapse each retriever so copies of one
+        boilerplate clause cannot crowd out the candidate lists.
+        """
+        rrf_scores: dict[str, float] = {}
+        doc_map: dict[str, dict] = {}
+        highlight_map: dict[str, list[str]] = {}
+
+        for rank, hit in enumerate(bm25_hits):
+            doc_id = hit["_id"]
+            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + 1.0 / (rank_constant + rank + 1)
+            doc_map[doc_id] = hit["_source"]
+            highlight_map[doc_id] = hit.get("highlight", {}).get("text", [])
+
+        for rank, hit in enumerate(knn_hits):
+            doc_id = hit["_id"]
+            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + 1.0 / (rank_constant + rank + 1)
+            if doc_id not in doc_map:
+                doc_map[doc_id] = hit["_source"]
+
+        # Sort by RRF score and take top_k (one per canonical text when collapsing)
+        sorted_ids = sorted(rrf_scores, key=lambda x: rrf_scores[x], reverse=True)
+
+        results = []
+        seen: set[str] = set()
+        for doc_id in sorted_ids:
+            if len(results) == top_k:
+                break
+            doc = doc_map[doc_id]
+            key = doc.get("canonical_hash") if collapse else None
+            if key:
+                if key in seen:
+                    continue
+                seen.add(key)
+            doc["_score"] = rrf_scores[doc_id]
+            doc["highlights"] = highlight_map.get(doc_id, [])
+            results.append(doc)
+        return results
+
+    @staticmethod
+    def _check_vector_meta(
+        stored: dict | None, expected: dict | None, where: str, legacy_dims: int | None = None
+    ) -> None:
+        """Raise VectorSpaceMismatch unless ``expected`` matches the stored space.
+
+        Stores built before the metadata was recorded hold ``legacy_dims``-dim
+        vectors straight from the model, so only an unprojected embedder of
+        that size matches them.
+        """
+        if not expected:
+            return
+        if not stored:
+            if not legacy_dims:
+                return
+            stored = {"dims": legacy_dims, "projection": "none"}
+            expected = {key: expected.get(key) for key in stored}
+        if stored != expected:
+            raise VectorSpaceMismatch(
+                f"{where} was built for {stored} but the embedder produces {expected}; "
+                "re-index or restore the matching projection"
+            )
+
+
+def build_storage_backend(backend: str | None = None) -> StorageBackend:
+    """Instantiate the configured backend, importing only its dependencies."""
+    backend = backend or settings.search_backend
+    if backend == "elasticsearch":
+        from clauseguard.services.elasticsearch_service import ElasticsearchService
+
+        return ElasticsearchService()
+    if backend == "embedded":
+        from clauseguard.services.embedded_store import EmbeddedSearchService
+
+        return EmbeddedSearchService(settings.embedded_data_dir)
+    raise ValueError(f"Unknown search backend: {backend!r}")
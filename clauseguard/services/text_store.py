@@ -0,0 +1,107 @@
+import logging
+import os
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import zstandard
+
+from clauseguard.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CGT1"
+# magic, block_chars, num_blocks, text_length
+HEADER = struct.Struct("<4sIIQ")
+CONTRACT_ID_RE = re.compile(r"[\w-]+")
+
+
+@dataclass(slots=True)
+class TextRange:
+    text: str
+    start: int
+    end: int
+    text_length: int
+
+
+class TextStore:
+    """Parsed contract text, stored as independently compressed zstd blocks.
+
+    Each file holds a header, a table of block byte offsets, and one zstd
+    frame per ``block_chars`` characters. A character range is served by
+    decompressing only the blocks it overlaps.
+    """
+
+    def __init__(self, root: str | os.PathLike, block_chars: int = 64 * 1024, level: int = 3):
+        self.root = Path(root)
+        self.block_chars = block_chars
+        self.level = level
+
+    def path(self, contract_id: str) -> Path:
+        if not CONTRACT_ID_RE.fullmatch(contract_id):
+            raise ValueError(f"Invalid contract ID: {contract_id!r}")
+        # Fan out by prefix so no single directory grows unbounded
+        return self.root / contract_id[:2] / f"{contract_id}.cgt"
+
+    def write(self, contract_id: str, text: str) -> int:
+        """Compress and persist a contract's text. Returns bytes written."""
+        compressor = zstandard.ZstdCompressor(level=self.level)
+        with span("text_store.write", chars=len(text)):
+            frames = [
+                compressor.compress(text[i : i + self.block_chars].encode())
+                for i in range(0, len(text), self.block_chars)
+            ]
+            offsets = [0]
+            for frame in frames:
+                offsets.append(offsets[-1] + len(frame))
+            header = HEADER.pack(MAGIC, self.block_chars, len(frames), len(text))
+            index = struct.pack(f"<{len(offsets)}Q", *offsets)
+
+            path = self.path(contract_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(index)
+                for frame in frames:
+                    f.write(frame)
+            os.replace(tmp, path)
+        return len(header) + len(index) + offsets[-1]
+
+    def read(self, contract_id: str, start: int = 0, end: int | None = None) -> TextRange | None:
+        """Characters [start, end) of a contract's text, or None if it was never stored."""
+        if not CONTRACT_ID_RE.fullmatch(contract_id):
+            return None
+        path = self.path(contract_id)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f, span("text_store.read"):
+            magic, block_chars, num_blocks, text_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a ClauseGuard text file")
+            start = min(max(start, 0), text_length)
+            end = text_length if end is None else min(max(end, start), text_length)
+            if start == end:
+                return TextRange("", start, end, text_length)
+
+            first, last = start // block_chars, (end - 1) // block_chars
+            f.seek(HEADER.size + 8 * first)
+            offsets = struct.unpack(f"<{last - first + 2}Q", f.read(8 * (last - first + 2)))
+            data_start = HEADER.size + 8 * (num_blocks + 1)
+            f.seek(data_start + offsets[0])
+            data = f.read(offsets[-1] - offsets[0])
+
+        decompressor = zstandard.ZstdDecompressor()
+        blocks = [
+            decompressor.decompress(data[a - offsets[0] : b - offsets[0]]).decode()
+            for a, b in zip(offsets, offsets[1:])
+        ]
+        text = "".join(blocks)
+        base = first * block_chars
+        return TextRange(text[start - base : end - base], start, end, text_length)
+
+    def delete(self, contract_id: str) -> None:
+        self.path(contract_id).unlink(missing_ok=True)
@@ -0,0 +1,141 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "clauseguard_stage_duration_seconds",
+    "Wall time of pipeline stages",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_SECONDS = Histogram(
+    "clauseguard_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_CALLS = Counter(
+    "clauseguard_llm_calls_total",
+    "LLM API calls by outcome",
+    ["model", "operation", "outcome"],
+)
+LLM_RETRIES = Counter(
+    "clauseguard_llm_retries_total",
+    "LLM API retries after overload errors",
+    ["model", "operation"],
+)
+LLM_HEDGES = Counter(
+    "clauseguard_llm_hedges_total",
+    "Hedged LLM requests by which copy answered first",
+    ["model", "operation", "winner"],
+)
+LLM_ENDPOINT_REQUESTS = Counter(
+    "clauseguard_llm_endpoint_requests_total",
+    "LLM requests per pool endpoint by outcome",
+    ["endpoint", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "clauseguard_llm_tokens_total",
+    "LLM tokens consumed",
+    ["model", "operation", "kind"],
+)
+REVIEW_CASCADE = Counter(
+    "clauseguard_review_cascade_total",
+    "Clause reviews answered by the fast model vs escalated to the main model",
+    ["clause_type", "outcome"],
+)
+REVIEW_COMPARISONS = Counter(
+    "clauseguard_review_comparisons_total",
+    "Clause comparisons by what answered them",
+    ["source"],
+)
+COMPUTE_QUEUE_SECONDS = Histogram(
+    "clauseguard_compute_queue_seconds",
+    "Time CPU-bound jobs wait in the compute scheduler",
+    ["lane"],
+    buckets=LATENCY_BUCKETS,
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "clauseguard_embedding_batch_size",
+    "Number of texts per embedding call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+ES_TOOK_SECONDS = Histogram(
+    "clauseguard_es_took_seconds",
+    "Server-side Elasticsearch time reported in `took`",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+SEARCH_CACHE_LOOKUPS = Counter(
+    "clauseguard_search_cache_lookups_total",
+    "Search result cache lookups",
+    ["result"],
+)
+CLAUSE_EMBEDDINGS = Counter(
+    "clauseguard_clause_embeddings_total",
+    "Clause embeddings at ingest, reused from the canonical store or computed",
+    ["source"],
+)
+
+_tracer = None
+
+
+def configure_tracing(service_name: str, otlp_endpoint: str = "") -> None:
+    """Export spans via OpenTelemetry OTLP. Requires the `otel` extra."""
+    global _tracer
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    exporter = OTLPSpanExporter(endpoint=otlp_endpoint) if otlp_endpoint else OTLPSpanExporter()
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("clauseguard")
+    logger.info("OpenTelemetry tracing enabled (service=%s)", service_name)
+
+
+@contextmanager
+def span(stage: str, **attributes):
+    """Time a pipeline stage into the stage histogram and, if configured, an OTel span.
+
+    Yields a dict; attributes added to it inside the block (token counts,
+    batch sizes, ...) are attached to the span and the debug log line.
+    """
+    attrs = dict(attributes)
+    otel_cm = _tracer.start_as_current_span(stage) if _tracer is not None else nullcontext()
+    with otel_cm as otel_span:
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            STAGE_SECONDS.labels(stage).observe(elapsed)
+            if otel_span is not None:
+                for key, value in attrs.items():
+                    if isinstance(value, (str, bool, int, float)):
+                        otel_span.set_attribute(key, value)
+            logger.debug(
+                "span %s %.1fms %s", stage, elapsed * 1000, attrs,
+                extra={"span": stage, "duration_ms": elapsed * 1000},
+            )
+
+
+def record_es_took(operation: str, resp) -> None:
+    """Observe the server-side `took` (ms) from an Elasticsearch response."""
+    took = resp.get("took") if hasattr(resp, "get") else None
+    if took is not None:
+        ES_TOOK_SECONDS.labels(operation).observe(took / 1000)
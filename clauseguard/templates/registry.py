@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from clauseguard.models.clause import ClauseType
+from clauseguard.models.template import ClauseTemplate
+from clauseguard.services.canonical import canonical_hash
+from clauseguard.services.claude_service import render_compare_prefix
+from clauseguard.services.scheduler import ComputeScheduler, Lane
+from clauseguard.services.storage import StorageBackend
+from clauseguard.telemetry import span
+from clauseguard.templates.defaults import DEFAULT_TEMPLATES
+
+if TYPE_CHECKING:
+    from clauseguard.services.elasticsearch_service import ElasticsearchService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+TENANT_RE = re.compile(r"[\w-]+")
+
+
+@dataclass(slots=True)
+class CompiledTemplate:
+    """A template with everything a review reuses precomputed.
+
+    ``template_id`` is ``<clause_type>@<content hash>``, so it changes with
+    any edit and is safe to use in cache keys.
+    """
+
+    template: ClauseTemplate
+    template_id: str
+    canonical_hash: str
+    prompt_prefix: str
+    embedding: np.ndarray | None = None
+    requirement_embeddings: np.ndarray | None = None
+
+    def matches(
+        self, vector: np.ndarray, min_similarity: float, min_requirement_similarity: float = 0.0
+    ) -> bool:
+        """Whether a normalized clause vector is close enough to the template to skip the LLM.
+
+        With ``min_requirement_similarity`` set, every key requirement must
+        also be at least that similar to the clause.
+        """
+        if self.embedding is None or min_similarity <= 0:
+            return False
+        if float(self.embedding @ vector) < min_similarity:
+            return False
+        if min_requirement_similarity > 0 and self.requirement_embeddings is not None:
+            return float((self.requirement_embeddings @ vector).min()) >= min_requirement_similarity
+        return True
+
+
+def compile_template(template: ClauseTemplate) -> CompiledTemplate:
+    content = json.dumps(template.model_dump(mode="json"), sort_keys=True)
+    digest = hashlib.sha256(content.encode()).hexdigest()[:12]
+    return CompiledTemplate(
+        template=template,
+        template_id=f"{template.clause_type.value}@{digest}",
+        canonical_hash=canonical_hash(template.template_text),
+        prompt_prefix=render_compare_prefix(template.template_text, template.key_requirements),
+    )
+
+
+@dataclass(slots=True)
+class TemplateSet:
+    """One tenant's templates by clause type, resolved once per review."""
+
+    tenant: str
+    version: str
+    templates: dict[ClauseType, CompiledTemplate]
+    required: tuple[ClauseType, ...]
+
+    @classmethod
+    def build(
+        cls, tenant: str, templates: dict[ClauseType, CompiledTemplate], version: str = ""
+    ) -> "TemplateSet":
+        if not version:
+            ids = ",".join(sorted(t.template_id for t in templates.values()))
+            version = hashlib.sha256(ids.encode()).hexdigest()[:12]
+        required = tuple(ct for ct, t in templates.items() if t.template.required)
+        return cls(tenant, version, templates, required)
+
+
+@dataclass(slots=True)
+class TenantTemplates:
+    version: str
+    templates: list[ClauseTemplate]
+
+
+class TemplateSource(ABC):
+    """Where template overrides come from, keyed by tenant."""
+
+    @abstractmethod
+    async def load(self) -> dict[str, TenantTemplates]:
+        """Templates per tenant; the ``default`` tenant overrides the builtin set for everyone."""
+
+    @abstractmethod
+    async def fingerprint(self) -> str:
+        """Cheap value that changes whenever ``load`` would return something different."""
+
+
+class BuiltinTemplateSource(TemplateSource):
+    async def load(self) -> dict[str, TenantTemplates]:
+        return {}
+
+    async def fingerprint(self) -> str:
+        return "builtin"
+
+
+class FileTemplateSource(TemplateSource):
+    """One JSON file per tenant: ``<tenant>.json``.
+
+    Each file holds a list of templates, or ``{"version": ..., "templates": [...]}``.
+    """
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+
+    def _files(self) -> list[Path]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p for p in self.root.glob("*.json") if TENANT_RE.fullmatch(p.stem))
+
+    async def load(self) -> dict[str, TenantTemplates]:
+        return await asyncio.to_thread(self._load)
+
+    def _load(self) -> dict[str, TenantTemplates]:
+        tenants = {}
+        for path in self._files():
+            data = json.loads(path.read_text())
+            if isinstance(data, list):
+                data = {"templates": data}
+            tenants[path.stem] = TenantTemplates(
+                version=str(data.get("version", "")),
+                templates=[ClauseTemplate(**t) for t in data["templates"]],
+            )
+        return tenants
+
+    async def fingerprint(self) -> str:
+        def stat_all() -> str:
+            return "|".join(
+                f"{p.name}:{st.st_mtime_ns}:{st.st_size}"
+                for p in self._files()
+                for st in (p.stat(),)
+            )
+
+        return await asyncio.to_thread(stat_all)
+
+
+class IndexTemplateSource(TemplateSource):
+    """Template documents in ``ES_TEMPLATES_INDEX``, each with a ``tenant`` field."""
+
+    def __init__(self, storage: "ElasticsearchService"):
+        self.storage = storage
+
+    async def load(self) -> dict[str, TenantTemplates]:
+        grouped: dict[str, list[dict]] = {}
+        for doc in await self.storage.list_templates():
+            grouped.setdefault(doc.get("tenant") or DEFAULT_TENANT, []).append(doc)
+        tenants = {}
+        for tenant, docs in grouped.items():
+            versions = {str(d.get("version", "")) for d in docs}
+            tenants[tenant] = TenantTemplates(
+                version=versions.pop() if len(versions) == 1 else "",
+                templates=[
+                    ClauseTemplate(**{k: v for k, v in d.items() if k in ClauseTemplate.model_fields})
+                    for d in docs
+                ],
+            )
+        return tenants
+
+    async def fingerprint(self) -> str:
+        docs = await self.storage.list_templates()
+        content = json.dumps(sorted(docs, key=lambda d: json.dumps(d, sort_keys=True)), sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+
+def build_template_source(settings, storage: StorageBackend) -> TemplateSource:
+    if settings.template_source == "files":
+        return FileTemplateSource(settings.templates_dir)
+    if settings.template_source == "elasticsearch":
+        if settings.search_backend != "elasticsearch":
+            raise ValueError(
+                f"TEMPLATE_SOURCE=elasticsearch needs SEARCH_BACKEND=elasticsearch, "
+                f"not {settings.search_backend!r}; use TEMPLATE_SOURCE=files"
+            )
+        return IndexTemplateSource(storage)
+    if settings.template_source != "builtin":
+        raise ValueError(f"Unknown TEMPLATE_SOURCE: {settings.template_source!r}")
+    return BuiltinTemplateSource()
+
+
+class TemplateRegistry:
+    """Compiled per-tenant template sets with versioning and hot reload.
+
+    The default set is the builtin templates overlaid with the source's
+    ``default`` tenant; every other tenant overlays the default set. On
+    (re)load each template is compiled once per content hash: prompt prefix,
+    canonical hash, and template and requirement embeddings. The sets are
+    swapped in with one assignment, so a review keeps the set it resolved.
+    """
+
+    def __init__(
+        self,
+        source: TemplateSource | None = None,
+        embedder=None,
+        scheduler: ComputeScheduler | None = None,
+    ):
+        self.source = source or BuiltinTemplateSource()
+        self.embedder = embedder
+        self.scheduler = scheduler or ComputeScheduler()
+        self._compiled: dict[str, CompiledTemplate] = {}
+        self._fingerprint: str | None = None
+        # Builtin templates without embeddings until the first reload
+        self._sets: dict[str, TemplateSet] = self._build({})
+        self._compiled = self._in_use(self._sets)
+
+    def resolve(self, tenant: str | None = None) -> TemplateSet:
+        """The tenant's template set; tenants without overrides get the default set."""
+        return self._sets.get(tenant or DEFAULT_TENANT) or self._sets[DEFAULT_TENANT]
+
+    def versions(self) -> dict[str, str]:
+        return {tenant: s.version for tenant, s in self._sets.items()}
+
+    async def reload(self) -> dict[str, str]:
+        """Load the source, compile what changed and swap the sets in. Returns versions."""
+        with span("templates.reload"):
+            fingerprint = await self.source.fingerprint()
+            sets = self._build(await self.source.load())
+            await self._embed(sets)
+        self._compiled = self._in_use(sets)
+        self._sets = sets
+        self._fingerprint = fingerprint
+        logger.info("Loaded templates: %s", self.versions())
+        return self.versions()
+
+    async def watch(self, interval: float) -> None:
+        """Reload whenever the source's fingerprint changes; keep the old sets on errors."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await self.source.fingerprint() != self._fingerprint:
+                    await self.reload()
+            except Exception:
+                logger.exception("Template reload failed, keeping the current templates")
+
+    @staticmethod
+    def _in_use(sets: dict[str, TemplateSet]) -> dict[str, CompiledTemplate]:
+        return {t.template_id: t for s in sets.values() for t in s.templates.values()}
+
+    def _build(self, tenants: dict[str, TenantTemplates]) -> dict[str, TemplateSet]:
+        pool = dict(self._compiled)
+        base = dict(DEFAULT_TEMPLATES)
+        default = tenants.pop(DEFAULT_TENANT, None)
+        if default is not None:
+            base.update((t.clause_type, t) for t in default.templates)
+        sets = {
+            DEFAULT_TENANT: TemplateSet.build(
+                DEFAULT_TENANT, self._compile(base, pool), default.version if default else ""
+            )
+        }
+        for tenant, overrides in tenants.items():
+            merged = {**base, **{t.clause_type: t for t in overrides.templates}}
+            sets[tenant] = TemplateSet.build(tenant, self._compile(merged, pool), overrides.version)
+        return sets
+
+    @staticmethod
+    def _compile(
+        templates: dict[ClauseType, ClauseTemplate], pool: dict[str, CompiledTemplate]
+    ) -> dict[ClauseType, CompiledTemplate]:
+        compiled = {}
+        for clause_type, template in templates.items():
+            candidate = compile_template(template)
+            # Reuse the earlier compile, and its embeddings, for unchanged templates
+            compiled[clause_type] = pool.setdefault(candidate.template_id, candidate)
+        return compiled
+
+    async def _embed(self, sets: dict[str, TemplateSet]) -> None:
+        """Embed template and requirement texts of newly compiled templates in one batch."""
+        todo = {
+            t.template_id: t
+            for s in sets.values()
+            for t in s.templates.values()
+            if t.embedding is None
+        }
+        if not todo or self.embedder is None:
+            return
+        texts = []
+        for t in todo.values():
+            texts.append(t.template.template_text)
+            texts.extend(t.template.key_requirements)
+        try:
+            vectors = await self.scheduler.run(Lane.BULK, self.embedder.encode_batch, texts)
+        except Exception as e:
+            logger.warning("Template embedding failed (%s); similarity pre-screen is off", e)
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        row = 0
+        for t in todo.values():
+            n = len(t.template.key_requirements)
+            t.embedding = matrix[row]
+            t.requirement_embeddings = matrix[row + 1 : row + 1 + n]
+            row += 1 + n
@@ -1,5 +1,6 @@
 import type {
   ContractMetadata,
+  ContractText,
   ContractUploadResponse,
   ExtractedClause,
   RiskReport,
@@ -28,6 +29,9 @@ export const api = {
   getContractClauses: (id: string) =>
     request<ExtractedClause[]>(`/contracts/${id}/clauses`),
 
+  getContractText: (id: string, start: number, end: number) =>
+    request<ContractText>(`/contracts/${id}/text?start=${start}&end=${end}`),
+
   uploadContract: (file: File) => {
     const form = new FormData();
     form.append('file', file);
@@ -44,6 +48,6 @@ export const api = {
       body: JSON.stringify(body),
     }),
 
-  reviewContract: (id: string) =>
-    request<RiskReport>(`/review/${id}`, { method: 'POST' }),
+  reviewContract: (id: string, summary = true) =>
+    request<RiskReport>(`/review/${id}?summary=${summary}&format=compact`, { method: 'POST' }),
 };
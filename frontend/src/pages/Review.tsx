@@ -180,7 +180,10 @@ export function ReviewPage() {
             {severityTabs.map(({ key }) => (
               <TabsContent key={key} value={key} className="space-y-4">
                 {findingsBySeverity(key).map((f, i) => (
-                  <FindingCard key={i} finding={f} />
+                  <FindingCard
+                    key={i}
+                    finding={{ ...f, template_text: f.template_text || report.templates[f.template_id] || '' }}
+                  />
                 ))}
               </TabsContent>
             ))}
@@ -21,6 +21,8 @@ export interface ExtractedClause {
   char_offset_start: number;
   char_offset_end: number;
   confidence: number;
+  alignment_score?: number;
+  canonical_hash?: string;
 }
 
 export interface ContractMetadata {
@@ -31,6 +33,7 @@ export interface ContractMetadata {
   num_clauses: number;
   clause_types_found: ClauseType[];
   text_length: number;
+  content_sha256?: string;
 }
 
 export interface ContractUploadResponse {
@@ -41,11 +44,21 @@ export interface ContractUploadResponse {
   message: string;
 }
 
+export interface ContractText {
+  contract_id: string;
+  start: number;
+  end: number;
+  text_length: number;
+  text: string;
+}
+
 export interface SearchRequest {
   query: string;
   clause_types?: ClauseType[] | null;
   contract_ids?: string[] | null;
   top_k?: number;
+  rerank?: boolean;
+  collapse_duplicates?: boolean;
 }
 
 export interface SearchHit {
@@ -54,9 +67,11 @@ export interface SearchHit {
   clause_type: ClauseType;
   text: string;
   score: number;
+  rerank_score?: number | null;
   section_number: string;
   page_number: number;
   highlights: string[];
+  canonical_hash: string;
 }
 
 export interface SearchResponse {
@@ -65,15 +80,26 @@ export interface SearchResponse {
   hits: SearchHit[];
 }
 
+export interface BatchSearchRequest {
+  searches: SearchRequest[];
+}
+
+export interface BatchSearchResponse {
+  results: SearchResponse[];
+}
+
 export interface Finding {
   clause_type: ClauseType;
   severity: Severity;
   clause_text: string;
+  template_id: string;
   template_text: string;
   deviation: string;
   risk: string;
   recommendation: string;
   confidence: number;
+  model: string;
+  escalated: boolean;
 }
 
 export interface RiskReport {
@@ -87,4 +113,8 @@ export interface RiskReport {
   num_high: number;
   num_medium: number;
   num_low: number;
+  num_escalated: number;
+  tenant: string;
+  template_version: string;
+  templates: Record<string, string>;
 }
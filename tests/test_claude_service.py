@@ -0,0 +1,53 @@
+import asyncio
+import json
+import re
+
+from clauseguard.services.claude_service import ClaudeService
+from clauseguard.services.segmentation import Span
+
+
+class WindowLLM:
+    """Answers each window with one clause per span; earlier windows answer slower."""
+
+    def __init__(self, garbled_window: int | None = None):
+        self.garbled_window = garbled_window
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def complete(self, model, max_tokens, messages, operation=""):
+        ids = [int(i) for i in re.findall(r"^\[(\d+)\]", messages[0]["content"], re.M)]
+        window = (ids[0] - 1) // 2
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05 * (3 - window))
+        self.in_flight -= 1
+        if window == self.garbled_window:
+            return "Sorry, I can't help with that."
+        return json.dumps([{"start_span": i, "end_span": i, "clause_type": "other"} for i in ids])
+
+
+def spans_and_text() -> tuple[str, list[Span]]:
+    text = "".join(f"Clause {i:02d}. " for i in range(1, 7))
+    spans = [Span(i, (i - 1) * 11, i * 11) for i in range(1, 7)]
+    return text, spans
+
+
+def extract(llm: WindowLLM) -> list[dict]:
+    claude = ClaudeService(api_key="test", base_url="http://llm.invalid")
+    claude.llm = llm
+    text, spans = spans_and_text()
+    return asyncio.run(claude.extract_clause_spans(text, spans, window_chars=22))
+
+
+def test_windows_are_sent_concurrently_and_kept_in_order():
+    llm = WindowLLM()
+    clauses = extract(llm)
+
+    assert llm.max_in_flight == 3
+    assert [c["start_span"] for c in clauses] == [1, 2, 3, 4, 5, 6]
+
+
+def test_unparseable_window_is_skipped():
+    clauses = extract(WindowLLM(garbled_window=1))
+
+    assert [c["start_span"] for c in clauses] == [1, 2, 5, 6]
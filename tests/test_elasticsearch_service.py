@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from elasticsearch import NotFoundError
+
+from clauseguard.services import elasticsearch_service
+from clauseguard.services.elasticsearch_service import ElasticsearchService, SearchError
+from clauseguard.services.storage import VectorSpaceMismatch
+
+
+class FakeIndices:
+    def __init__(self):
+        self.mappings: dict[str, dict] = {}
+
+    async def exists(self, index: str) -> bool:
+        return index in self.mappings
+
+    async def create(self, index: str, mappings: dict, settings=None) -> None:
+        self.mappings[index] = mappings
+
+    async def get_mapping(self, index: str) -> dict:
+        return {index: {"mappings": self.mappings[index]}}
+
+    async def put_mapping(self, index: str, meta: dict) -> None:
+        self.mappings[index] = {**self.mappings[index], "_meta": meta}
+
+
+class FakeES:
+    def __init__(self, responses: list[dict]):
+        self.responses = responses
+        self.indices = FakeIndices()
+
+        self.canonical: dict[str, list[float]] = {}
+        self.indexed: list[dict] = []
+        self.counter: int | None = None
+
+    async def msearch(self, searches: list[dict]) -> dict:
+        return {"took": 1, "responses": self.responses}
+
+    async def mget(self, index: str, ids: list[str]) -> dict:
+        return {
+            "docs": [
+                {"_id": i, "found": True, "_source": {"text_embedding": self.canonical[i]}}
+                if i in self.canonical
+                else {"_id": i, "found": False}
+                for i in ids
+            ]
+        }
+
+    async def index(self, index: str, id: str, document: dict) -> None:
+        self.indexed.append(document)
+
+    async def get(self, index: str, id: str) -> dict:
+        if self.counter is None:
+            raise NotFoundError(404, "document_missing_exception", {})
+        return {"_id": id, "_source": {"value": self.counter}}
+
+    async def update(self, index: str, id: str, script: dict, upsert: dict, retry_on_conflict: int):
+        self.counter = upsert["value"] if self.counter is None else self.counter + 1
+
+    async def bulk(self, operations: list[dict], refresh=None) -> dict:
+        self.indexed.extend(
+            doc for action, doc in zip(operations[::2], operations[1::2]) if "index" in action
+        )
+        return {"took": 1, "errors": False, "items": []}
+
+
+def service(responses: list[dict]) -> ElasticsearchService:
+    svc = ElasticsearchService("http://localhost:9200")
+    svc.es = FakeES(responses)
+    return svc
+
+
+def hit(clause_id: str) -> dict:
+    return {"_id": clause_id, "_score": 1.0, "_source": {"clause_id": clause_id, "text": "t"}}
+
+
+QUERY = {"query_text": "indemnify", "query_vector": [0.1, 0.2], "top_k": 5}
+
+
+def test_batch_fuses_both_retrievers():
+    svc = service([{"hits": {"hits": [hit("a")]}}, {"hits": {"hits": [hit("b")]}}])
+    (results,) = asyncio.run(svc.hybrid_search_rrf_batch([QUERY]))
+    assert {doc["clause_id"] for doc in results} == {"a", "b"}
+
+
+@pytest.mark.parametrize("failed", [0, 1])
+def test_batch_raises_when_a_retriever_fails(failed):
+    responses = [{"hits": {"hits": [hit("a")]}}, {"hits": {"hits": [hit("b")]}}]
+    responses[failed] = {"error": {"type": "search_phase_execution_exception"}, "status": 400}
+    svc = service(responses)
+    with pytest.raises(SearchError):
+        asyncio.run(svc.hybrid_search_rrf_batch([QUERY]))
+
+
+def test_copy_clauses_reattaches_vectors(monkeypatch):
+    source = [
+        # Older index: vector still in _source, no canonical_hash yet
+        {"clause_id": "a", "contract_id": "c1", "text": "Governing law.", "text_embedding": [1.0]},
+        # Vector only in the canonical index
+        {"clause_id": "b", "contract_id": "c1", "text": "Indemnity.", "canonical_hash": "h-b"},
+        # No vector anywhere
+        {"clause_id": "c", "contract_id": "c2", "text": "Lost.", "canonical_hash": "h-c"},
+    ]
+
+    async def fake_scan(client, index, size):
+        for doc in source:
+            yield {"_source": dict(doc)}
+
+    monkeypatch.setattr(elasticsearch_service, "async_scan", fake_scan)
+    svc = service([])
+    svc.es.canonical["h-b"] = [2.0]
+
+    copied, skipped = asyncio.run(svc.copy_clauses_from("old-clauses", batch_size=2))
+
+    assert (copied, skipped) == (2, 1)
+    vectors = {d["clause_id"]: d["text_embedding"] for d in svc.es.indexed}
+    assert vectors == {"a": [1.0], "b": [2.0]}
+    assert all(d["canonical_hash"] for d in svc.es.indexed)
+
+
+PCA_V1 = {"embedding_model": "m", "dims": 256, "projection": "pca-v1"}
+
+
+def test_canonical_index_records_and_checks_the_vector_space():
+    svc = service([])
+    asyncio.run(svc.ensure_indices(256, PCA_V1))
+    assert svc.es.indices.mappings[svc.canonical_index]["_meta"] == {"vectors": PCA_V1}
+
+    # A new clauses index for a refit projection still meets the old canonical vectors
+    del svc.es.indices.mappings[svc.clauses_index]
+    with pytest.raises(VectorSpaceMismatch, match=svc.canonical_index):
+        asyncio.run(svc.ensure_indices(256, {**PCA_V1, "projection": "pca-v2"}))
+
+
+def test_legacy_canonical_index_only_matches_unprojected_vectors():
+    svc = service([])
+    asyncio.run(svc.ensure_indices(384, None))
+    assert "_meta" not in svc.es.indices.mappings[svc.canonical_index]
+
+    with pytest.raises(VectorSpaceMismatch):
+        asyncio.run(svc.ensure_indices(256, PCA_V1))
+
+    unprojected = {"embedding_model": "m", "dims": 384, "projection": "none"}
+    asyncio.run(svc.ensure_indices(384, unprojected))
+    assert svc.es.indices.mappings[svc.canonical_index]["_meta"] == {"vectors": unprojected}
+
+
+def test_writes_bump_the_shared_generation():
+    svc = service([])
+    assert asyncio.run(svc.shared_generation()) == 0
+    asyncio.run(svc.index_contract({"contract_id": "c1"}))
+    asyncio.run(svc.bulk_index_clauses([{"clause_id": "a", "contract_id": "c1", "text_embedding": [1.0]}]))
+    assert asyncio.run(svc.shared_generation()) == 2
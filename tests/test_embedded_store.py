@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from clauseguard.services.embedded_store import EmbeddedSearchService
+from clauseguard.services.search_cache import IndexGeneration
+from clauseguard.services.storage import VectorSpaceMismatch
+
+DIMS = 8
+
+
+def vector(n: int) -> list[float]:
+    """Distinct unit-ish vector per clause number, so a wrong row is detectable."""
+    v = np.zeros(DIMS, dtype=np.float32)
+    v[n % DIMS] = 1.0
+    v[(n // DIMS) % DIMS] += 0.5 + (n % 97) / 97
+    return v.tolist()
+
+
+def clause(n: int, contract_id: str) -> dict:
+    return {
+        "clause_id": f"clause-{n}",
+        "contract_id": contract_id,
+        "clause_type": "indemnity",
+        "text": f"clause number {n}",
+        "canonical_hash": f"hash-{n}",
+        "text_embedding": vector(n),
+    }
+
+
+def store(path) -> EmbeddedSearchService:
+    svc = EmbeddedSearchService(path)
+    # A separate process would have its own generation counter
+    svc.generation = IndexGeneration()
+    return svc
+
+
+def write_batches(path, start: int, count: int, batch: int) -> None:
+    async def run():
+        svc = store(path)
+        for first in range(start, start + count, batch):
+            await svc.bulk_index_clauses(
+                [clause(n, f"contract-{start}") for n in range(first, first + batch)]
+            )
+        await svc.close()
+
+    asyncio.run(run())
+
+
+def stored_vectors(svc: EmbeddedSearchService, numbers: range) -> dict[int, np.ndarray]:
+    hashes = [f"hash-{n}" for n in numbers]
+    vectors = asyncio.run(svc.get_canonical_embeddings(hashes))
+    return {int(h.split("-")[1]): np.asarray(v) for h, v in vectors.items()}
+
+
+def expected(n: int) -> np.ndarray:
+    v = np.asarray(vector(n), dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_concurrent_writers_get_disjoint_vector_rows(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    writers = [
+        ctx.Process(target=write_batches, args=(tmp_path, start, 200, 10))
+        for start in (0, 1000, 2000)
+    ]
+    for w in writers:
+        w.start()
+    for w in writers:
+        w.join(timeout=60)
+        assert w.exitcode == 0
+
+    svc = store(tmp_path)
+    for start in (0, 1000, 2000):
+        vectors = stored_vectors(svc, range(start, start + 200))
+        assert len(vectors) == 200
+        for n, v in vectors.items():
+            np.testing.assert_allclose(v, expected(n), rtol=1e-6)
+
+
+def test_reader_sees_another_processes_writes(tmp_path):
+    reader = store(tmp_path)
+    asyncio.run(reader.bulk_index_clauses([clause(1, "a")]))
+    query = {"query_text": "zzz", "query_vector": vector(2), "top_k": 5}
+    (before,) = asyncio.run(reader.hybrid_search_rrf_batch([query]))
+    assert [d["clause_id"] for d in before] == ["clause-1"]
+
+    write_batches(tmp_path, 2, 1, 1)
+
+    (after,) = asyncio.run(reader.hybrid_search_rrf_batch([query]))
+    assert after[0]["clause_id"] == "clause-2"
+
+
+def test_ensure_indices_rejects_other_dims(tmp_path):
+    svc = store(tmp_path)
+    asyncio.run(svc.bulk_index_clauses([clause(1, "a")]))
+    fresh = store(tmp_path)
+    asyncio.run(fresh.ensure_indices(DIMS))
+    with pytest.raises(VectorSpaceMismatch):
+        asyncio.run(store(tmp_path).ensure_indices(DIMS * 2))
+
+
+def meta(dims: int, projection: str = "none") -> dict:
+    return {"embedding_model": "test-model", "dims": dims, "projection": projection}
+
+
+def test_store_without_vector_meta_only_matches_unprojected_vectors(tmp_path):
+    # Written before vector metadata was recorded
+    asyncio.run(store(tmp_path).bulk_index_clauses([clause(1, "a")]))
+
+    with pytest.raises(VectorSpaceMismatch):
+        asyncio.run(store(tmp_path).ensure_indices(DIMS, meta(DIMS, "pca-0123abcd")))
+
+    asyncio.run(store(tmp_path).ensure_indices(DIMS, meta(DIMS)))
+    # The space is recorded now, so a different model is caught too
+    with pytest.raises(VectorSpaceMismatch):
+        asyncio.run(store(tmp_path).ensure_indices(DIMS, {**meta(DIMS), "embedding_model": "other"}))
+
+
+def test_search_cache_sees_writes_from_another_process(tmp_path):
+    from clauseguard.agents.search import SearchAgent
+    from clauseguard.models.search import SearchRequest
+    from clauseguard.services.search_cache import SearchCache
+
+    class Embedder:
+        def encode_batch(self, texts):
+            return [vector(1) for _ in texts]
+
+    api = store(tmp_path)
+    asyncio.run(api.bulk_index_clauses([clause(1, "contract-a")]))
+    cache = SearchCache(api.generation, shared_generation=api.shared_generation)
+    agent = SearchAgent(Embedder(), api, cache=cache)
+    request = SearchRequest(query="clause number", top_k=10, rerank=False)
+    assert asyncio.run(agent.search(request)).total_hits == 1
+
+    # The watcher: same store, its own generation counter
+    ctx = multiprocessing.get_context("fork")
+    watcher = ctx.Process(target=write_batches, args=(tmp_path, 2, 1, 1))
+    watcher.start()
+    watcher.join(timeout=60)
+    assert watcher.exitcode == 0
+
+    assert asyncio.run(agent.search(request)).total_hits == 2
+    assert cache.hits == 0
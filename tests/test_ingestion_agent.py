@@ -0,0 +1,117 @@
+import asyncio
+import threading
+
+import pytest
+
+from clauseguard.agents.ingestion import IngestionAgent
+from clauseguard.services.pdf_service import PDFService
+from clauseguard.services.scheduler import ComputeScheduler, Lane
+from clauseguard.services.text_store import TextStore
+
+
+class FakePDF(PDFService):
+    def __init__(self, pages: list[str], log: list):
+        self.pages = pages
+        self.log = log
+        self.started = threading.Event()
+
+    def page_count(self, path):
+        return len(self.pages)
+
+    def parse_pages(self, path, start, end):
+        self.log.append(("parse", start, end))
+        self.started.set()
+        threading.Event().wait(0.02)
+        return [p for p in self.pages[start:end] if p.strip()]
+
+
+def make_agent(pdf: PDFService, scheduler: ComputeScheduler, **kwargs) -> IngestionAgent:
+    return IngestionAgent(pdf, None, None, None, scheduler=scheduler, **kwargs)
+
+
+def test_pdf_is_parsed_in_page_chunks():
+    log = []
+    pdf = FakePDF(["one", "two", " ", "four", "five"], log)
+    agent = make_agent(pdf, ComputeScheduler(), parse_chunk_pages=2)
+
+    document = asyncio.run(agent._parse("contract.pdf", "contract.pdf"))
+
+    assert log == [("parse", 0, 2), ("parse", 2, 4), ("parse", 4, 5)]
+    assert document.text == "one\n\ntwo\n\nfour\n\nfive"
+    assert document.num_pages == 4
+    assert document.page_at(document.text.index("four")) == 3
+
+
+def test_interactive_work_runs_between_parse_chunks():
+    log = []
+    pdf = FakePDF([f"page {i}" for i in range(6)], log)
+    scheduler = ComputeScheduler(workers=1)
+    agent = make_agent(pdf, scheduler, parse_chunk_pages=2)
+
+    async def run():
+        parse = asyncio.ensure_future(agent._parse("contract.pdf", "contract.pdf"))
+        await asyncio.to_thread(pdf.started.wait)
+        await scheduler.run(Lane.INTERACTIVE, log.append, ("search",))
+        await parse
+
+    asyncio.run(run())
+
+    assert log.index(("search",)) < len(log) - 1
+
+
+class FakeClaude:
+    async def extract_clauses(self, text):
+        return []
+
+
+class FakeEmbedder:
+    def encode_batch(self, texts):
+        return [[0.0] for _ in texts]
+
+
+class StalledES:
+    def __init__(self):
+        self.contracts: list[str] = []
+        self.deleted: list[str] = []
+        self.indexing = asyncio.Event()
+
+    async def index_contract(self, doc):
+        self.contracts.append(doc["contract_id"])
+
+    async def bulk_index_clauses(self, docs):
+        self.indexing.set()
+        await asyncio.Event().wait()
+
+    async def delete_contract(self, contract_id):
+        self.deleted.append(contract_id)
+        return True
+
+
+def test_cancelled_ingest_removes_what_it_wrote(tmp_path):
+    upload = tmp_path / "nda.txt"
+    upload.write_text("This Agreement is made between the parties.")
+    es = StalledES()
+    text_store = TextStore(tmp_path / "texts")
+    agent = IngestionAgent(
+        PDFService(),
+        FakeClaude(),
+        FakeEmbedder(),
+        es,
+        extraction_mode="full",
+        scheduler=ComputeScheduler(),
+        dedup=False,
+        text_store=text_store,
+    )
+
+    async def run():
+        ingest = asyncio.ensure_future(agent.ingest(upload, "nda.txt", contract_id="c1"))
+        await es.indexing.wait()
+        assert text_store.path("c1").exists()
+        ingest.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await ingest
+
+    asyncio.run(run())
+
+    assert es.contracts == es.deleted == ["c1"]
+    assert not text_store.path("c1").exists()
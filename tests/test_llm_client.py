@@ -0,0 +1,265 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from clauseguard.deadlines import DeadlineExceeded, reset_deadline, set_deadline
+from clauseguard.services.llm_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    LLMClient,
+    LLMEndpoint,
+)
+
+
+def status_error(status: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    return openai.APIStatusError(
+        f"HTTP {status}", response=httpx.Response(status, request=request), body=None
+    )
+
+
+class FakeEndpoint(LLMEndpoint):
+    """Endpoint whose send() runs a scripted behaviour instead of calling a server."""
+
+    def __init__(self, behaviour, **kwargs):
+        super().__init__(base_url="http://llm.test/v1", api_key="test", **kwargs)
+        self.behaviour = behaviour
+        self.calls = 0
+
+    async def send(self, model: str, max_tokens: int, messages: list):
+        self.calls += 1
+        return await self.behaviour()
+
+
+def completion(text: str):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+async def hang():
+    await asyncio.sleep(3600)
+
+
+def tripped_breaker() -> CircuitBreaker:
+    """A breaker that has opened and is immediately half-open."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60.0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.available
+    assert not breaker.allow()
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = tripped_breaker()
+    assert breaker.state == "half_open"
+    assert breaker.available
+    assert breaker.allow()
+    assert not breaker.available
+    assert not breaker.allow()
+
+
+def test_probe_success_closes_and_failure_reopens():
+    breaker = tripped_breaker()
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+    breaker = tripped_breaker()
+    breaker.reset_seconds = 60.0
+    breaker.opened_at -= 60.0
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_release_frees_the_probe_without_an_outcome():
+    breaker = tripped_breaker()
+    breaker.allow()
+    breaker.release()
+    assert breaker.state == "half_open"
+    assert breaker.failures == 2
+    assert breaker.allow()
+
+
+def test_non_retryable_probe_error_counts_as_success():
+    async def bad_request():
+        raise status_error(400)
+
+    endpoint = FakeEndpoint(bad_request, breaker=tripped_breaker())
+    assert endpoint.breaker.allow()
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(LLMClient._send(endpoint, "m", 10, []))
+    assert endpoint.breaker.state == "closed"
+
+
+def test_retryable_probe_error_reopens():
+    async def overloaded():
+        raise status_error(529)
+
+    endpoint = FakeEndpoint(overloaded, breaker=tripped_breaker())
+    endpoint.breaker.reset_seconds = 60.0
+    endpoint.breaker.opened_at -= 60.0
+    assert endpoint.breaker.allow()
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(LLMClient._send(endpoint, "m", 10, []))
+    assert endpoint.breaker.state == "open"
+
+
+def test_unexpected_probe_error_releases_the_probe():
+    async def broken():
+        raise ValueError("malformed response")
+
+    endpoint = FakeEndpoint(broken, breaker=tripped_breaker())
+    assert endpoint.breaker.allow()
+    with pytest.raises(ValueError):
+        asyncio.run(LLMClient._send(endpoint, "m", 10, []))
+    assert endpoint.breaker.available
+    assert endpoint.breaker.failures == 2
+
+
+def test_cancelled_probe_releases_without_a_failure():
+    endpoint = FakeEndpoint(hang, breaker=tripped_breaker())
+
+    async def run():
+        assert endpoint.breaker.allow()
+        task = asyncio.create_task(LLMClient._send(endpoint, "m", 10, []))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert endpoint.breaker.available
+    assert endpoint.breaker.failures == 2
+
+
+async def complete_with_deadline(client: LLMClient, deadline: float | None) -> str:
+    token = set_deadline(deadline)
+    try:
+        return await client.complete("m", 10, [{"role": "user", "content": "hi"}])
+    finally:
+        reset_deadline(token)
+
+
+async def answer():
+    return completion("  {\"ok\": true}\n")
+
+
+def test_complete_without_deadline():
+    endpoint = FakeEndpoint(answer)
+    client = LLMClient([endpoint], hedge_quantile=None)
+    assert asyncio.run(complete_with_deadline(client, None)) == '{"ok": true}'
+    assert endpoint.calls == 1
+
+
+def test_complete_within_deadline():
+    endpoint = FakeEndpoint(answer)
+    client = LLMClient([endpoint], hedge_quantile=None)
+    assert asyncio.run(complete_with_deadline(client, time.time() + 30)) == '{"ok": true}'
+    assert endpoint.calls == 1
+
+
+def test_complete_after_deadline_does_not_call_the_endpoint():
+    endpoint = FakeEndpoint(answer)
+    client = LLMClient([endpoint], hedge_quantile=None)
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(complete_with_deadline(client, time.time() - 1))
+    assert endpoint.calls == 0
+
+
+def test_complete_fails_over_after_a_retryable_error():
+    async def overloaded():
+        raise status_error(529)
+
+    down = FakeEndpoint(overloaded, name="down", weight=10.0)
+    up = FakeEndpoint(answer, name="up")
+    client = LLMClient([down, up], hedge_quantile=None)
+    assert asyncio.run(complete_with_deadline(client, time.time() + 30)) == '{"ok": true}'
+    assert (down.calls, up.calls) == (1, 1)
+
+def test_server_timeout_counts_against_the_endpoint():
+    endpoint = FakeEndpoint(hang)
+    client = LLMClient([endpoint], timeout_seconds=0.05, hedge_quantile=None)
+    with pytest.raises(TimeoutError) as excinfo:
+        asyncio.run(client.complete("m", 10, []))
+    assert not isinstance(excinfo.value, DeadlineExceeded)
+    assert endpoint.breaker.failures == 1
+    assert endpoint.health < 1.0
+
+
+def test_request_deadline_timeout_does_not_count():
+    endpoint = FakeEndpoint(hang)
+    client = LLMClient([endpoint], timeout_seconds=60.0, hedge_quantile=None)
+
+    async def run():
+        token = set_deadline(time.time() + 0.05)
+        try:
+            await client.complete("m", 10, [])
+        finally:
+            reset_deadline(token)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+    assert endpoint.breaker.failures == 0
+    assert endpoint.health == 1.0
+
+
+def test_caller_cancellation_does_not_count():
+    endpoint = FakeEndpoint(hang)
+    client = LLMClient([endpoint], timeout_seconds=60.0, hedge_quantile=None)
+
+    async def run():
+        task = asyncio.create_task(client.complete("m", 10, []))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert endpoint.breaker.failures == 0
+    assert endpoint.health == 1.0
+
+
+def test_losing_hedge_is_not_recorded():
+    async def slow():
+        await asyncio.sleep(0.2)
+        return completion("slow")
+
+    async def fast():
+        return completion("fast")
+
+    slow_endpoint = FakeEndpoint(slow, name="slow", weight=10.0)
+    fast_endpoint = FakeEndpoint(fast, name="fast")
+    client = LLMClient([slow_endpoint, fast_endpoint], timeout_seconds=5.0)
+    # Hedge almost immediately
+    tracker = client.latencies.setdefault(("m", "chat"), LatencyTracker())
+    tracker.samples.extend([0.01] * tracker.min_samples)
+
+    assert asyncio.run(client.complete("m", 10, [])) == "fast"
+    assert slow_endpoint.calls == 1
+    assert slow_endpoint.health == 1.0
+    assert slow_endpoint.breaker.failures == 0
+
+
+def test_pick_claims_the_half_open_probe_once():
+    endpoint = FakeEndpoint(hang, breaker=tripped_breaker())
+    client = LLMClient([endpoint])
+    assert client._pick(set()) is endpoint
+    with pytest.raises(CircuitOpenError):
+        client._pick(set())
+
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from clauseguard.services.rerank_service import RerankService
+
+
+class FakeCrossEncoder:
+    def __init__(self, seconds_per_batch: float = 0.0):
+        self.seconds_per_batch = seconds_per_batch
+        self.batches: list[list[tuple[str, str]]] = []
+
+    def predict(self, pairs, batch_size):
+        self.batches.append(list(pairs))
+        time.sleep(self.seconds_per_batch)
+        # Longer clause text scores higher
+        return [float(len(text)) for _, text in pairs]
+
+
+def make_service(model: FakeCrossEncoder, batch_size: int = 16, timeout_ms: int = 1000) -> RerankService:
+    # Skip __init__, which loads a real cross-encoder
+    service = RerankService.__new__(RerankService)
+    service.model = model
+    service.batch_size = batch_size
+    service.timeout = timeout_ms / 1000.0
+    service.cache_size = 100
+    service._cache = OrderedDict()
+    service._cache_lock = threading.Lock()
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    return service
+
+
+def docs(*texts: str) -> list[dict]:
+    return [{"clause_id": text, "text": text} for text in texts]
+
+
+def test_batch_scores_pairs_across_queries_together():
+    model = FakeCrossEncoder()
+    service = make_service(model, batch_size=4)
+
+    results = asyncio.run(service.rerank_batch([("q1", docs("a", "ccc", "bb")), ("q2", docs("dd", "e"))]))
+
+    assert [[d["text"] for d in r] for r in results] == [["ccc", "bb", "a"], ["dd", "e"]]
+    assert [len(batch) for batch in model.batches] == [4, 1]
+
+
+def test_queries_not_scored_by_the_deadline_fall_back():
+    service = make_service(FakeCrossEncoder(seconds_per_batch=0.05), batch_size=2)
+    queries = [("q1", docs("a", "bb")), ("q2", docs("c", "dd"))]
+
+    scores = service._score(queries, time.monotonic() + 0.01, threading.Event())
+
+    assert scores == [[1.0, 2.0], None]
+    assert asyncio.run(service.rerank("q1", docs("a", "bb")))[0]["text"] == "bb"
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from clauseguard.agents.review import ReviewAgent
+from clauseguard.deadlines import DeadlineExceeded
+from clauseguard.models.clause import ClauseType
+from clauseguard.services.claude_service import ClaudeService
+from clauseguard.templates.defaults import DEFAULT_TEMPLATES
+from clauseguard.templates.registry import compile_template
+
+
+class FakeLLM:
+    def __init__(self, replies: list[str], summary_error: Exception | None = None):
+        self.replies = list(replies)
+        self.summary_error = summary_error
+        self.calls = 0
+
+    async def complete(self, model, max_tokens, messages, operation=""):
+        if operation == "report_summary" and self.summary_error:
+            raise self.summary_error
+        self.calls += 1
+        return self.replies.pop(0)
+
+
+class FakeStore:
+    async def get_contract(self, contract_id):
+        return {"contract_id": contract_id, "filename": "nda.pdf"}
+
+    async def get_clauses_by_contract(self, contract_id):
+        return [{"clause_type": "indemnity", "text": "Each party shall indemnify the other."}]
+
+
+GOOD_REPLY = json.dumps(
+    {
+        "severity": "low",
+        "deviation": "Narrower carve-outs",
+        "risk": "Minor",
+        "recommendation": "Accept",
+        "confidence": 0.9,
+    }
+)
+
+
+def test_unparseable_comparison_is_not_cached():
+    claude = ClaudeService(api_key="test", base_url="http://llm.invalid")
+    claude.llm = FakeLLM(["not json", GOOD_REPLY, "never used"])
+    agent = ReviewAgent(claude, es_service=None)
+    template = compile_template(DEFAULT_TEMPLATES[ClauseType.INDEMNITY])
+    clause = {"text": "Each party shall indemnify the other.", "canonical_hash": "h1"}
+
+    async def compare():
+        return await agent._compare_clause(clause, ClauseType.INDEMNITY, template)
+
+    first = asyncio.run(compare())
+    second = asyncio.run(compare())
+    third = asyncio.run(compare())
+
+    assert first.deviation == "Unable to parse AI response"
+    assert second.deviation == third.deviation == "Narrower carve-outs"
+    assert claude.llm.calls == 2
+
+
+def review_with_summary_error(error: Exception):
+    claude = ClaudeService(api_key="test", base_url="http://llm.invalid")
+    claude.llm = FakeLLM([GOOD_REPLY], summary_error=error)
+    agent = ReviewAgent(claude, es_service=FakeStore())
+    return asyncio.run(agent.review("c1"))
+
+
+def test_summary_timeout_falls_back_to_a_report_without_summary():
+    report = review_with_summary_error(TimeoutError())
+
+    assert report.summary == ""
+    assert [f.deviation for f in report.findings if f.clause_text] == ["Narrower carve-outs"]
+
+
+def test_request_deadline_during_summary_fails_the_review():
+    with pytest.raises(DeadlineExceeded):
+        review_with_summary_error(DeadlineExceeded("Deadline exceeded during LLM report_summary"))
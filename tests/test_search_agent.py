@@ -0,0 +1,98 @@
+import asyncio
+
+from clauseguard.agents.search import SearchAgent
+from clauseguard.models.search import SearchRequest
+from clauseguard.services.search_cache import IndexGeneration, SearchCache
+
+
+class FakeEmbedder:
+    def encode_batch(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0, 0.0] for _ in texts]
+
+
+class FakeStore:
+    def __init__(self, hits: list[dict] | None = None):
+        self.hits = hits or []
+        self.calls = 0
+
+    async def hybrid_search_rrf_batch(self, queries: list[dict]) -> list[list[dict]]:
+        self.calls += 1
+        return [[dict(hit) for hit in self.hits] for _ in queries]
+
+
+class FakeReranker:
+    """Reverses the RRF order, or falls back for queries listed in ``over_budget``."""
+
+    def __init__(self, over_budget: tuple[str, ...] = ()):
+        self.over_budget = over_budget
+        self.batches: list[list[str]] = []
+
+    async def rerank_batch(self, queries):
+        self.batches.append([query for query, _ in queries])
+        return [
+            None if query in self.over_budget else list(reversed(candidates))
+            for query, candidates in queries
+        ]
+
+
+def hit(clause_id: str) -> dict:
+    return {"clause_id": clause_id, "contract_id": "c1", "clause_type": "indemnity", "text": clause_id}
+
+
+def test_cache_hit_echoes_the_requests_own_query():
+    store = FakeStore()
+    agent = SearchAgent(FakeEmbedder(), store, cache=SearchCache(IndexGeneration()))
+
+    first = asyncio.run(agent.search(SearchRequest(query="limitation  of liability")))
+    second = asyncio.run(agent.search(SearchRequest(query=" limitation of liability ")))
+
+    assert store.calls == 1
+    assert first.query == "limitation  of liability"
+    assert second.query == " limitation of liability "
+
+
+def test_batch_reranks_in_one_job():
+    reranker = FakeReranker()
+    agent = SearchAgent(FakeEmbedder(), FakeStore([hit("a"), hit("b")]), rerank_service=reranker)
+
+    responses = asyncio.run(
+        agent.search_batch(
+            [
+                SearchRequest(query="q1", rerank=True),
+                SearchRequest(query="q2", rerank=False),
+                SearchRequest(query="q3", rerank=True),
+            ]
+        )
+    )
+
+    assert reranker.batches == [["q1", "q3"]]
+    assert [[h.clause_id for h in r.hits] for r in responses] == [["b", "a"], ["a", "b"], ["b", "a"]]
+
+
+def test_rerank_fallback_is_not_cached():
+    store = FakeStore([hit("a"), hit("b")])
+    agent = SearchAgent(
+        FakeEmbedder(),
+        store,
+        rerank_service=FakeReranker(over_budget=("q",)),
+        cache=SearchCache(IndexGeneration()),
+    )
+
+    asyncio.run(agent.search(SearchRequest(query="q")))
+    asyncio.run(agent.search(SearchRequest(query="q")))
+
+    assert store.calls == 2
+
+
+def test_rrf_order_cached_before_the_reranker_loaded_is_not_served_as_reranked():
+    store = FakeStore([hit("a"), hit("b")])
+    agent = SearchAgent(FakeEmbedder(), store, cache=SearchCache(IndexGeneration()))
+    request = SearchRequest(query="q", rerank=True)
+
+    before = asyncio.run(agent.search(request))
+    agent.reranker = FakeReranker()
+    after = asyncio.run(agent.search(request))
+
+    assert store.calls == 2
+    assert [h.clause_id for h in before.hits] == ["a", "b"]
+    assert [h.clause_id for h in after.hits] == ["b", "a"]
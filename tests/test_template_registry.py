@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+import pytest
+
+from clauseguard.templates.registry import IndexTemplateSource, build_template_source
+
+
+def test_index_template_source_needs_the_elasticsearch_backend():
+    storage = object()
+
+    source = build_template_source(
+        SimpleNamespace(template_source="elasticsearch", search_backend="elasticsearch"), storage
+    )
+    assert isinstance(source, IndexTemplateSource)
+
+    with pytest.raises(ValueError, match="SEARCH_BACKEND=elasticsearch"):
+        build_template_source(
+            SimpleNamespace(template_source="elasticsearch", search_backend="embedded"), storage
+        )
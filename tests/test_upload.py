@@ -0,0 +1,78 @@
+import hashlib
+
+from fastapi.testclient import TestClient
+
+from clauseguard.api.deps import get_ingestion_agent
+from clauseguard.main import app
+from clauseguard.models.contract import ContractUploadResponse
+
+
+class FakeAgent:
+    def __init__(self):
+        self.calls = []
+
+    async def ingest(self, path, filename, content_sha256):
+        with open(path, "rb") as f:
+            self.calls.append((f.read(), filename, content_sha256))
+        return ContractUploadResponse(
+            contract_id="c1", filename=filename, num_clauses=0, clause_types_found=[]
+        )
+
+
+READY = {"embedding_model": "ready", "storage": "ready"}
+
+
+def client_with(agent, readiness: dict | None = None) -> TestClient:
+    # Not entered as a context manager, so the lifespan (models, backends) never runs
+    app.dependency_overrides[get_ingestion_agent] = lambda: agent
+    app.state.readiness = READY if readiness is None else readiness
+    return TestClient(app)
+
+
+def test_upload_passes_contents_and_hash_to_ingestion():
+    agent = FakeAgent()
+    body = b"This Agreement is made between the parties.\n" * 50_000
+    try:
+        response = client_with(agent).post(
+            "/api/v1/contracts/upload", files={"file": ("nda.txt", body, "text/plain")}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert agent.calls == [(body, "nda.txt", hashlib.sha256(body).hexdigest())]
+
+
+def test_oversized_upload_is_rejected_with_cors_headers():
+    agent = FakeAgent()
+    try:
+        response = client_with(agent).post(
+            "/api/v1/contracts/upload",
+            content=b"x",
+            headers={
+                "Origin": "http://localhost:5173",
+                "Content-Type": "multipart/form-data; boundary=b",
+                "Content-Length": str(10**12),
+            },
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"]
+    assert agent.calls == []
+
+
+def test_upload_waits_for_storage_warm_up():
+    agent = FakeAgent()
+    try:
+        response = client_with(agent, {**READY, "storage": "connecting"}).post(
+            "/api/v1/contracts/upload", files={"file": ("nda.txt", b"terms", "text/plain")}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    assert response.json()["detail"]["components"]["storage"] == "connecting"
+    assert agent.calls == []
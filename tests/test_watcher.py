@@ -0,0 +1,65 @@
+import asyncio
+
+from clauseguard.connectors.manifest import Manifest
+from clauseguard.connectors.sources import DirectorySource
+from clauseguard.connectors.watcher import ConnectorWatcher
+
+
+class FakeAgent:
+    def __init__(self, fail_first: bool = False):
+        self.fail_first = fail_first
+        self.ingested: list[str] = []
+        self.deleted: list[str] = []
+
+    async def ingest(self, path, filename, content_sha256, contract_id):
+        # Stay in flight long enough for the other workers to hash their files
+        await asyncio.sleep(0.05)
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("extraction failed")
+        self.ingested.append(filename)
+
+    async def delete(self, contract_id):
+        self.deleted.append(contract_id)
+
+
+def scan(tmp_path, agent):
+    manifest = Manifest(tmp_path / "manifest.sqlite3")
+    watcher = ConnectorWatcher(DirectorySource(tmp_path / "inbox"), manifest, agent, concurrency=4)
+    try:
+        stats = asyncio.run(watcher.scan_once())
+        entries = manifest.entries(watcher.source.name)
+    finally:
+        manifest.close()
+    return stats, entries
+
+
+def write_inbox(tmp_path, files: dict[str, str]) -> None:
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for name, text in files.items():
+        (inbox / name).write_text(text)
+
+
+def test_copies_in_one_scan_are_ingested_once(tmp_path):
+    write_inbox(tmp_path, {"a.txt": "same terms", "b.txt": "same terms", "c.txt": "other terms"})
+    agent = FakeAgent()
+
+    stats, entries = scan(tmp_path, agent)
+
+    assert len(agent.ingested) == 2
+    assert (stats.ingested, stats.duplicate, stats.failed) == (2, 1, 0)
+    assert entries["a.txt"].contract_id == entries["b.txt"].contract_id
+    assert entries["a.txt"].contract_id != entries["c.txt"].contract_id
+
+
+def test_copy_takes_over_when_the_first_ingest_fails(tmp_path):
+    write_inbox(tmp_path, {"a.txt": "same terms", "b.txt": "same terms"})
+    agent = FakeAgent(fail_first=True)
+
+    stats, entries = scan(tmp_path, agent)
+
+    assert len(agent.ingested) == 1
+    assert (stats.ingested, stats.duplicate, stats.failed) == (1, 0, 1)
+    assert sorted(e.status for e in entries.values()) == ["done", "failed"]
+    assert len(agent.deleted) == 1